@@ -13,6 +13,7 @@ import string
 import sys
 import threading
 import socket
+import ssl
 
 from tornado.platform.auto import set_close_exec
 import tornado.wsgi
@@ -20,6 +21,14 @@ import tornado.httpserver
 import tornado.ioloop
 import tornado.web
 
+try:  # Only needed for the HTTP/2 server
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.settings
+except ImportError:
+    h2 = None
+
 
 log = logging.getLogger(__name__)
 
@@ -166,6 +175,77 @@ def run_loop_in_thread(io_loop):
     return t
 
 
+def _send_h2_bodies(conn, bodies):
+    # Send what the flow-control windows and frame size allow; the rest
+    # waits for the client to open the windows again.
+    for stream_id in list(bodies):
+        body = bodies[stream_id]
+        while body:
+            size = min(conn.local_flow_control_window(stream_id),
+                       conn.max_outbound_frame_size, len(body))
+            if size <= 0:
+                break
+            conn.send_data(stream_id, body[:size])
+            body = body[size:]
+        bodies[stream_id] = body
+        if not body:
+            del bodies[stream_id]
+            conn.end_stream(stream_id)
+
+
+def run_h2_server(listener, certs=DEFAULT_CERTS, max_concurrent_streams=100):
+    """
+    Socket handler serving one HTTP/2 over TLS connection until the client
+    closes it. Every request is answered with a 200 whose body is
+    ``"<method> <path>"`` followed by the request body, and an
+    ``x-stream-id`` header.
+    """
+    sock = listener.accept()[0]
+    context = ssl.SSLContext(ssl.PROTOCOL_SSLv23)
+    context.load_cert_chain(certs['certfile'], certs['keyfile'])
+    context.set_alpn_protocols(['h2'])
+    sock = context.wrap_socket(sock, server_side=True)
+
+    config = h2.config.H2Configuration(client_side=False,
+                                       header_encoding='utf-8')
+    conn = h2.connection.H2Connection(config=config)
+    conn.initiate_connection()
+    conn.update_settings({
+        h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS: max_concurrent_streams,
+    })
+    sock.sendall(conn.data_to_send())
+
+    requests = {}
+    bodies = {}
+    while True:
+        data = sock.recv(65536)
+        if not data:
+            break
+        for event in conn.receive_data(data):
+            if isinstance(event, h2.events.RequestReceived):
+                headers = dict(event.headers)
+                requests[event.stream_id] = [
+                    ('%s %s' % (headers[':method'], headers[':path'])).encode()]
+            elif isinstance(event, h2.events.DataReceived):
+                requests[event.stream_id].append(event.data)
+                conn.acknowledge_received_data(event.flow_controlled_length,
+                                               event.stream_id)
+            elif isinstance(event, h2.events.StreamEnded):
+                body = b''.join(requests.pop(event.stream_id))
+                conn.send_headers(event.stream_id, [
+                    (':status', '200'),
+                    ('content-length', str(len(body))),
+                    ('x-stream-id', str(event.stream_id)),
+                ])
+                bodies[event.stream_id] = body
+            elif isinstance(event, h2.events.StreamReset):
+                requests.pop(event.stream_id, None)
+                bodies.pop(event.stream_id, None)
+        _send_h2_bodies(conn, bodies)
+        sock.sendall(conn.data_to_send())
+    sock.close()
+
+
 def get_unreachable_address():
     while True:
         host = ''.join(random.choice(string.ascii_lowercase)
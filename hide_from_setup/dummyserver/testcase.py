@@ -9,7 +9,9 @@ from hide_from_setup.dummyserver.server import (
     SocketServerThread,
     run_tornado_app,
     run_loop_in_thread,
+    run_h2_server,
     DEFAULT_CERTS,
+    h2,
 )
 from hide_from_setup.dummyserver.handlers import TestingApp
 from hide_from_setup.dummyserver.proxy import ProxyHandler
@@ -39,6 +41,25 @@ class SocketDummyServerTestCase(unittest.TestCase):
             cls.server_thread.join(0.1)
 
 
+class HTTP2DummyServerTestCase(SocketDummyServerTestCase):
+    """
+    Like :class:`SocketDummyServerTestCase`, but :meth:`_start_h2_server`
+    starts an HTTP/2 over TLS server for exactly one connection. Skipped when
+    the h2 package is not installed.
+    """
+    scheme = 'https'
+
+    @classmethod
+    def setUpClass(cls):
+        if h2 is None:
+            raise SkipTest('h2 not available')
+
+    @classmethod
+    def _start_h2_server(cls, max_concurrent_streams=100):
+        cls._start_server(lambda listener: run_h2_server(
+            listener, max_concurrent_streams=max_concurrent_streams))
+
+
 class HTTPDummyServerTestCase(unittest.TestCase):
     """ A simple HTTP server that runs when your test class runs
 
@@ -0,0 +1,112 @@
+import unittest
+import functools
+import trollius as asyncio
+from trollius import From
+
+import sys
+sys.path.append('../../')
+
+from yieldfrom_t.urllib3.util.budget import ConnectionBudget
+
+
+def async_test(f):
+
+    testLoop = asyncio.get_event_loop()
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        coro = asyncio.coroutine(f)
+        future = coro(*args, **kwargs)
+        testLoop.run_until_complete(future)
+    return wrapper
+
+async_test.__test__ = False # not a test
+
+
+class FakePool(object):
+    def __init__(self, budget, host, num_idle=0):
+        self.budget = budget
+        self.host = host
+        self.num_idle = num_idle
+        budget.register(self)
+
+    def release_idle(self, num=1):
+        if not self.num_idle:
+            return 0
+        self.num_idle -= 1
+        self.budget.release(self.host)
+        return 1
+
+
+class TestConnectionBudget(unittest.TestCase):
+
+    @async_test
+    def test_total_limit_waits(self):
+        budget = ConnectionBudget(max_connections=2)
+        yield From(budget.acquire('a'))
+        yield From(budget.acquire('b'))
+        self.assertEqual(budget.utilization, 1.0)
+
+        waiter = asyncio.Task(budget.acquire('c'))
+        yield From(asyncio.sleep(0))
+        self.assertFalse(waiter.done())
+        self.assertEqual(budget.waiting, 1)
+
+        budget.release('a')
+        yield From(waiter)
+        self.assertEqual(budget.in_use, 2)
+        self.assertEqual(budget.stats()['per_host'], {'b': 1, 'c': 1})
+        self.assertEqual(budget.num_waits, 1)
+
+    @async_test
+    def test_per_host_limit(self):
+        budget = ConnectionBudget(max_connections=10, max_per_host=1)
+        yield From(budget.acquire('a'))
+
+        waiter = asyncio.Task(budget.acquire('a'))
+        yield From(asyncio.sleep(0))
+        self.assertFalse(waiter.done())
+
+        # Another host isn't held up.
+        self.assertTrue(budget.try_acquire('b'))
+
+        budget.release('b')
+        yield From(asyncio.sleep(0))
+        self.assertFalse(waiter.done())
+
+        budget.release('a')
+        yield From(waiter)
+        self.assertEqual(budget.host_utilization('a'), 1.0)
+
+    @async_test
+    def test_timeout(self):
+        budget = ConnectionBudget(max_connections=1)
+        yield From(budget.acquire('a'))
+        try:
+            yield From(budget.acquire('b', timeout=0.01))
+            self.fail("TimeoutError not raised")
+        except asyncio.TimeoutError:
+            pass
+        self.assertEqual(budget.waiting, 0)
+
+        budget.release('a')
+        self.assertEqual(budget.in_use, 0)
+
+    @async_test
+    def test_reclaims_idle_connection(self):
+        budget = ConnectionBudget(max_connections=2)
+        busy = FakePool(budget, 'busy')
+        idle = FakePool(budget, 'idle', num_idle=1)
+        budget.try_acquire('busy')
+        budget.try_acquire('idle')
+
+        # The idle pool's connection is closed to make room.
+        yield From(budget.acquire('new'))
+        self.assertEqual(idle.num_idle, 0)
+        self.assertEqual(busy.num_idle, 0)
+        self.assertEqual(budget.num_reclaimed, 1)
+        self.assertEqual(budget.stats()['per_host'], {'busy': 1, 'new': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,7 @@ sys.path.append('..')
 
 from yieldfrom_t.urllib3._collections import (
     HTTPHeaderDict,
+    LoopRecentlyUsedContainer,
     RecentlyUsedContainer as Container
 )
 from yieldfrom_t.urllib3.packages import six
@@ -12,8 +13,10 @@ xrange = six.moves.xrange
 
 
 class TestLRUContainer(unittest.TestCase):
+    Container = Container
+
     def test_maxsize(self):
-        d = Container(5)
+        d = self.Container(5)
 
         for i in xrange(5):
             d[i] = str(i)
@@ -30,7 +33,7 @@ class TestLRUContainer(unittest.TestCase):
         self.assertTrue(i+1 in d)
 
     def test_expire(self):
-        d = Container(5)
+        d = self.Container(5)
 
         for i in xrange(5):
             d[i] = str(i)
@@ -45,7 +48,7 @@ class TestLRUContainer(unittest.TestCase):
         self.assertEqual(list(d.keys()), [2, 3, 4, 0, 5])
 
     def test_same_key(self):
-        d = Container(5)
+        d = self.Container(5)
 
         for i in xrange(10):
             d['foo'] = i
@@ -54,7 +57,7 @@ class TestLRUContainer(unittest.TestCase):
         self.assertEqual(len(d), 1)
 
     def test_access_ordering(self):
-        d = Container(5)
+        d = self.Container(5)
 
         for i in xrange(10):
             d[i] = True
@@ -69,7 +72,7 @@ class TestLRUContainer(unittest.TestCase):
         self.assertEqual(list(d.keys()), new_order)
 
     def test_delete(self):
-        d = Container(5)
+        d = self.Container(5)
 
         for i in xrange(5):
             d[i] = True
@@ -83,7 +86,7 @@ class TestLRUContainer(unittest.TestCase):
         d.pop(1, None)
 
     def test_get(self):
-        d = Container(5)
+        d = self.Container(5)
 
         for i in xrange(5):
             d[i] = True
@@ -106,7 +109,7 @@ class TestLRUContainer(unittest.TestCase):
             # Save the evicted datum for inspection
             evicted_items.append(arg)
 
-        d = Container(5, dispose_func=dispose_func)
+        d = self.Container(5, dispose_func=dispose_func)
         for i in xrange(5):
             d[i] = i
         self.assertEqual(list(d.keys()), list(xrange(5)))
@@ -123,11 +126,49 @@ class TestLRUContainer(unittest.TestCase):
         self.assertEqual(evicted_items, [0, 1, 2, 3, 4, 5])
 
     def test_iter(self):
-        d = Container()
+        d = self.Container()
 
         self.assertRaises(NotImplementedError, d.__iter__)
 
 
+class TestLoopLRUContainer(TestLRUContainer):
+    """ The same behaviour, without locking. """
+
+    Container = LoopRecentlyUsedContainer
+
+    def test_iter(self):
+        d = self.Container()
+        d[1] = d[2] = True
+        self.assertEqual(list(d), [1, 2])
+
+    def test_contains_does_not_touch(self):
+        d = self.Container(2)
+        d[0] = d[1] = True
+        self.assertTrue(0 in d)
+        d[2] = True
+        self.assertEqual(list(d.keys()), [1, 2])
+
+    def test_weigh(self):
+        evicted_items = []
+        d = self.Container(10, dispose_func=evicted_items.append, weigh=len)
+
+        d['a'] = 'aaaa'
+        d['b'] = 'bbbb'
+        d['a']
+        d['c'] = 'ccccc'
+        self.assertEqual(list(d.keys()), ['a', 'c'])
+        self.assertEqual(d.weight, 9)
+        self.assertEqual(evicted_items, ['bbbb'])
+
+        d['a'] = 'a'
+        self.assertEqual(d.weight, 6)
+
+        # Too heavy on its own, but kept as the newest.
+        d['d'] = 'd' * 20
+        self.assertEqual(list(d.keys()), ['d'])
+        self.assertEqual(d.weight, 20)
+
+
 class TestHTTPHeaderDict(unittest.TestCase):
     def setUp(self):
         self.d = HTTPHeaderDict(A='foo')
@@ -161,6 +202,35 @@ class TestHTTPHeaderDict(unittest.TestCase):
         self.assertEqual(self.d.getlist('A'), ['foo', 'bar'])
         self.assertEqual(self.d.getlist('b'), [])
 
+    def test_getlist_keeps_commas(self):
+        d = HTTPHeaderDict()
+        d.add('Set-Cookie', 'a=1; expires=Wed, 21 Oct 2015 07:28:00 GMT')
+        d.add('set-cookie', 'b=2')
+        self.assertEqual(d.getlist('set-cookie'),
+                         ['a=1; expires=Wed, 21 Oct 2015 07:28:00 GMT', 'b=2'])
+
+    def test_from_pairs(self):
+        d = HTTPHeaderDict.from_pairs([('Set-Cookie', 'a=1'),
+                                       ('Content-Type', 'text/plain'),
+                                       ('set-cookie', 'b=2')])
+        self.assertEqual(d.getlist('SET-COOKIE'), ['a=1', 'b=2'])
+        self.assertEqual(d['content-type'], 'text/plain')
+        self.assertEqual(list(d), ['Set-Cookie', 'Content-Type'])
+
+    def test_copy_on_write(self):
+        h = self.d.copy()
+        h.add('b', 'baz')
+        self.d.add('a', 'quux')
+        self.assertEqual(h.getlist('a'), ['foo', 'bar'])
+        self.assertFalse('b' in self.d)
+        self.assertEqual(self.d['a'], 'foo, bar, quux')
+
+    def test_update_keeps_values(self):
+        d = HTTPHeaderDict(b='x')
+        d.update(self.d)
+        self.assertEqual(d.getlist('a'), ['foo', 'bar'])
+        self.assertEqual(HTTPHeaderDict(self.d).getlist('a'), ['foo', 'bar'])
+
     def test_delitem(self):
         del self.d['a']
         self.assertFalse('a' in self.d)
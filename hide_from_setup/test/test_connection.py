@@ -0,0 +1,251 @@
+import unittest
+import functools
+import socket
+import trollius as asyncio
+from trollius import From, Return
+
+from mock import patch
+
+import sys
+sys.path.append('../../')
+
+from yieldfrom_t.urllib3 import connection
+from yieldfrom_t.urllib3.connection import (
+    _interleave_families,
+    create_connection,
+    UnverifiedHTTPSConnection,
+)
+from yieldfrom_t.urllib3.exceptions import ConnectTimeoutError
+
+
+def async_test(f):
+
+    testLoop = asyncio.get_event_loop()
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        coro = asyncio.coroutine(f)
+        future = coro(*args, **kwargs)
+        testLoop.run_until_complete(future)
+    return wrapper
+
+async_test.__test__ = False # not a test
+
+
+V6_A = (socket.AF_INET6, socket.SOCK_STREAM, 6, '', ('2001:db8::1', 80, 0, 0))
+V6_B = (socket.AF_INET6, socket.SOCK_STREAM, 6, '', ('2001:db8::2', 80, 0, 0))
+V4_A = (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('192.0.2.1', 80))
+V4_B = (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('192.0.2.2', 80))
+
+
+class FakeResolver(object):
+    def __init__(self, *infos):
+        self.infos = list(infos)
+
+    @asyncio.coroutine
+    def getaddrinfo(self, host, port, **kw):
+        yield From(asyncio.sleep(0))
+        raise Return (self.infos)
+
+
+def fake_connect(behaviour, attempts):
+    """ ``behaviour`` maps an IP to (delay, result or exception). """
+    @asyncio.coroutine
+    def _create_connection(address, *args, **kwargs):
+        attempts.append(address[0])
+        delay, result = behaviour[address[0]]
+        yield From(asyncio.sleep(delay))
+        if isinstance(result, Exception):
+            raise result
+        raise Return (result)
+    return _create_connection
+
+
+class TestHappyEyeballs(unittest.TestCase):
+
+    def test_interleave_families(self):
+        self.assertEqual(_interleave_families([V6_A, V6_B, V4_A, V4_B]),
+                         [V6_A, V4_A, V6_B, V4_B])
+        self.assertEqual(_interleave_families([V4_A, V4_B, V6_A]),
+                         [V4_A, V6_A, V4_B])
+        self.assertEqual(_interleave_families([V4_A]), [V4_A])
+
+    def _connect(self, infos, behaviour):
+        attempts = []
+        with patch.object(connection, '_create_connection',
+                          fake_connect(behaviour, attempts)):
+            with patch.object(connection, 'CONNECT_ATTEMPT_DELAY', 0.01):
+                result = yield From(create_connection(
+                    ('example.com', 80), 1.0, resolver=FakeResolver(*infos)))
+        raise Return ((result, attempts))
+
+    @async_test
+    def test_broken_ipv6_path(self):
+        # IPv6 hangs; IPv4 wins after one attempt delay, not a timeout.
+        result, attempts = yield From(self._connect(
+            [V6_A, V4_A], {'2001:db8::1': (10, 'v6'), '192.0.2.1': (0, 'v4')}))
+        self.assertEqual(result, 'v4')
+        self.assertEqual(attempts, ['2001:db8::1', '192.0.2.1'])
+
+    @async_test
+    def test_fast_first_address(self):
+        result, attempts = yield From(self._connect(
+            [V6_A, V4_A], {'2001:db8::1': (0, 'v6'), '192.0.2.1': (0, 'v4')}))
+        self.assertEqual(result, 'v6')
+        self.assertEqual(attempts, ['2001:db8::1'])
+
+    @async_test
+    def test_failure_starts_next_attempt(self):
+        result, attempts = yield From(self._connect(
+            [V6_A, V6_B, V4_A],
+            {'2001:db8::1': (0, OSError()), '192.0.2.1': (0, OSError()),
+             '2001:db8::2': (0, 'v6b')}))
+        self.assertEqual(result, 'v6b')
+        self.assertEqual(attempts, ['2001:db8::1', '192.0.2.1', '2001:db8::2'])
+
+    @async_test
+    def test_all_fail(self):
+        try:
+            yield From(self._connect(
+                [V6_A, V4_A],
+                {'2001:db8::1': (0, OSError()), '192.0.2.1': (0, OSError())}))
+            self.fail("ConnectTimeoutError not raised")
+        except ConnectTimeoutError:
+            pass
+
+    @async_test
+    def test_no_addresses(self):
+        try:
+            yield From(self._connect([], {}))
+            self.fail("ConnectTimeoutError not raised")
+        except ConnectTimeoutError:
+            pass
+
+
+class FakeStream(object):
+    def __init__(self, name):
+        self.name = name
+
+    @asyncio.coroutine
+    def read(self, n=-1):
+        raise Return (self.name.encode('ascii'))
+
+    readline = readexactly = read
+
+    def write(self, data):
+        self.written = data
+
+
+class FakeNotSock(object):
+    """ Binds stream methods the way NotSocket does. """
+
+    def __init__(self, transport):
+        self.reader = FakeStream('plain')
+        self.writer = FakeStream('plain')
+        self.read = self.reader.read
+        self.readline = self.reader.readline
+        self.readexactly = self.reader.readexactly
+        self.write = self.writer.write
+        self.transport = transport
+
+
+class TestALPN(unittest.TestCase):
+
+    def test_selected_alpn_protocol(self):
+        class SSLObject(object):
+            def selected_alpn_protocol(self):
+                return 'h2'
+
+        class Transport(object):
+            def get_extra_info(self, name):
+                return SSLObject() if name == 'ssl_object' else None
+
+        class RawSocket(object):
+            pass
+
+        conn = UnverifiedHTTPSConnection('example.com', 443)
+        self.assertEqual(conn.selected_alpn_protocol(), None)
+
+        # The protocol comes from the transport's SSL object; the socket
+        # underneath is plain TCP.
+        conn.notSock = FakeNotSock(Transport())
+        conn.notSock.socket = RawSocket
+        self.assertEqual(conn.selected_alpn_protocol(), 'h2')
+
+
+class TestTunnel(unittest.TestCase):
+
+    @async_test
+    def test_tls_after_connect(self):
+        conn = UnverifiedHTTPSConnection('proxy', 3128)
+        conn.set_tunnel('example.com', 443)
+        calls = []
+
+        @asyncio.coroutine
+        def _create_connection(address, *args, **kwargs):
+            calls.append(('connect', address, kwargs.get('ssl')))
+            raise Return (FakeNotSock(None))
+
+        @asyncio.coroutine
+        def _tunnel():
+            calls.append(('tunnel',))
+
+        @asyncio.coroutine
+        def _start_tls(server_hostname):
+            calls.append(('tls', server_hostname))
+
+        conn._create_connection = _create_connection
+        conn._tunnel = _tunnel
+        conn._start_tls = _start_tls
+        yield From(conn.connect())
+
+        # Plain TCP to the proxy, CONNECT, then TLS with the origin's name.
+        self.assertEqual(calls, [('connect', ('proxy', 3128), None),
+                                 ('tunnel',),
+                                 ('tls', 'example.com')])
+        # The connection reopens through the proxy, so it can be pooled.
+        self.assertNotEqual(getattr(conn, 'auto_open', 1), 0)
+
+    @async_test
+    def test_start_tls_swaps_streams(self):
+        raw = socket.socket()
+        closed = []
+
+        class Transport(object):
+            def get_extra_info(self, name):
+                return raw
+
+            def close(self):
+                closed.append(True)
+
+        conn = UnverifiedHTTPSConnection('proxy', 3128)
+        conn.notSock = FakeNotSock(Transport())
+        opened = {}
+
+        @asyncio.coroutine
+        def open_connection(**kwargs):
+            opened.update(kwargs)
+            raise Return ((FakeStream('tls'), FakeStream('tls')))
+
+        with patch.object(connection, 'get_stream',
+                          lambda c: (c.notSock.reader, c.notSock.transport)):
+            with patch.object(asyncio, 'open_connection', open_connection):
+                yield From(conn._start_tls('example.com'))
+
+        self.assertEqual(closed, [True])
+        self.assertEqual(opened['server_hostname'], 'example.com')
+        self.assertNotEqual(opened['sock'].fileno(), raw.fileno())
+        self.assertEqual(conn.notSock.reader.name, 'tls')
+        self.assertEqual(conn.notSock.writer.name, 'tls')
+
+        # Responses are read, and requests written, through the TLS streams.
+        self.assertEqual((yield From(conn.notSock.read(10))), b'tls')
+        self.assertEqual((yield From(conn.notSock.readline())), b'tls')
+        conn.notSock.write(b'GET / HTTP/1.1\r\n')
+        self.assertEqual(conn.notSock.writer.written, b'GET / HTTP/1.1\r\n')
+        opened['sock'].close()
+        raw.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,7 +14,9 @@ from yieldfrom_t.urllib3.connectionpool import (
     connection_from_url,
     HTTPConnection,
     HTTPConnectionPool,
+    HTTPSConnectionPool,
 )
+from yieldfrom_t.urllib3.util.budget import ConnectionBudget
 from yieldfrom_t.urllib3.util.timeout import Timeout
 from yieldfrom_t.urllib3.packages.ssl_match_hostname import CertificateError
 from yieldfrom_t.urllib3.exceptions import (
@@ -77,6 +79,10 @@ class TestConnectionPool(unittest.TestCase):
             ('http://google.com/', 'http://google.com:80/abracadabra'),
             ('https://google.com:443/', 'https://google.com/abracadabra'),
             ('https://google.com/', 'https://google.com:443/abracadabra'),
+            # Hosts compare case-insensitively, IPv6 with or without brackets
+            ('http://google.com/', 'http://Google.COM/abracadabra'),
+            ('http://Google.COM/', 'HTTP://google.com/abracadabra'),
+            ('http://[::1]:8080/', 'http://[::1]:8080/abracadabra'),
         ]
 
         for a, b in same_host:
@@ -145,6 +151,245 @@ class TestConnectionPool(unittest.TestCase):
 
         self.assertEqual(pool.num_connections, 3)
 
+    @async_test
+    def test_reap_idle(self):
+        pool = HTTPConnectionPool(host='localhost', maxsize=3,
+                                  idle_timeout=60, min_size=1)
+
+        conns = []
+        for _ in range(3):
+            conns.append((yield From(pool._get_conn())))
+        for conn in conns:
+            pool._put_conn(conn)
+        self.assertNotEqual(pool._reaper, None)
+
+        # Nothing has been idle long enough yet
+        self.assertEqual(pool.reap_idle(idle_timeout=3600), 0)
+
+        for conn in conns:
+            pool._idle_since[conn] -= 120
+
+        self.assertEqual(pool.reap_idle(), 2)
+        self.assertEqual(pool.num_reaped, 2)
+        self.assertEqual(pool.pool.qsize(), 3)
+
+        # The most recently used connection survives and is handed out next
+        self.assertEqual((yield From(pool._get_conn())), conns[-1])
+
+        pool.close()
+        self.assertEqual(pool._reaper, None)
+
+    @async_test
+    def test_prewarm(self):
+        class FakeConnection(object):
+            def __init__(self, **kw):
+                self.connected = False
+
+            @asyncio.coroutine
+            def connect(self):
+                self.connected = True
+
+            def close(self):
+                self.connected = False
+
+        pool = HTTPConnectionPool(host='localhost', maxsize=3)
+        pool.ConnectionCls = FakeConnection
+
+        self.assertEqual((yield From(pool.prewarm(2))), 2)
+        self.assertEqual(pool.num_connections, 2)
+        self.assertEqual(pool.pool.qsize(), 3)
+
+        conn1 = yield From(pool._get_conn())
+        conn2 = yield From(pool._get_conn())
+        self.assertTrue(conn1.connected and conn2.connected)
+        pool._put_conn(conn1)
+        pool._put_conn(conn2)
+
+        # Only the one remaining empty slot gets filled
+        self.assertEqual((yield From(pool.prewarm(5))), 1)
+        self.assertEqual((yield From(pool.prewarm())), 0)
+
+    @async_test
+    def test_elastic_grow_instead_of_discard(self):
+        pool = HTTPConnectionPool(host='localhost', maxsize=1, max_size=2)
+
+        conn1 = yield From(pool._get_conn())
+        conn2 = yield From(pool._get_conn()) # New because block=False
+        pool._put_conn(conn1)
+        pool._put_conn(conn2) # Kept, the pool grows
+
+        self.assertEqual(pool.size, 2)
+        self.assertEqual(pool.num_grown, 1)
+        self.assertEqual(pool.pool.qsize(), 2)
+
+        # Once the extra slot is empty again, the pool shrinks back
+        yield From(pool._get_conn())
+        yield From(pool._get_conn())
+        pool._put_conn(None)
+        pool._put_conn(None)
+        pool.reap_idle()
+
+        self.assertEqual(pool.size, 1)
+        self.assertEqual(pool.num_shrunk, 1)
+        self.assertEqual(pool.pool.qsize(), 1)
+
+    @async_test
+    def test_elastic_grow_on_wait(self):
+        pool = HTTPConnectionPool(host='localhost', maxsize=1, block=True,
+                                  max_size=2, grow_after=0.01)
+
+        conn1 = yield From(pool._get_conn(timeout=1))
+        conn2 = yield From(pool._get_conn(timeout=1))
+
+        self.assertNotEqual(conn1, conn2)
+        self.assertEqual(pool.size, 2)
+
+        # No room left to grow
+        yield From(self.aioAssertRaises(EmptyPoolError, pool._get_conn,
+                                        timeout=0.05))
+
+    @async_test
+    def test_elastic_grow_single_timer(self):
+        pool = HTTPConnectionPool(host='localhost', maxsize=1, block=True,
+                                  max_size=3, grow_after=10)
+        conn = yield From(pool._get_conn())
+
+        waiters = [asyncio.Task(pool._get_conn()) for i in range(3)]
+        yield From(asyncio.sleep(0))
+        self.assertTrue(pool._grow_handle is not None)
+
+        # Every waiter served: the pending grow is cancelled.
+        for i in range(3):
+            pool._put_conn(conn)
+            conn = yield From(waiters[i])
+        self.assertTrue(pool._grow_handle is None)
+        self.assertEqual(pool.size, 1)
+
+    @async_test
+    def test_max_overflow(self):
+        pool = HTTPConnectionPool(host='localhost', maxsize=1, max_overflow=1)
+
+        yield From(pool._get_conn())
+        yield From(pool._get_conn()) # Overflow connection
+
+        yield From(self.aioAssertRaises(EmptyPoolError, pool._get_conn,
+                                        timeout=0.01))
+        self.assertEqual(pool.num_connections, 2)
+        self.assertEqual(pool.num_checked_out, 2)
+
+    @async_test
+    def test_connection_budget(self):
+        budget = ConnectionBudget(max_connections=1)
+        pool1 = HTTPConnectionPool(host='localhost', maxsize=2,
+                                   connection_budget=budget)
+        pool2 = HTTPConnectionPool(host='otherhost', maxsize=2,
+                                   connection_budget=budget)
+
+        conn1 = yield From(pool1._get_conn())
+        self.assertEqual(budget.in_use, 1)
+
+        # Waits, even though pool2 doesn't block, until pool1's connection
+        # is discarded.
+        yield From(self.aioAssertRaises(EmptyPoolError, pool2._get_conn,
+                                        timeout=0.01))
+        self.assertEqual(pool2.pool.qsize(), 2)
+        waiter = asyncio.Task(pool2._get_conn())
+        yield From(asyncio.sleep(0))
+        self.assertFalse(waiter.done())
+
+        pool1._put_conn(None)
+        conn2 = yield From(waiter)
+        self.assertEqual(budget.stats()['per_host'], {'otherhost': 1})
+
+        # An idle pooled connection is closed to make room.
+        pool2._put_conn(conn2)
+        self.assertEqual(pool2.num_idle, 1)
+        conn1 = yield From(pool1._get_conn())
+        self.assertEqual(pool2.num_idle, 0)
+        self.assertEqual(budget.num_reclaimed, 1)
+
+        pool1._put_conn(conn1)
+        pool1.close()
+        pool2.close()
+        self.assertEqual(budget.in_use, 0)
+
+    @async_test
+    def test_stats(self):
+        pool = HTTPConnectionPool(host='localhost', maxsize=1)
+
+        conn1 = yield From(pool._get_conn())
+        conn2 = yield From(pool._get_conn())
+        pool._put_conn(conn1)
+        pool._put_conn(conn2) # Discarded, the pool is full
+
+        self.assertEqual(pool.stats.connections_created, 2)
+        self.assertEqual(pool.stats.discarded_full, 1)
+        self.assertEqual(pool.stats.checkouts, 2)
+        self.assertEqual(pool.stats.in_flight, 0)
+
+    @async_test
+    def test_https_conn_reused(self):
+        pool = HTTPSConnectionPool(host='localhost')
+        connects = []
+
+        class FakeNotSock(object):
+            reader = 'reader'
+
+        class FakeConn(object):
+            is_verified = True
+            notSock = None
+
+            @asyncio.coroutine
+            def connect(self):
+                connects.append(self)
+                self.notSock = FakeNotSock()
+
+            def close(self):
+                self.notSock = None
+
+        conn = FakeConn()
+        yield From(pool._validate_conn(conn))
+        yield From(pool._validate_conn(conn))
+        self.assertEqual(connects, [conn])
+
+        # A connection left without a stream is closed and reopened.
+        conn.notSock.reader = None
+        yield From(pool._validate_conn(conn))
+        self.assertEqual(connects, [conn, conn])
+        self.assertEqual(conn.notSock.reader, 'reader')
+
+    def test_tls_session_resumption(self):
+        pool = HTTPSConnectionPool(host='localhost')
+
+        class FakeConn(object):
+            new_handshake = True
+            session_reused = False
+
+            def __init__(self, session):
+                self.session = session
+
+            def get_tls_session(self):
+                return self.session
+
+        first = FakeConn(('context', 'session1'))
+        pool._record_tls_session(first)
+        self.assertEqual(pool.tls_session, ('context', 'session1'))
+
+        # Counted once per handshake, however many requests follow.
+        pool._record_tls_session(first)
+        self.assertEqual(pool.stats.tls_handshakes, 1)
+
+        # New connections are offered the stored session.
+        conn = pool._new_conn()
+        self.assertEqual(conn.tls_session, ('context', 'session1'))
+
+        second = FakeConn(('context', 'session2'))
+        second.session_reused = True
+        pool._record_tls_session(second)
+        self.assertEqual(pool.stats.tls_resumed, 1)
+        self.assertEqual(pool.tls_resumption_rate, 0.5)
+        self.assertEqual(pool.tls_session, ('context', 'session2'))
+
     def test_exception_str(self):
         self.assertEqual(
             str(EmptyPoolError(HTTPConnectionPool(host='localhost'), "Test.")),
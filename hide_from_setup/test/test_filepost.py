@@ -3,7 +3,15 @@ import unittest
 import sys
 sys.path.append('../../')
 
-from yieldfrom_t.urllib3.filepost import encode_multipart_formdata, iter_fields
+import os
+import tempfile
+from io import BytesIO
+
+from yieldfrom_t.urllib3.filepost import (
+    encode_multipart_formdata,
+    iter_fields,
+    MultipartEncoder,
+)
 from yieldfrom_t.urllib3.fields import RequestField
 from yieldfrom_t.urllib3.packages.six import b, u
 
@@ -134,3 +142,64 @@ class TestMultipartEncoding(unittest.TestCase):
           b'v\r\n'
           b'--' + b(BOUNDARY) + b'--\r\n'
           )
+
+
+class TestMultipartEncoder(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.write(fd, b'0123456789' * 1000)
+        os.close(fd)
+        self.fp = open(self.path, 'rb')
+
+    def tearDown(self):
+        self.fp.close()
+        os.remove(self.path)
+
+    def test_matches_buffered_encoding(self):
+        self.fp.read(10)
+        fields = [('k', 'v'), ('k2', 42),
+                  ('file', ('data.bin', self.fp)),
+                  ('buffer', ('buffer.txt', BytesIO(b'buffered')))]
+        body = MultipartEncoder(fields, boundary=BOUNDARY, chunk_size=1024)
+
+        expected, content_type = encode_multipart_formdata(
+            [('k', 'v'), ('k2', 42),
+             ('file', ('data.bin', b'0123456789' * 999)),
+             ('buffer', ('buffer.txt', b'buffered'))],
+            boundary=BOUNDARY)
+
+        chunks = list(body)
+        self.assertEqual(b''.join(chunks), expected)
+        self.assertEqual(len(body), len(expected))
+        self.assertEqual(body.content_type, content_type)
+        self.assertTrue(max(len(chunk) for chunk in chunks) <= 1024)
+
+    def test_read_and_rewind(self):
+        body = MultipartEncoder([('file', ('data.bin', self.fp))],
+                                boundary=BOUNDARY)
+        expected = b''.join(body)
+
+        body.rewind()
+        first = body.read(100)
+        self.assertEqual(first, expected[:100])
+
+        body.rewind()
+        chunks = []
+        while True:
+            chunk = body.read(8192)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        self.assertEqual(b''.join(chunks), expected)
+
+        body.rewind()
+        self.assertEqual(body.read(), expected)
+        self.assertEqual(body.read(), b'')
+
+    def test_truncated_file(self):
+        body = MultipartEncoder([('file', ('data.bin', self.fp))],
+                                boundary=BOUNDARY)
+        with open(self.path, 'wb') as f:
+            f.write(b'short')
+        self.assertRaises(ValueError, body.read)
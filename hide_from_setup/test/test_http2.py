@@ -0,0 +1,48 @@
+import unittest
+import functools
+import trollius as asyncio
+from trollius import From
+
+import sys
+sys.path.append('../../')
+
+from yieldfrom_t.urllib3.http2 import _Stream
+
+
+def async_test(f):
+
+    testLoop = asyncio.get_event_loop()
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        coro = asyncio.coroutine(f)
+        future = coro(*args, **kwargs)
+        testLoop.run_until_complete(future)
+    return wrapper
+
+async_test.__test__ = False # not a test
+
+
+class TestStreamFlowControl(unittest.TestCase):
+
+    @async_test
+    def test_paused_until_read(self):
+        resumed = []
+        stream = _Stream(1, resumed.append)
+        limit = 2 ** 16
+
+        stream.body.feed_data(b'x' * limit)
+        self.assertFalse(stream.paused)
+        stream.body.feed_data(b'x' * (limit + 1))
+        self.assertTrue(stream.paused)
+
+        # Reading back down to the limit reopens the window.
+        yield From(stream.body.read(limit // 2))
+        self.assertTrue(stream.paused)
+        yield From(stream.body.read(limit))
+        self.assertFalse(stream.paused)
+        self.assertEqual(resumed, [stream])
+
+
+if __name__ == '__main__':
+    unittest.main()
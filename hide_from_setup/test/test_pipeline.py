@@ -0,0 +1,185 @@
+import unittest
+import functools
+import trollius as asyncio
+from trollius import From
+
+import sys
+sys.path.append('../../')
+
+from yieldfrom_t.urllib3.pipeline import (
+    PipelinedConnection,
+    PipelineAborted,
+    read_response,
+)
+
+
+def async_test(f):
+
+    testLoop = asyncio.get_event_loop()
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        coro = asyncio.coroutine(f)
+        future = coro(*args, **kwargs)
+        testLoop.run_until_complete(future)
+    return wrapper
+
+async_test.__test__ = False # not a test
+
+
+class FakeTransport(object):
+    def __init__(self):
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+
+    def is_closing(self):
+        return False
+
+
+class FakeWriter(object):
+    def __init__(self):
+        self.transport = FakeTransport()
+        self.num_drains = 0
+
+    def write(self, data):
+        self.transport.write(data)
+
+    @asyncio.coroutine
+    def drain(self):
+        self.num_drains += 1
+
+
+class FakeNotSock(object):
+    def __init__(self):
+        self.reader = asyncio.StreamReader()
+        self.writer = FakeWriter()
+
+
+class FakeConn(object):
+    def __init__(self):
+        self.notSock = FakeNotSock()
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def ok(body, extra=b''):
+    return (b'HTTP/1.1 200 OK\r\nContent-Length: ' +
+            str(len(body)).encode('ascii') + b'\r\n' + extra + b'\r\n' + body)
+
+
+class TestReadResponse(unittest.TestCase):
+
+    def _reader(self, data, eof=True):
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        if eof:
+            reader.feed_eof()
+        return reader
+
+    @async_test
+    def test_content_length(self):
+        reader = self._reader(ok(b'foo') + ok(b'bar'))
+        version, status, reason, headers, body = \
+            yield From(read_response(reader, 'GET'))
+        self.assertEqual((version, status, reason, body),
+                         (11, 200, 'OK', b'foo'))
+        self.assertEqual(headers['content-length'], '3')
+
+        result = yield From(read_response(reader, 'GET'))
+        self.assertEqual(result[4], b'bar')
+
+    @async_test
+    def test_chunked_and_interim(self):
+        reader = self._reader(b'HTTP/1.1 100 Continue\r\n\r\n'
+                              b'HTTP/1.1 200 OK\r\n'
+                              b'Transfer-Encoding: chunked\r\n\r\n'
+                              b'3\r\nfoo\r\n4;x=y\r\nbarr\r\n0\r\n\r\n')
+        result = yield From(read_response(reader, 'GET'))
+        self.assertEqual((result[1], result[4]), (200, b'foobarr'))
+
+    @async_test
+    def test_head_has_no_body(self):
+        reader = self._reader(b'HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\n' +
+                              ok(b'x'))
+        result = yield From(read_response(reader, 'HEAD'))
+        self.assertEqual(result[4], b'')
+
+        result = yield From(read_response(reader, 'GET'))
+        self.assertEqual(result[4], b'x')
+
+    @async_test
+    def test_closed_before_status(self):
+        reader = self._reader(b'')
+        try:
+            yield From(read_response(reader, 'GET'))
+            self.fail("PipelineAborted not raised")
+        except PipelineAborted:
+            pass
+
+
+class TestPipelinedConnection(unittest.TestCase):
+
+    def _pipeline(self, depth=4):
+        idle = []
+        conn = FakeConn()
+        pipe = PipelinedConnection(conn, 'example.com', depth, idle.append)
+        return pipe, conn, idle
+
+    @async_test
+    def test_responses_in_order(self):
+        pipe, conn, idle = self._pipeline()
+        tasks = [asyncio.Task(pipe.request('GET', '/%d' % i)) for i in range(3)]
+        yield From(asyncio.sleep(0))
+
+        # All three went out before any response came back.
+        written = b''.join(conn.notSock.writer.transport.written)
+        self.assertEqual(written.count(b'GET /'), 3)
+        self.assertTrue(written.startswith(b'GET /0 HTTP/1.1\r\nHost: example.com\r\n'))
+        self.assertEqual(idle, [])
+
+        conn.notSock.reader.feed_data(ok(b'a') + ok(b'b') + ok(b'c'))
+        results = yield From(asyncio.gather(*tasks))
+        self.assertEqual([r[4] for r in results], [b'a', b'b', b'c'])
+        # Each request waited for the transport's write buffer to drain.
+        self.assertEqual(conn.notSock.writer.num_drains, 3)
+
+        self.assertEqual(idle, [pipe])
+        self.assertEqual(pipe.conn, conn)
+        self.assertFalse(conn.closed)
+
+    @async_test
+    def test_depth(self):
+        pipe, conn, idle = self._pipeline(depth=2)
+        tasks = [asyncio.Task(pipe.request('GET', '/')) for i in range(2)]
+        yield From(asyncio.sleep(0))
+        self.assertFalse(pipe.has_room())
+
+        conn.notSock.reader.feed_data(ok(b'') + ok(b''))
+        yield From(asyncio.gather(*tasks))
+
+    @async_test
+    def test_close_mid_pipeline(self):
+        pipe, conn, idle = self._pipeline()
+        tasks = [asyncio.Task(pipe.request('GET', '/%d' % i)) for i in range(3)]
+        yield From(asyncio.sleep(0))
+
+        # The server answers the first request, then hangs up.
+        conn.notSock.reader.feed_data(ok(b'a', b'Connection: close\r\n'))
+        conn.notSock.reader.feed_eof()
+        results = yield From(asyncio.gather(*tasks, return_exceptions=True))
+
+        self.assertEqual(results[0][4], b'a')
+        self.assertTrue(isinstance(results[1], PipelineAborted))
+        self.assertTrue(isinstance(results[2], PipelineAborted))
+
+        self.assertEqual(idle, [pipe])
+        self.assertTrue(conn.closed)
+        self.assertEqual(pipe.conn, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+import functools
 import trollius as asyncio
 from trollius import From, Return
 import sys
@@ -12,6 +13,45 @@ from yieldfrom_t.urllib3.exceptions import (
 )
 
 
+def async_test(f):
+
+    testLoop = asyncio.get_event_loop()
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        coro = asyncio.coroutine(f)
+        future = coro(*args, **kwargs)
+        testLoop.run_until_complete(future)
+    return wrapper
+
+async_test.__test__ = False # not a test
+
+
+class FakeRequestManager(PoolManager):
+    """ Answers ``GET /<delay>`` after that many ticks; ``/fail`` fails. """
+
+    def __init__(self):
+        PoolManager.__init__(self)
+        self.in_flight = {}
+        self.max_in_flight = {}
+
+    @asyncio.coroutine
+    def request(self, method, url, **kw):
+        host = url.split('/')[2]
+        self.in_flight[host] = self.in_flight.get(host, 0) + 1
+        self.max_in_flight[host] = max(self.max_in_flight.get(host, 0),
+                                       self.in_flight[host])
+        try:
+            path = url.split('/')[3]
+            if path == 'fail':
+                raise ValueError(url)
+            for i in range(int(path)):
+                yield From(asyncio.sleep(0))
+        finally:
+            self.in_flight[host] -= 1
+        raise Return (url)
+
+
 class TestPoolManager(unittest.TestCase):
 
     @asyncio.coroutine
@@ -62,6 +102,23 @@ class TestPoolManager(unittest.TestCase):
 
         self.assertEqual(len(connections), 5)
 
+    def test_canonical_pool_keys(self):
+        p = PoolManager(10)
+
+        conn = p.connection_from_url('http://example.com/')
+        for url in ['http://Example.COM/', 'http://example.com:80/a',
+                    'HTTP://EXAMPLE.COM:80']:
+            self.assertTrue(p.connection_from_url(url) is conn, url)
+        self.assertEqual(conn.host, 'example.com')
+
+        conn = p.connection_from_url('http://[::1]:8080/')
+        self.assertTrue(p.connection_from_host('::1', 8080) is conn)
+        self.assertTrue(p.connection_from_host('[::1]', 8080) is conn)
+
+        self.assertFalse(p.connection_from_url('https://example.com/') is
+                         p.connection_from_url('http://example.com/'))
+        self.assertEqual(len(p.pools), 3)
+
     def test_manager_clear(self):
 
         p = PoolManager(5)
@@ -83,11 +140,153 @@ class TestPoolManager(unittest.TestCase):
         self.assertEqual(len(p.pools), 0)
 
 
+    @async_test
+    def test_drain_aware_eviction(self):
+        p = PoolManager(2)
+        p.pools.eviction_window = 2
+
+        busy = p.connection_from_url('http://busy/')
+        warm = p.connection_from_url('http://warm/')
+        conn = yield From(busy._get_conn())
+        warm._put_conn((yield From(warm._get_conn())))
+
+        # The pool without idle connections is evicted, but not closed while
+        # its request is in flight.
+        new = p.connection_from_url('http://new/')
+        self.assertEqual(p.pools.evictions, 1)
+        self.assertEqual(list(p.pools.draining.values()), [busy])
+        self.assertNotEqual(busy.pool, None)
+
+        # Asked for again in the meantime, it's taken back. The unused pool
+        # makes room and is closed right away.
+        self.assertTrue(p.connection_from_url('http://busy/') is busy)
+        self.assertEqual(p.pools.revived, 1)
+        self.assertEqual(new.pool, None)
+        self.assertNotEqual(warm.pool, None)
+
+        # Evicted again, it closes once the connection is returned.
+        p.connection_from_url('http://other/')
+        self.assertNotEqual(busy.pool, None)
+        busy._put_conn(conn)
+        yield From(asyncio.sleep(0))
+        self.assertEqual(busy.pool, None)
+
+        stats = p.pools.stats()
+        self.assertEqual((stats['misses'], stats['evictions'], stats['revived']),
+                         (4, 3, 1))
+        p.connection_from_url('http://warm/')
+        self.assertEqual(p.pools.hits, 1)
+
+    @async_test
+    def test_stats_outlive_eviction(self):
+        p = PoolManager(1)
+        busy = p.connection_from_url('http://busy/')
+        conn = yield From(busy._get_conn())
+        busy.stats.retries = 1
+        busy.num_reaped = 2
+
+        # Draining pools are still counted.
+        idle = p.connection_from_url('http://idle/')
+        self.assertEqual(list(p.pools.draining.values()), [busy])
+        idle.stats.retries = 10
+        self.assertEqual(p.stats.retries, 11)
+
+        # So are closed ones, once each.
+        busy._put_conn(conn)
+        yield From(asyncio.sleep(0))
+        p.connection_from_url('http://new/')
+        self.assertEqual(p.pools.draining, {})
+        self.assertEqual(p.stats.retries, 11)
+        self.assertEqual(p.num_reaped, 2)
+
+        p.clear()
+        self.assertEqual(p.stats.retries, 11)
+        self.assertEqual(p.num_reaped, 2)
+
     def test_nohost(self):
         p = PoolManager(5)
         self.assertRaises(LocationValueError, p.connection_from_url, 'http://@')
         self.assertRaises(LocationValueError, p.connection_from_url, None)
 
 
+class TestRequestMany(unittest.TestCase):
+
+    @asyncio.coroutine
+    def _collect(self, batch):
+        results = []
+        for next_result in batch:
+            result = yield From(next_result)
+            results.append(result)
+        raise Return (results)
+
+    @async_test
+    def test_completion_order_and_errors(self):
+        manager = FakeRequestManager()
+        requests = [('GET', 'http://a/6'), ('GET', 'http://b/fail'),
+                    ('GET', 'http://c/0'), ('GET', 'http://:80/'),
+                    ('GET', 'http://d/2', {'headers': {'X': 'y'}})]
+        results = yield From(self._collect(
+            manager.request_many(requests, concurrency=5)))
+
+        self.assertEqual(sorted(r.index for r in results), [0, 1, 2, 3, 4])
+        # Fast requests come back first.
+        self.assertEqual(results[-1].index, 0)
+        by_index = dict((r.index, r) for r in results)
+        self.assertEqual(by_index[0].response, 'http://a/6')
+        self.assertTrue(by_index[0].ok)
+        self.assertTrue(isinstance(by_index[1].error, ValueError))
+        self.assertEqual(by_index[1].response, None)
+        self.assertFalse(by_index[3].ok)
+
+    @async_test
+    def test_bounded_and_lazy(self):
+        manager = FakeRequestManager()
+        taken = []
+
+        def requests():
+            for i in range(100):
+                taken.append(i)
+                yield ('GET', 'http://host%d/3' % (i % 10))
+
+        batch = manager.request_many(requests(), concurrency=8)
+        results = iter(batch)
+        first = yield From(next(results))
+        self.assertEqual(first.response, 'http://host0/3')
+        # Only enough of the input was read to fill the free slots.
+        self.assertEqual(len(taken), 9)
+
+        remaining = yield From(self._collect(results))
+        self.assertEqual(len(remaining), 99)
+        self.assertEqual(sum(manager.in_flight.values()), 0)
+
+    @async_test
+    def test_eager_iteration(self):
+        manager = FakeRequestManager()
+        requests = [('GET', 'http://a/%d' % i) for i in range(5)] + \
+            [('GET', 'http://b/fail')]
+        batch = manager.request_many(requests, concurrency=2)
+
+        # One coroutine per request, whether or not they've completed.
+        coros = list(batch)
+        self.assertEqual(len(coros), 6)
+        self.assertEqual(batch.num_running, 2)
+
+        results = yield From(asyncio.gather(*coros))
+        self.assertEqual(sorted(r.index for r in results), list(range(6)))
+        self.assertEqual(list(batch), [])
+
+    @async_test
+    def test_per_host(self):
+        manager = FakeRequestManager()
+        requests = [('GET', 'http://busy/2')] * 4 + [('GET', 'http://quiet/2')]
+        results = yield From(self._collect(
+            manager.request_many(requests, concurrency=6, per_host=2)))
+
+        self.assertEqual(len(results), 5)
+        self.assertEqual(manager.max_in_flight['busy'], 2)
+        # The quiet host wasn't stuck behind the busy one.
+        self.assertTrue([r.index for r in results].index(4) < 3)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -36,6 +36,22 @@ class TestProxyManager(unittest.TestCase):
 
         self.assertEqual(headers, expected_headers)
 
+    def test_headers_for_each_hop(self):
+        p = ProxyManager('http://something:1234')
+        provided_headers = {'custom': 'header'}
+
+        headers = p._headers_for('http://pypi.python.org/test', provided_headers)
+        self.assertEqual(headers['Host'], 'pypi.python.org')
+
+        # A redirect to another host gets its own Host header
+        headers = p._headers_for('http://test.python.org/', provided_headers)
+        self.assertEqual(headers['Host'], 'test.python.org')
+        self.assertEqual(headers['custom'], 'header')
+
+        # CONNECT tunnels carry their own headers
+        headers = p._headers_for('https://pypi.python.org/', provided_headers)
+        self.assertEqual(headers, provided_headers)
+
     def test_default_port(self):
         p = ProxyManager('http://something')
         self.assertEqual(p.proxy.port, 80)
@@ -0,0 +1,109 @@
+import unittest
+import functools
+import trollius as asyncio
+from trollius import From
+from trollius.queues import QueueEmpty, QueueFull
+
+import sys
+sys.path.append('../../')
+
+from yieldfrom_t.urllib3.util.queue import LifoWaiterQueue
+
+
+def async_test(f):
+
+    testLoop = asyncio.get_event_loop()
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        coro = asyncio.coroutine(f)
+        future = coro(*args, **kwargs)
+        testLoop.run_until_complete(future)
+    return wrapper
+
+async_test.__test__ = False # not a test
+
+
+class TestLifoWaiterQueue(unittest.TestCase):
+
+    def test_lifo(self):
+        q = LifoWaiterQueue(3)
+        for i in range(3):
+            q.put_nowait(i)
+
+        self.assertTrue(q.full())
+        self.assertRaises(QueueFull, q.put_nowait, 3)
+
+        self.assertEqual([q.get_nowait() for _ in range(3)], [2, 1, 0])
+        self.assertRaises(QueueEmpty, q.get_nowait)
+
+    @async_test
+    def test_fifo_waiters(self):
+        q = LifoWaiterQueue(1)
+        order = []
+
+        @asyncio.coroutine
+        def waiter(name, priority=0):
+            item = yield From(q.get(priority=priority))
+            order.append((name, item))
+
+        tasks = [asyncio.Task(waiter(name)) for name in 'abc']
+        yield From(asyncio.sleep(0))
+        self.assertEqual(q.waiting(), 3)
+
+        for item in range(3):
+            q.put_nowait(item)
+            yield From(asyncio.sleep(0))
+
+        yield From(asyncio.wait(tasks))
+        self.assertEqual(order, [('a', 0), ('b', 1), ('c', 2)])
+        self.assertEqual(q.qsize(), 0)
+
+    @async_test
+    def test_priority_waiters(self):
+        q = LifoWaiterQueue(1)
+        order = []
+
+        @asyncio.coroutine
+        def waiter(name, priority):
+            yield From(q.get(priority=priority))
+            order.append(name)
+
+        tasks = [asyncio.Task(waiter('low', 1)),
+                 asyncio.Task(waiter('high', 0))]
+        yield From(asyncio.sleep(0))
+
+        q.put_nowait(None)
+        q.put_nowait(None)
+        yield From(asyncio.wait(tasks))
+        self.assertEqual(order, ['high', 'low'])
+
+    @async_test
+    def test_timeout(self):
+        q = LifoWaiterQueue(1)
+        try:
+            yield From(q.get(timeout=0.01))
+            self.fail("QueueEmpty not raised")
+        except QueueEmpty:
+            pass
+
+        # The expired waiter doesn't swallow the next item
+        q.put_nowait('conn')
+        self.assertEqual(q.get_nowait(), 'conn')
+
+    @async_test
+    def test_fail_waiters(self):
+        q = LifoWaiterQueue(1)
+        task = asyncio.Task(q.get())
+        yield From(asyncio.sleep(0))
+
+        q.fail_waiters(ValueError())
+        try:
+            yield From(task)
+            self.fail("ValueError not raised")
+        except ValueError:
+            pass
+
+
+if __name__ == '__main__':
+    unittest.main()
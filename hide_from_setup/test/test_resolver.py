@@ -0,0 +1,107 @@
+import unittest
+import functools
+import socket
+import trollius as asyncio
+from trollius import From
+
+from mock import patch
+
+import sys
+sys.path.append('../../')
+
+from yieldfrom_t.urllib3.util.resolver import Resolver
+
+
+def async_test(f):
+
+    testLoop = asyncio.get_event_loop()
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        coro = asyncio.coroutine(f)
+        future = coro(*args, **kwargs)
+        testLoop.run_until_complete(future)
+    return wrapper
+
+async_test.__test__ = False # not a test
+
+
+INFO = (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('192.0.2.1', 80))
+
+
+class TestResolver(unittest.TestCase):
+
+    @async_test
+    def test_cache_hit(self):
+        resolver = Resolver(ttl=60)
+        with patch('socket.getaddrinfo', return_value=[INFO]) as gai:
+            for _ in range(3):
+                infos = yield From(resolver.getaddrinfo('example.com', 80))
+                self.assertEqual(infos, [INFO])
+        self.assertEqual(gai.call_count, 1)
+        self.assertEqual((resolver.hits, resolver.misses), (2, 1))
+        self.assertAlmostEqual(resolver.hit_rate, 2.0 / 3)
+
+    @async_test
+    def test_ttl_expiry(self):
+        resolver = Resolver(ttl=60)
+        with patch('socket.getaddrinfo', return_value=[INFO]) as gai:
+            with patch('yieldfrom_t.urllib3.util.resolver.current_time',
+                       return_value=1000):
+                yield From(resolver.getaddrinfo('example.com', 80))
+            with patch('yieldfrom_t.urllib3.util.resolver.current_time',
+                       return_value=1061):
+                yield From(resolver.getaddrinfo('example.com', 80))
+        self.assertEqual(gai.call_count, 2)
+
+    @async_test
+    def test_coalesced(self):
+        resolver = Resolver()
+        with patch('socket.getaddrinfo', return_value=[INFO]) as gai:
+            results = yield From(asyncio.gather(*[
+                resolver.getaddrinfo('example.com', 80) for _ in range(5)]))
+        self.assertEqual(results, [[INFO]] * 5)
+        self.assertEqual(gai.call_count, 1)
+        self.assertEqual(resolver.coalesced, 4)
+
+    @async_test
+    def test_negative_cache(self):
+        resolver = Resolver(negative_ttl=10)
+        error = socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+        raised = []
+        with patch('socket.getaddrinfo', side_effect=error) as gai:
+            for _ in range(3):
+                try:
+                    yield From(resolver.getaddrinfo('nope.invalid', 80))
+                    self.fail("gaierror not raised")
+                except socket.gaierror as e:
+                    raised.append(e)
+        self.assertEqual(gai.call_count, 1)
+        # Cache hits raise a new error, with the same arguments.
+        self.assertEqual([e.args for e in raised], [error.args] * 3)
+        self.assertFalse(raised[1] is raised[2])
+        self.assertEqual(resolver.negative_hits, 2)
+
+    @async_test
+    def test_overrides(self):
+        resolver = Resolver(overrides={'pinned': ['192.0.2.7', '2001:db8::7']})
+        with patch('socket.getaddrinfo') as gai:
+            infos = yield From(resolver.getaddrinfo('pinned', 443))
+            v6 = yield From(resolver.getaddrinfo('pinned', 443,
+                                                 family=socket.AF_INET6))
+        self.assertFalse(gai.called)
+        self.assertEqual([info[4] for info in infos],
+                         [('192.0.2.7', 443), ('2001:db8::7', 443, 0, 0)])
+        self.assertEqual([info[4] for info in v6], [('2001:db8::7', 443, 0, 0)])
+
+    @async_test
+    def test_dedicated_executor(self):
+        resolver = Resolver(max_workers=2)
+        with patch('socket.getaddrinfo', return_value=[INFO]):
+            infos = yield From(resolver.getaddrinfo('example.com', 80))
+        self.assertEqual(infos, [INFO])
+        resolver.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -487,11 +487,94 @@ class TestResponse(unittest.TestCase):
         self.assertEqual(next(stream), b'o')
         self.assertRaises(StopIteration, next, stream)
 
+    @async_test
+    def test_chunk_reader(self):
+        fp = self._fake_fp(b'foo')
+        resp = HTTPResponse(fp, preload_content=False)
+        reader = resp.chunk_reader(2, decode_content=False)
+
+        self.assertEqual((yield From(reader.next_chunk())), b'fo')
+        self.assertEqual(resp.tell(), 2)
+        self.assertEqual((yield From(reader.next_chunk())), b'o')
+        self.assertEqual((yield From(reader.next_chunk())), None)
+        self.assertEqual((yield From(reader.next_chunk())), None)
+
+    @async_test
+    def test_gzipped_chunk_reader(self):
+        import zlib
+        compress = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        data = compress.compress(b'foo' * 100)
+        data += compress.flush()
+
+        fp = self._fake_fp(data)
+        resp = HTTPResponse(fp, headers={'content-encoding': 'gzip'},
+                            preload_content=False)
+        reader = resp.chunk_reader(2)
+
+        parts = []
+        while True:
+            block = yield From(reader.next_chunk())
+            if block is None:
+                break
+            self.assertTrue(block)
+            parts.append(block)
+
+        self.assertEqual(b''.join(parts), b'foo' * 100)
+        self.assertEqual(resp.tell(), len(data))
+
+    @async_test
+    def test_chunk_reader_body_blob(self):
+        resp = HTTPResponse(b'foo')
+        reader = resp.chunk_reader()
+
+        self.assertEqual((yield From(reader.next_chunk())), b'foo')
+        self.assertEqual((yield From(reader.next_chunk())), None)
+
+    @async_test
+    def test_chunk_reader_preloaded(self):
+        fp = self._fake_fp(b'foo')
+        resp = HTTPResponse(fp, preload_content=True)
+        yield From(resp.init())
+        reader = resp.chunk_reader()
+
+        self.assertEqual((yield From(reader.next_chunk())), b'foo')
+        self.assertEqual((yield From(reader.next_chunk())), None)
+
     def test_get_case_insensitive_headers(self):
         headers = {'host': 'example.com'}
         r = HTTPResponse(headers=headers)
         self.assertEqual(r.headers.get('host'), 'example.com')
         self.assertEqual(r.headers.get('Host'), 'example.com')
 
+    def test_raw_headers_lazy(self):
+        raw = [('Location', '/a'), ('Set-Cookie', 'a=1'),
+               ('Set-Cookie', 'b=2'), ('Content-Length', '0')]
+        r = HTTPResponse(headers=raw, status=302, preload_content=False)
+
+        self.assertEqual(r.get_redirect_location(), '/a')
+        self.assertEqual(r.getheader('content-length'), '0')
+        self.assertEqual(r.getheader('Content-Encoding', 'none'), 'none')
+        self.assertTrue(r._headers is None)
+
+        self.assertEqual(r.getheader('set-cookie'), 'a=1, b=2')
+        self.assertEqual(r.headers.getlist('Set-Cookie'), ['a=1', 'b=2'])
+        self.assertEqual(r.headers['LOCATION'], '/a')
+        self.assertTrue(r._raw_headers is None)
+
+    @async_test
+    def test_raw_headers_decode(self):
+        import zlib
+        data = zlib.compress(b'foo')
+        raw = [('CONTENT-ENCODING', 'deflate')]
+        r = HTTPResponse(BytesIO(data), headers=raw, preload_content=False)
+        self.assertEqual((yield From(r.read())), b'foo')
+        self.assertTrue(r._headers is None)
+
+    def test_set_headers(self):
+        r = HTTPResponse(headers=[('Location', '/a')], status=302)
+        r.headers = {'location': '/b'}
+        self.assertEqual(r.get_redirect_location(), '/b')
+        self.assertEqual(r.getheader('Location'), '/b')
+
 if __name__ == '__main__':
     unittest.main()
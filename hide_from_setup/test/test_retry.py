@@ -1,4 +1,5 @@
 import unittest
+import trollius as asyncio
 
 import sys
 sys.path.append('../../')
@@ -137,7 +138,33 @@ class RetryTest(unittest.TestCase):
         retry = Retry(backoff_factor=0.0001)
         retry = retry.increment()
         retry = retry.increment()
-        retry.sleep()
+        asyncio.get_event_loop().run_until_complete(retry.sleep())
+
+    def test_backoff_jitter(self):
+        """ Jittered backoff stays within its bounds """
+        retry = Retry(total=100, backoff_factor=0.2, backoff_jitter='full')
+        for _ in xrange(4):
+            retry = retry.increment()
+        self.assertEqual(retry.get_backoff_time(), 1.6)
+        for _ in xrange(20):
+            self.assertTrue(0 <= retry.get_jittered_backoff_time() <= 1.6)
+
+        retry = retry.new(backoff_jitter='equal')
+        for _ in xrange(20):
+            self.assertTrue(0.8 <= retry.get_jittered_backoff_time() <= 1.6)
+
+        retry = retry.new(backoff_jitter='decorrelated', _last_backoff=1.0)
+        for _ in xrange(20):
+            self.assertTrue(0.2 <= retry.get_jittered_backoff_time() <= 3.0)
+
+    def test_backoff_jitter_disabled(self):
+        retry = Retry(total=100, backoff_factor=0.2)
+        retry = retry.increment().increment().increment()
+        self.assertEqual(retry.get_jittered_backoff_time(),
+                         retry.get_backoff_time())
+
+    def test_backoff_jitter_invalid(self):
+        self.assertRaises(ValueError, Retry, backoff_jitter='sideways')
 
     def test_status_forcelist(self):
         retry = Retry(status_forcelist=xrange(500,600))
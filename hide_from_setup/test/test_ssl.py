@@ -0,0 +1,153 @@
+import unittest
+import functools
+import hashlib
+import trollius as asyncio
+from trollius import From
+
+from mock import patch
+
+import sys
+sys.path.append('../../')
+
+from yieldfrom_t.urllib3.exceptions import SSLError
+from yieldfrom_t.urllib3.util import ssl_
+from yieldfrom_t.urllib3.util.ssl_ import (
+    ResumingContext,
+    SSLContextCache,
+    VerifiedPeerCache,
+    assert_fingerprint,
+    resolve_cert_reqs,
+)
+
+
+def async_test(f):
+
+    testLoop = asyncio.get_event_loop()
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        coro = asyncio.coroutine(f)
+        future = coro(*args, **kwargs)
+        testLoop.run_until_complete(future)
+    return wrapper
+
+async_test.__test__ = False # not a test
+
+
+class TestFingerprints(unittest.TestCase):
+
+    cert = b'not really a certificate'
+
+    def test_sha256(self):
+        digest = hashlib.sha256(self.cert).hexdigest().upper()
+        assert_fingerprint(self.cert, ':'.join(
+            digest[i:i + 2] for i in range(0, len(digest), 2)))
+        self.assertRaises(SSLError, assert_fingerprint, b'other', digest)
+
+    def test_sha1_and_md5(self):
+        assert_fingerprint(self.cert, hashlib.sha1(self.cert).hexdigest())
+        assert_fingerprint(self.cert, hashlib.md5(self.cert).hexdigest())
+
+    def test_invalid_length(self):
+        self.assertRaises(SSLError, assert_fingerprint, self.cert, 'abcd')
+
+    def test_no_cert(self):
+        self.assertRaises(SSLError, assert_fingerprint, None, 'ab' * 32)
+
+
+class TestVerifiedPeerCache(unittest.TestCase):
+
+    def test_skips_repeat_checks(self):
+        cache = VerifiedPeerCache()
+        calls = []
+        verify = lambda: calls.append(1)
+
+        cache.check(b'cert', ('hostname', 'example.com'), verify)
+        cache.check(b'cert', ('hostname', 'example.com'), verify)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # Another host, or another certificate, is checked again.
+        cache.check(b'cert', ('hostname', 'example.org'), verify)
+        cache.check(b'cert2', ('hostname', 'example.com'), verify)
+        self.assertEqual(len(calls), 3)
+
+    def test_failures_not_remembered(self):
+        cache = VerifiedPeerCache()
+
+        def verify():
+            raise SSLError('mismatch')
+
+        for _ in range(2):
+            self.assertRaises(SSLError, cache.check, b'cert', 'check', verify)
+        self.assertEqual(cache.misses, 2)
+
+    def test_no_cert(self):
+        cache = VerifiedPeerCache()
+        self.assertRaises(SSLError, cache.check, None, 'check', lambda: None)
+
+
+class TestResumingContext(unittest.TestCase):
+
+    def test_offers_session(self):
+        class FakeContext(object):
+            check_hostname = False
+
+            def wrap_socket(self, sock, **kwargs):
+                return sock, kwargs
+
+            def wrap_bio(self, incoming, outgoing, **kwargs):
+                return kwargs
+
+        context = ResumingContext(FakeContext(), 'session')
+        self.assertEqual(context.wrap_socket('sock', server_hostname='h'),
+                         ('sock', {'server_hostname': 'h', 'session': 'session'}))
+        self.assertEqual(context.wrap_bio('in', 'out'), {'session': 'session'})
+        self.assertEqual(context.check_hostname, False)
+
+
+class TestSSLContextCache(unittest.TestCase):
+
+    @async_test
+    def test_reuses_context(self):
+        cache = SSLContextCache()
+        cert_reqs = resolve_cert_reqs('CERT_NONE')
+        with patch.object(ssl_, 'create_context',
+                          side_effect=lambda *a, **kw: object()) as create:
+            first = yield From(cache.get(cert_reqs=cert_reqs))
+            second = yield From(cache.get(cert_reqs=cert_reqs))
+            other = yield From(cache.get(cert_reqs=cert_reqs,
+                                         alpn_protocols=['h2']))
+
+        self.assertTrue(first is second)
+        self.assertFalse(first is other)
+        self.assertEqual(create.call_count, 2)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    @async_test
+    def test_concurrent_builds_coalesced(self):
+        cache = SSLContextCache()
+        with patch.object(ssl_, 'create_context',
+                          side_effect=lambda *a, **kw: object()) as create:
+            contexts = yield From(asyncio.gather(*[
+                cache.get(ca_certs='/ca.pem') for _ in range(5)]))
+
+        self.assertEqual(len(set(map(id, contexts))), 1)
+        self.assertEqual(create.call_count, 1)
+
+    @async_test
+    def test_failure_not_cached(self):
+        cache = SSLContextCache()
+        with patch.object(ssl_, 'create_context',
+                          side_effect=SSLError('no such file')) as create:
+            for _ in range(2):
+                try:
+                    yield From(cache.get(ca_certs='/missing.pem'))
+                    self.fail("SSLError not raised")
+                except SSLError:
+                    pass
+        self.assertEqual(create.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
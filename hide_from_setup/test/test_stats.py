@@ -0,0 +1,46 @@
+import unittest
+
+import sys
+sys.path.append('../../')
+
+from yieldfrom_t.urllib3.util.stats import PoolStats
+
+
+class TestPoolStats(unittest.TestCase):
+
+    def test_wait_histogram(self):
+        stats = PoolStats()
+        stats.record_wait(0)
+        stats.record_wait(0.005)
+        stats.record_wait(0.5)
+        stats.record_wait(60)
+
+        self.assertEqual(stats.wait_histogram, [1, 1, 0, 1, 0, 1])
+        self.assertEqual(stats.checkouts, 4)
+
+    def test_add(self):
+        a = PoolStats()
+        a.connections_created = 2
+        a.record_wait(0)
+        b = PoolStats()
+        b.connections_created = 3
+        b.bytes_received = 10
+        b.record_wait(0)
+
+        total = a + b
+        self.assertEqual(total.connections_created, 5)
+        self.assertEqual(total.bytes_received, 10)
+        self.assertEqual(total.checkouts, 2)
+        # Operands are left alone
+        self.assertEqual(a.connections_created, 2)
+
+    def test_as_dict(self):
+        stats = PoolStats()
+        stats.redirects = 1
+        d = stats.as_dict()
+        self.assertEqual(d['redirects'], 1)
+        self.assertEqual(d['wait_histogram'][-1], (None, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
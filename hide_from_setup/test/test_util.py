@@ -2,6 +2,7 @@ import warnings
 import logging
 import unittest
 import ssl
+import trollius as asyncio
 from itertools import chain
 
 from mock import patch
@@ -14,6 +15,7 @@ from yieldfrom_t.urllib3.util.request import make_headers
 from yieldfrom_t.urllib3.util.timeout import Timeout
 from yieldfrom_t.urllib3.util.url import (
     get_host,
+    normalize_host,
     parse_url,
     split_first,
     Url,
@@ -26,6 +28,7 @@ from yieldfrom_t.urllib3.exceptions import (
 )
 
 from yieldfrom_t.urllib3.util import is_fp_closed
+from yieldfrom_t.urllib3.util.connection import is_connection_dropped
 
 import sys
 sys.path.append('.')
@@ -147,6 +150,21 @@ class TestUtil(unittest.TestCase):
     def test_parse_url_invalid_IPv6(self):
         self.assertRaises(ValueError, parse_url, '[::1')
 
+    def test_parse_url_cached(self):
+        u = parse_url('http://google.com/mail?q=1')
+        self.assertTrue(parse_url('http://google.com/mail?q=1') is u)
+        self.assertFalse(hasattr(u, '__dict__'))
+
+        # Failures aren't cached.
+        self.assertRaises(LocationParseError, parse_url, 'http://a:b/')
+        self.assertRaises(LocationParseError, parse_url, 'http://a:b/')
+
+    def test_normalize_host(self):
+        self.assertEqual(normalize_host('Google.COM'), 'google.com')
+        self.assertEqual(normalize_host('[::1]'), '::1')
+        self.assertEqual(normalize_host('[FE80::1]'), 'fe80::1')
+        self.assertEqual(normalize_host(None), None)
+
     def test_Url_str(self):
         U = Url('http', host='google.com')
         self.assertEqual(str(U), U.url)
@@ -378,3 +396,38 @@ class TestUtil(unittest.TestCase):
             pass
 
         self.assertRaises(ValueError, is_fp_closed, NotReallyAFile())
+
+    def _stream_conn(self, closing=False):
+        class FakeTransport(object):
+            def is_closing(self):
+                return closing
+
+        class FakeWriter(object):
+            transport = FakeTransport()
+
+        class FakeNotSock(object):
+            reader = asyncio.StreamReader()
+            writer = FakeWriter()
+
+        class FakeConn(object):
+            notSock = FakeNotSock()
+
+        return FakeConn()
+
+    def test_connection_dropped_idle_stream(self):
+        conn = self._stream_conn()
+        self.assertFalse(is_connection_dropped(conn))
+
+    def test_connection_dropped_eof(self):
+        conn = self._stream_conn()
+        conn.notSock.reader.feed_eof()
+        self.assertTrue(is_connection_dropped(conn))
+
+    def test_connection_dropped_unexpected_bytes(self):
+        conn = self._stream_conn()
+        conn.notSock.reader.feed_data(b'HTTP/1.1 408 Request Timeout\r\n')
+        self.assertTrue(is_connection_dropped(conn))
+
+    def test_connection_dropped_transport_closing(self):
+        conn = self._stream_conn(closing=True)
+        self.assertTrue(is_connection_dropped(conn))
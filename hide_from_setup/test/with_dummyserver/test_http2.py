@@ -0,0 +1,74 @@
+import trollius as asyncio
+from trollius import From
+import functools
+
+import sys
+
+
+sys.path.extend(['..', '../..', '../../..'])
+
+from yieldfrom_t.urllib3 import HTTPSConnectionPool
+
+from hide_from_setup.dummyserver.testcase import HTTP2DummyServerTestCase
+
+
+def async_test(f):
+
+    testLoop = asyncio.get_event_loop()
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        coro = asyncio.coroutine(f)
+        future = coro(*args, **kwargs)
+        testLoop.run_until_complete(future)
+    return wrapper
+
+async_test.__test__ = False # not a test
+
+
+class TestHTTP2(HTTP2DummyServerTestCase):
+
+    def _pool(self, maxsize=2):
+        return HTTPSConnectionPool(self.host, self.port, cert_reqs='CERT_NONE',
+                                   http2=True, maxsize=maxsize, block=True)
+
+    @async_test
+    def test_multiplexed_requests(self):
+        self._start_h2_server()
+        pool = self._pool()
+
+        responses = yield From(asyncio.gather(*[
+            pool.request('GET', '/%d' % i, retries=0) for i in range(10)]))
+
+        self.assertEqual([r.data for r in responses],
+                         [('GET /%d' % i).encode() for i in range(10)])
+        self.assertTrue(all(r.version == 20 for r in responses))
+
+        # Ten concurrent requests, one connection.
+        self.assertEqual(pool.num_connections, 1)
+        self.assertEqual(len(set(r.headers['x-stream-id']
+                                 for r in responses)), 10)
+        pool.close()
+
+    @async_test
+    def test_max_concurrent_streams(self):
+        self._start_h2_server(max_concurrent_streams=2)
+        pool = self._pool(maxsize=1)
+
+        # The one connection takes two streams at a time; the others wait.
+        responses = yield From(asyncio.gather(*[
+            pool.request('GET', '/%d' % i, retries=0) for i in range(5)]))
+        self.assertEqual([r.status for r in responses], [200] * 5)
+        self.assertEqual(pool.num_connections, 1)
+        pool.close()
+
+    @async_test
+    def test_body_larger_than_window(self):
+        self._start_h2_server()
+        pool = self._pool()
+
+        # Bigger than the initial 64KiB flow-control window.
+        body = b'x' * 200000
+        r = yield From(pool.urlopen('POST', '/upload', body=body, retries=0))
+        self.assertEqual(r.data, b'POST /upload' + body)
+        pool.close()
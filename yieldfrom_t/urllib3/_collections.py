@@ -1,4 +1,7 @@
-from collections import Mapping, MutableMapping
+try:  # Python 3.3+
+    from collections.abc import Mapping, MutableMapping
+except ImportError:
+    from collections import Mapping, MutableMapping
 try:
     from threading import RLock
 except ImportError: # Platform-specific: No threads available
@@ -17,12 +20,34 @@ except ImportError:
 from .packages.six import itervalues
 
 
-__all__ = ['RecentlyUsedContainer', 'HTTPHeaderDict']
+__all__ = ['RecentlyUsedContainer', 'LoopRecentlyUsedContainer',
+           'HTTPHeaderDict']
 
 
 _Null = object()
 
 
+class _NullLock(object):
+    """ Lock interface that doesn't lock, for single event loop use. """
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+if hasattr(OrderedDict, 'move_to_end'):  # Python 3.2+
+    def _move_to_end(container, key):
+        container.move_to_end(key)
+        return container[key]
+else:
+    def _move_to_end(container, key):
+        item = container.pop(key)
+        container[key] = item
+        return item
+
+
 class RecentlyUsedContainer(MutableMapping):
     """
     Provides a thread-safe dict-like container which maintains up to
@@ -47,26 +72,39 @@ class RecentlyUsedContainer(MutableMapping):
         self.lock = RLock()
 
     def __getitem__(self, key):
-        # Re-insert the item, moving it to the end of the eviction line.
+        # Move the item to the end of the eviction line.
         with self.lock:
-            item = self._container.pop(key)
-            self._container[key] = item
-            return item
+            return _move_to_end(self._container, key)
 
     def __setitem__(self, key, value):
-        evicted_value = _Null
+        evicted_key = evicted_value = _Null
         with self.lock:
             # Possibly evict the existing value of 'key'
-            evicted_value = self._container.get(key, _Null)
+            replaced_value = self._container.get(key, _Null)
             self._container[key] = value
 
-            # If we didn't evict an existing value, we might have to evict the
-            # least recently used item from the beginning of the container.
+            # If we didn't evict an existing value, we might have to evict
+            # an item, by default the least recently used, to make room.
             if len(self._container) > self._maxsize:
-                _key, evicted_value = self._container.popitem(last=False)
+                evicted_key = self._evict_key(key)
+                evicted_value = self._container.pop(evicted_key)
 
-        if self.dispose_func and evicted_value is not _Null:
-            self.dispose_func(evicted_value)
+        if self.dispose_func and replaced_value is not _Null:
+            self.dispose_func(replaced_value)
+        if evicted_value is not _Null:
+            self._evicted(evicted_key, evicted_value)
+
+    def _evict_key(self, newest):
+        """
+        Key of the item to evict to make room for ``newest``. Subclasses may
+        pick another than the least recently used one.
+        """
+        return next(iter(self._container))
+
+    def _evicted(self, key, value):
+        """ Called with each item evicted to make room. """
+        if self.dispose_func:
+            self.dispose_func(value)
 
     def __delitem__(self, key):
         with self.lock:
@@ -97,6 +135,125 @@ class RecentlyUsedContainer(MutableMapping):
         with self.lock:
             return self._container.keys()
 
+    def values(self):
+        with self.lock:
+            return list(self._container.values())
+
+
+class LoopRecentlyUsedContainer(RecentlyUsedContainer):
+    """
+    :class:`RecentlyUsedContainer` for use from a single event loop, where
+    nothing can run between two statements. It takes no lock, and lookups,
+    membership tests and misses don't go through exceptions or
+    re-insertion. ``lock`` is kept as a no-op for code written against the
+    thread-safe class.
+
+    :param maxsize:
+        Maximum number of items, or with ``weigh``, maximum total weight.
+
+    :param dispose_func:
+        Called with every value evicted, deleted or replaced.
+
+    :param weigh:
+        If given, ``weigh(value)`` is the size of an item, and the least
+        recently used items are evicted while the total exceeds ``maxsize``.
+        The newest item is kept even if it alone exceeds ``maxsize``.
+    """
+
+    def __init__(self, maxsize=10, dispose_func=None, weigh=None):
+        RecentlyUsedContainer.__init__(self, maxsize, dispose_func)
+        self.lock = _NullLock()
+        self.weigh = weigh
+        self._weights = {}
+        #: Total weight of the items held, with ``weigh``.
+        self.weight = 0
+
+    def __getitem__(self, key):
+        return _move_to_end(self._container, key)
+
+    def get(self, key, default=None):
+        if key not in self._container:
+            return default
+        return _move_to_end(self._container, key)
+
+    def __contains__(self, key):
+        return key in self._container
+
+    def __setitem__(self, key, value):
+        container = self._container
+        replaced_value = container.get(key, _Null)
+        if replaced_value is not _Null:
+            del container[key]
+            self._forget(key)
+        container[key] = value
+        if self.weigh is not None:
+            self._weights[key] = weight = self.weigh(value)
+            self.weight += weight
+
+        evicted = []
+        while self._over_size():
+            evicted_key = self._evict_key(key)
+            evicted.append((evicted_key, container.pop(evicted_key)))
+            self._forget(evicted_key)
+
+        if self.dispose_func and replaced_value is not _Null:
+            self.dispose_func(replaced_value)
+        for evicted_key, evicted_value in evicted:
+            self._evicted(evicted_key, evicted_value)
+
+    def _over_size(self):
+        if self.weigh is None:
+            return len(self._container) > self._maxsize
+        return len(self._container) > 1 and self.weight > self._maxsize
+
+    def _forget(self, key):
+        weight = self._weights.pop(key, None)
+        if weight is not None:
+            self.weight -= weight
+
+    def __delitem__(self, key):
+        value = self._container.pop(key)
+        self._forget(key)
+        if self.dispose_func:
+            self.dispose_func(value)
+
+    def __len__(self):
+        return len(self._container)
+
+    def __iter__(self):
+        return iter(list(self._container))
+
+    def clear(self):
+        values = list(self._container.values())
+        self._container.clear()
+        self._weights.clear()
+        self.weight = 0
+
+        if self.dispose_func:
+            for value in values:
+                self.dispose_func(value)
+
+    def keys(self):
+        return list(self._container.keys())
+
+    def values(self):
+        return list(self._container.values())
+
+
+# Header names repeat from one response to the next; remember their lowercase
+# forms rather than computing them on every access.
+_lower_names = {}
+
+
+def _lower(name):
+    try:
+        return _lower_names[name]
+    except KeyError:
+        lower = name.lower()
+        if len(_lower_names) < 1024:
+            _lower_names[name] = lower
+        return lower
+
 
 class HTTPHeaderDict(MutableMapping):
     """
@@ -120,7 +277,7 @@ class HTTPHeaderDict(MutableMapping):
 
     If multiple fields that are equal case-insensitively are passed to the
     constructor or ``.update``, the behavior is undefined and some will be
-    lost.
+    lost. Passing another ``HTTPHeaderDict`` keeps every value.
 
     >>> headers = HTTPHeaderDict()
     >>> headers.add('Set-Cookie', 'foo=bar')
@@ -128,25 +285,62 @@ class HTTPHeaderDict(MutableMapping):
     >>> headers['content-length'] = '7'
     >>> headers['SET-cookie']
     'foo=bar, baz=quxx'
+    >>> headers.getlist('set-cookie')
+    ['foo=bar', 'baz=quxx']
     >>> headers['Content-Length']
     '7'
 
     If you want to access the raw headers with their original casing
     for debugging purposes you can access the private ``._data`` attribute
     which is a normal python ``dict`` that maps the case-insensitive key to a
-    list of tuples stored as (case-sensitive-original-name, value). Using the
-    structure from above as our example:
+    list holding the first case-sensitive name seen, then every value. Using
+    the structure from above as our example:
 
     >>> headers._data
-    {'set-cookie': [('Set-Cookie', 'foo=bar'), ('set-cookie', 'baz=quxx')],
-    'content-length': [('content-length', '7')]}
+    {'set-cookie': ['Set-Cookie', 'foo=bar', 'baz=quxx'],
+    'content-length': ['content-length', '7']}
+
+    Copies share their storage until either side is modified.
     """
 
+    __slots__ = ('_data', '_shared')
+
     def __init__(self, headers=None, **kwargs):
         self._data = {}
-        if headers is None:
-            headers = {}
-        self.update(headers, **kwargs)
+        self._shared = False
+        if isinstance(headers, HTTPHeaderDict) and not kwargs:
+            self._share(headers)
+        elif headers is not None or kwargs:
+            self.update(headers or {}, **kwargs)
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        """
+        Build from an iterable of ``(name, value)`` pairs, such as
+        ``httplib.HTTPResponse.getheaders()``, keeping repeated fields.
+        """
+        headers = cls()
+        data = headers._data
+        for name, value in pairs:
+            lower = _lower(name)
+            values = data.get(lower)
+            if values is None:
+                data[lower] = [name, value]
+            else:
+                values.append(value)
+        return headers
+
+    def _share(self, other):
+        other._shared = True
+        self._data = other._data
+        self._shared = True
+
+    def _own(self):
+        # Copy on the first write after the storage was shared.
+        if self._shared:
+            self._data = dict((key, values[:])
+                              for key, values in self._data.items())
+            self._shared = False
 
     def add(self, key, value):
         """Adds a (name, value) pair, doesn't overwrite the value if it already
@@ -157,43 +351,80 @@ class HTTPHeaderDict(MutableMapping):
         >>> headers['foo']
         'bar, baz'
         """
-        self._data.setdefault(key.lower(), []).append((key, value))
+        self._own()
+        lower = _lower(key)
+        values = self._data.get(lower)
+        if values is None:
+            self._data[lower] = [key, value]
+        else:
+            values.append(value)
+
+    def update(self, *args, **kwargs):
+        if len(args) == 1 and isinstance(args[0], HTTPHeaderDict):
+            # Keep every value of repeated fields.
+            self._own()
+            for key, values in args[0]._data.items():
+                self._data[key] = values[:]
+            args = ()
+        MutableMapping.update(self, *args, **kwargs)
 
     def getlist(self, key):
         """Returns a list of all the values for the named field. Returns an
         empty list if the key doesn't exist."""
-        return self[key].split(', ') if key in self else []
+        values = self._data.get(_lower(key))
+        if values is None:
+            return []
+        return values[1:]
 
     def copy(self):
         h = HTTPHeaderDict()
-        for key in self._data:
-            for rawkey, value in self._data[key]:
-                h.add(rawkey, value)
+        h._share(self)
         return h
 
     def __eq__(self, other):
         if not isinstance(other, Mapping):
             return False
-        other = HTTPHeaderDict(other)
+        if not isinstance(other, HTTPHeaderDict):
+            other = HTTPHeaderDict(other)
+        if self._data is other._data:
+            return True
         return dict((k1, self[k1]) for k1 in self._data) == \
                 dict((k2, other[k2]) for k2 in other._data)
 
+    def __ne__(self, other):
+        return not self == other
+
     def __getitem__(self, key):
-        values = self._data[key.lower()]
-        return ', '.join(value[1] for value in values)
+        values = self._data[_lower(key)]
+        if len(values) == 2:
+            return values[1]
+        return ', '.join(values[1:])
+
+    def get(self, key, default=None):
+        values = self._data.get(_lower(key))
+        if values is None:
+            return default
+        if len(values) == 2:
+            return values[1]
+        return ', '.join(values[1:])
+
+    def __contains__(self, key):
+        return _lower(key) in self._data
 
     def __setitem__(self, key, value):
-        self._data[key.lower()] = [(key, value)]
+        self._own()
+        self._data[_lower(key)] = [key, value]
 
     def __delitem__(self, key):
-        del self._data[key.lower()]
+        self._own()
+        del self._data[_lower(key)]
 
     def __len__(self):
         return len(self._data)
 
     def __iter__(self):
-        for headers in itervalues(self._data):
-            yield headers[0][0]
+        for values in itervalues(self._data):
+            yield values[0]
 
     def __repr__(self):
         return '%s(%r)' % (self.__class__.__name__, dict(self.items()))
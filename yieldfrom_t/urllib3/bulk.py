@@ -0,0 +1,227 @@
+import collections
+import logging
+
+import trollius as asyncio
+from trollius import From, Return
+
+from .connection import port_by_scheme
+from .util.url import normalize_host, parse_url
+
+
+log = logging.getLogger(__name__)
+
+
+class BulkResult(collections.namedtuple('BulkResult', [
+        'index', 'method', 'url', 'response', 'error'])):
+    """
+    Outcome of one request made by :meth:`PoolManager.request_many`.
+
+    ``index`` is the position of the request in the input. Exactly one of
+    ``response`` and ``error`` is None.
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _host_key(url):
+    u = parse_url(url)
+    scheme = (u.scheme or 'http').lower()
+    return (scheme, normalize_host(u.host),
+            u.port or port_by_scheme.get(scheme, 80))
+
+
+class RequestBatch(object):
+    """
+    Runs requests through a :class:`urllib3.poolmanager.PoolManager` with
+    bounded concurrency, handing results back in the order they complete.
+
+    Iterating gives one coroutine per request, like
+    :func:`asyncio.as_completed`; each resolves to the next finished
+    :class:`BulkResult`::
+
+        >>> for next_result in manager.request_many(requests, concurrency=20):
+        ...     result = yield From(next_result)
+
+    Requests are taken from the input only as slots open up, and a slot is
+    only freed once its result has been collected, so at most
+    ``concurrency`` requests are in flight or waiting to be collected at
+    any time. Iterating ahead of the results, as ``list(batch)`` does,
+    reads the rest of the input at once, though requests still start only
+    as slots open up. A failing request produces a result with ``error``
+    set; the rest of the batch carries on.
+
+    :param manager:
+        The :class:`urllib3.poolmanager.PoolManager` to send requests with.
+
+    :param requests:
+        Iterable of ``(method, url)`` or ``(method, url, kwargs)`` tuples,
+        ``kwargs`` being passed on to :meth:`PoolManager.request`. It may be
+        a generator, and is consumed lazily.
+
+    :param concurrency:
+        Maximum number of requests in flight or awaiting collection.
+
+    :param per_host:
+        Maximum number of requests in flight to any one scheme, host and
+        port. None means no limit besides ``concurrency``.
+    """
+
+    def __init__(self, manager, requests, concurrency=10, per_host=None):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+        if per_host is not None and per_host < 1:
+            raise ValueError("per_host must be at least 1, or None.")
+
+        self.manager = manager
+        self.concurrency = concurrency
+        self.per_host = per_host
+
+        self._requests = enumerate(requests)
+        self._exhausted = False
+        # Requests read from the input, and coroutines handed out for them.
+        self._num_taken = 0
+        self._num_issued = 0
+        self._running = 0
+        self._tasks = set()
+        self._host_counts = collections.defaultdict(int)
+        # Requests already taken from the input, waiting for their host.
+        self._held = collections.OrderedDict()
+        self._num_held = 0
+        self._done = collections.deque()
+        self._wakeup = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        self._fill()
+        if self._num_issued == self._num_taken and not self._take():
+            raise StopIteration
+        self._num_issued += 1
+        return self._next_result()
+
+    next = __next__  # Python 2
+
+    @property
+    def num_running(self):
+        return self._running
+
+    def _host_has_room(self, key):
+        return self.per_host is None or self._host_counts[key] < self.per_host
+
+    def _has_room(self):
+        return self._running + len(self._done) < self.concurrency
+
+    def _take_held(self):
+        for key, queue in self._held.items():
+            if self._host_has_room(key):
+                item = queue.popleft()
+                if not queue:
+                    del self._held[key]
+                self._num_held -= 1
+                return key, item
+        return None
+
+    def _take(self):
+        """
+        Read the next request from the input and hold it until a slot for
+        its host opens up. Returns False once the input is exhausted.
+        """
+        if self._exhausted:
+            return False
+        try:
+            index, request = next(self._requests)
+        except StopIteration:
+            self._exhausted = True
+            return False
+        self._num_taken += 1
+
+        try:
+            key = _host_key(request[1])
+        except Exception as e:
+            self._done.append(self._result(index, request, None, e))
+        else:
+            self._held.setdefault(key, collections.deque()).append(
+                (index, request))
+            self._num_held += 1
+        return True
+
+    def _fill(self):
+        while self._has_room():
+            held = self._take_held()
+            if held is not None:
+                self._start(*held)
+                continue
+
+            # Don't read further ahead than one batch's worth while hosts
+            # are saturated.
+            if self._num_held >= self.concurrency or not self._take():
+                return
+
+    def _start(self, key, item):
+        self._host_counts[key] += 1
+        self._running += 1
+        task = asyncio.Task(self._run(key, *item))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    def _result(index, request, response, error):
+        method, url = request[0], request[1]
+        return BulkResult(index, method, url, response, error)
+
+    @asyncio.coroutine
+    def _run(self, key, index, request):
+        response = error = None
+        try:
+            kw = request[2] if len(request) > 2 else {}
+            response = yield From(self.manager.request(request[0], request[1],
+                                                       **kw))
+        except asyncio.CancelledError:
+            self._finished(key)
+            raise
+        except Exception as e:
+            log.debug("Request %d of batch failed: %r" % (index, e))
+            error = e
+
+        self._done.append(self._result(index, request, response, error))
+        self._finished(key)
+
+    def _finished(self, key):
+        self._running -= 1
+        self._host_counts[key] -= 1
+        if not self._host_counts[key]:
+            del self._host_counts[key]
+        if self._wakeup is not None and not self._wakeup.done():
+            self._wakeup.set_result(None)
+
+    @asyncio.coroutine
+    def _next_result(self):
+        while not self._done:
+            self._fill()
+            if self._done:
+                break
+            if not self._running:
+                # Cancelled, or collected through another coroutine.
+                raise Return (None)
+            if self._wakeup is None or self._wakeup.done():
+                self._wakeup = asyncio.Future()
+            yield From(self._wakeup)
+
+        result = self._done.popleft()
+        self._fill()
+        raise Return (result)
+
+    def cancel(self):
+        """
+        Stop the batch: cancel the requests in flight and take no more from
+        the input.
+        """
+        self._exhausted = True
+        self._held.clear()
+        self._num_held = 0
+        for task in list(self._tasks):
+            task.cancel()
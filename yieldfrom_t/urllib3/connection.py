@@ -51,9 +51,14 @@ from .util.ssl_ import (
     resolve_cert_reqs,
     resolve_ssl_version,
     #ssl_wrap_socket,
-    create_context,
     assert_fingerprint,
+    default_context_cache,
+    HAS_SESSION_RESUMPTION,
+    ResumingContext,
+    verified_peers,
 )
+from .util.connection import get_stream
+from .util.resolver import Resolver
 
 
 #from .util import connection
@@ -65,10 +70,107 @@ port_by_scheme = {
 
 RECENT_DATE = datetime.date(2014, 1, 1)
 
+#: :class:`urllib3.util.resolver.Resolver` used by connections that weren't
+#: given one.
+default_resolver = Resolver()
+
+#: Seconds to give a connection attempt before racing the next address
+#: against it (the "Connection Attempt Delay" of RFC 8305).
+CONNECT_ATTEMPT_DELAY = 0.25
+
+
+def _interleave_families(addrinfos):
+    """
+    Reorder ``getaddrinfo`` results so address families alternate, starting
+    with the family of the first (most preferred) result, as RFC 8305
+    section 4 asks. Order within a family is kept.
+    """
+    by_family = []
+    for info in addrinfos:
+        for family, infos in by_family:
+            if family == info[0]:
+                infos.append(info)
+                break
+        else:
+            by_family.append((info[0], [info]))
+
+    interleaved = []
+    while by_family:
+        for family, infos in list(by_family):
+            interleaved.append(infos.pop(0))
+            if not infos:
+                by_family.remove((family, infos))
+    return interleaved
+
+
+def _close_quietly(ns):
+    close = getattr(ns, 'close', None)
+    if close is not None:
+        close()
+
+
+@asyncio.coroutine
+def _connect_happy_eyeballs(address, resolver, *args, **kwargs):
+    """
+    Connect to ``address`` over whichever resolved address answers first.
+
+    Attempts start ``CONNECT_ATTEMPT_DELAY`` seconds apart, or as soon as the
+    previous one fails, alternating between IPv6 and IPv4. The first
+    connection made wins and the other attempts are cancelled. If every
+    attempt fails, the first error seen is raised.
+    """
+    host, port = address[:2]
+    addrinfos = yield From(resolver.getaddrinfo(host, port,
+                                                type=socket.SOCK_STREAM))
+    sockaddrs = [info[4][:2] for info in _interleave_families(addrinfos)]
+    if not sockaddrs:
+        raise socket.gaierror(socket.EAI_NONAME,
+                              'No addresses found for %s' % host)
+
+    if kwargs.get('ssl') and not kwargs.get('server_hostname'):
+        # We connect to IPs, but the certificate is for the host.
+        kwargs['server_hostname'] = host
+
+    if len(sockaddrs) == 1:
+        _r = yield From(_create_connection(sockaddrs[0], *args, **kwargs))
+        raise Return (_r)
+
+    winner = None
+    errors = []
+    pending = set()
+    try:
+        while winner is None and (sockaddrs or pending):
+            delay = None
+            if sockaddrs:
+                pending.add(asyncio.Task(
+                    _create_connection(sockaddrs.pop(0), *args, **kwargs)))
+                if sockaddrs:
+                    delay = CONNECT_ATTEMPT_DELAY
+
+            done, pending = yield From(asyncio.wait(
+                pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED))
+            for task in done:
+                if task.exception() is not None:
+                    errors.append(task.exception())
+                elif winner is None:
+                    winner = task.result()
+                else:
+                    _close_quietly(task.result())
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if winner is None:
+        raise errors[0]
+    raise Return (winner)
+
+
 @asyncio.coroutine
 def create_connection(address, *args, **kwargs):
+    resolver = kwargs.pop('resolver', None) or default_resolver
     try:
-        _r = yield From(_create_connection(address, *args, **kwargs))
+        _r = yield From(_connect_happy_eyeballs(address, resolver,
+                                                *args, **kwargs))
         raise Return (_r)
     except (OSError, asyncio.TimeoutError) as e:
         raise ConnectTimeoutError
@@ -82,8 +184,15 @@ class HTTPConnection(_HTTPConnection):
     def __init__(self, *args, **kwargs):
         kwargs.pop('strict', None)
         kwargs.pop('socket_options', None)
+        #: :class:`urllib3.util.resolver.Resolver` for looking up the host;
+        #: None means :data:`default_resolver`.
+        self.resolver = kwargs.pop('resolver', None)
         _HTTPConnection.__init__(self, *args, **kwargs)
-        self._create_connection = create_connection
+        self._create_connection = self._resolve_and_connect
+
+    def _resolve_and_connect(self, address, *args, **kwargs):
+        return create_connection(address, *args, resolver=self.resolver,
+                                 **kwargs)
 
 
 # class HTTPConnection(_HTTPConnection, object):
@@ -187,6 +296,19 @@ class HTTPSConnection(HTTPConnection):
 
     default_port = port_by_scheme['https']
 
+    #: Protocols offered through ALPN, or None to not use ALPN.
+    alpn_protocols = None
+
+    #: ``(context, session)`` of an earlier connection to the same server,
+    #: offered for resumption when this connection uses the same context.
+    tls_session = None
+
+    #: Whether the last handshake resumed :attr:`tls_session`.
+    session_reused = False
+
+    #: Set by every handshake; cleared by whoever counts handshakes.
+    new_handshake = False
+
     def __init__(self, host, port=None, key_file=None, cert_file=None, strict=None, context=None,
                   source_address=None, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, check_hostname=False,
                   **kw):
@@ -212,15 +334,27 @@ class HTTPSConnection(HTTPConnection):
             server_hostname = self.host
         sni_hostname = server_hostname if ssl.HAS_SNI else None  # will be useful eventually
 
-        ns = yield From(self._create_connection((self.host, self.port), self.timeout,
-                                                       self.source_address, ssl=self._context,
-                                                       server_hostname=server_hostname))
-
-        self.notSock = ns
+        if self.alpn_protocols and hasattr(self._context, 'set_alpn_protocols'):
+            self._context.set_alpn_protocols(self.alpn_protocols)
 
         if self._tunnel_host:
+            # CONNECT to the proxy in the clear, then handshake with the
+            # server through the tunnel. self.host stays the proxy, so a
+            # closed tunnel reopens the same way and can live in the pool.
+            self.notSock = yield From(self._create_connection(
+                (self.host, self.port), self.timeout, self.source_address))
             yield From(self._tunnel())
-            self.auto_open = 0
+            yield From(self._start_tls(server_hostname))
+        else:
+            ns = yield From(self._create_connection((self.host, self.port), self.timeout,
+                                                           self.source_address,
+                                                           ssl=self._resuming_context(),
+                                                           server_hostname=server_hostname))
+            self.notSock = ns
+
+        self.new_handshake = True
+        self.session_reused = bool(getattr(self._ssl_object(), 'session_reused',
+                                           False))
 
         # self.sock = self._context.wrap_socket(self.sock, server_hostname=sni_hostname,
         #                                       do_handshake_on_connect=False)
@@ -232,6 +366,81 @@ class HTTPSConnection(HTTPConnection):
                 self.close()
                 raise
 
+    @asyncio.coroutine
+    def _start_tls(self, server_hostname):
+        """
+        Upgrade the open plain connection to TLS in place, keeping
+        ``notSock`` but swapping its streams, and the stream methods it
+        binds, for encrypted ones.
+        """
+        reader, transport = get_stream(self)
+        raw = transport.get_extra_info('socket')
+        # The new transport takes a duplicate of the socket; closing the
+        # plain transport then leaves the TCP connection open.
+        sock = socket.fromfd(raw.fileno(), raw.family, raw.type)
+        transport.close()
+
+        opening = asyncio.open_connection(sock=sock,
+                                          ssl=self._resuming_context(),
+                                          server_hostname=server_hostname)
+        timeout = self.timeout
+        if timeout is socket._GLOBAL_DEFAULT_TIMEOUT:
+            timeout = None
+        try:
+            reader, writer = yield From(asyncio.wait_for(opening, timeout))
+        except BaseException:
+            sock.close()
+            raise
+
+        ns = self.notSock
+        for name in ('reader', '_reader'):
+            if hasattr(ns, name):
+                setattr(ns, name, reader)
+        for name in ('writer', '_writer'):
+            if hasattr(ns, name):
+                setattr(ns, name, writer)
+        # NotSocket reads and writes through methods bound in its __init__.
+        ns.read = reader.read
+        ns.readline = reader.readline
+        ns.readexactly = reader.readexactly
+        ns.write = writer.write
+
+    def _resuming_context(self):
+        if HAS_SESSION_RESUMPTION and self.tls_session is not None:
+            context, session = self.tls_session
+            if context is self._context:
+                return ResumingContext(context, session)
+        return self._context
+
+    def _ssl_object(self):
+        if getattr(self, 'notSock', None) is None:
+            return None
+        reader, transport = get_stream(self)
+        ssl_object = None
+        if transport is not None:
+            ssl_object = transport.get_extra_info('ssl_object')
+        return ssl_object or self.notSock.socket()
+
+    def get_tls_session(self):
+        """
+        ``(context, session)`` of the open connection for resuming later, or
+        None if there isn't one.
+        """
+        if not HAS_SESSION_RESUMPTION:
+            return None
+        session = getattr(self._ssl_object(), 'session', None)
+        if session is None:
+            return None
+        return self._context, session
+
+    def selected_alpn_protocol(self):
+        """
+        The protocol the server picked through ALPN, or None if ALPN was not
+        used or the connection is not open.
+        """
+        select = getattr(self._ssl_object(), 'selected_alpn_protocol', None)
+        return select() if select is not None else None
+
 
 class VerifiedHTTPSConnection(HTTPSConnection):
     """
@@ -243,6 +452,10 @@ class VerifiedHTTPSConnection(HTTPSConnection):
     ssl_version = None
     assert_fingerprint = None
 
+    #: :class:`urllib3.util.ssl_.SSLContextCache` to take the context from;
+    #: None means :data:`urllib3.util.ssl_.default_context_cache`.
+    context_cache = None
+
     def set_cert(self, key_file=None, cert_file=None,
                  cert_reqs=None, ca_certs=None,
                  assert_hostname=None, assert_fingerprint=None):
@@ -271,11 +484,13 @@ class VerifiedHTTPSConnection(HTTPSConnection):
 
         server_hostname =  self._tunnel_host or self.host
 
-        self._context = create_context(self.key_file, self.cert_file,
-                                     cert_reqs=resolved_cert_reqs,
-                                     ca_certs=self.ca_certs,
-                                     server_hostname=server_hostname,
-                                     ssl_version=resolved_ssl_version)
+        context_cache = self.context_cache or default_context_cache
+        self._context = yield From(context_cache.get(
+            self.key_file, self.cert_file,
+            cert_reqs=resolved_cert_reqs,
+            ca_certs=self.ca_certs,
+            ssl_version=resolved_ssl_version,
+            alpn_protocols=self.alpn_protocols))
 
         yield From(super(VerifiedHTTPSConnection, self).connect())
 
@@ -288,13 +503,16 @@ class VerifiedHTTPSConnection(HTTPSConnection):
         #                             ssl_version=resolved_ssl_version)
 
         sock = self.notSock.socket()
+        cert = sock.getpeercert(binary_form=True)
         if self.assert_fingerprint:
-            assert_fingerprint(sock.getpeercert(binary_form=True),
-                               self.assert_fingerprint)
+            # One hash and a comparison: as cheap as a cache lookup.
+            assert_fingerprint(cert, self.assert_fingerprint)
         elif resolved_cert_reqs != ssl.CERT_NONE \
                 and self.assert_hostname is not False:
-            match_hostname(sock.getpeercert(),
-                           self.assert_hostname or server_hostname)
+            hostname = self.assert_hostname or server_hostname
+            verified_peers.check(
+                cert, ('hostname', hostname),
+                lambda: match_hostname(sock.getpeercert(), hostname))
 
         self.is_verified = (resolved_cert_reqs == ssl.CERT_REQUIRED
                             or self.assert_fingerprint is not None)
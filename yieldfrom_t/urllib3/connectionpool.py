@@ -9,7 +9,7 @@ import trollius as asyncio
 from trollius import From, Return
 
 #from queue import LifoQueue, Empty, Full
-from trollius.queues import LifoQueue, QueueEmpty, QueueFull
+from trollius.queues import QueueEmpty, QueueFull
 
 from .exceptions import (
     ClosedPoolError,
@@ -33,13 +33,17 @@ from .connection import (
     HTTPConnection, HTTPSConnection, VerifiedHTTPSConnection,
     HTTPException, BaseSSLError, ConnectionError
 )
+from .http2 import HTTP2Connection, ALPN_PROTOCOLS
+from .pipeline import PipelinedConnection, PipelineAborted, PIPELINE_METHODS
 from .request import RequestMethods
 from .response import HTTPResponse
 
-from .util.connection import is_connection_dropped
+from .util.connection import get_stream, is_connection_dropped
+from .util.queue import LifoWaiterQueue
 from .util.retry import Retry
-from .util.timeout import Timeout
-from .util.url import get_host
+from .util.stats import PoolStats
+from .util.timeout import Timeout, current_time
+from .util.url import get_host, normalize_host, parse_url
 
 
 xrange = six.moves.xrange
@@ -55,7 +59,7 @@ class ConnectionPool(object):
     """
 
     scheme = None
-    QueueCls = LifoQueue
+    QueueCls = LifoWaiterQueue
 
     def __init__(self, host, port=None):
         if not host:
@@ -111,7 +115,9 @@ class HTTPConnectionPool(ConnectionPool, RequestMethods):
         a time. When no free connections are available, the call will block
         until a connection has been released. This is a useful side effect for
         particular multithreaded situations where one does not want to use more
-        than maxsize connections per host to prevent flooding.
+        than maxsize connections per host to prevent flooding. Released
+        connections go to blocked callers in arrival order, by priority
+        (see ``pool_priority`` in :meth:`urlopen`).
 
     :param headers:
         Headers to include with all requests, unless other headers are given
@@ -128,6 +134,48 @@ class HTTPConnectionPool(ConnectionPool, RequestMethods):
         A dictionary with proxy headers, should not be used directly,
         instead, see :class:`urllib3.connectionpool.ProxyManager`"
 
+    :param idle_timeout:
+        If set, pooled connections left idle for longer than this many
+        seconds are closed by a background reaper task, started the first
+        time a connection is returned to the pool. See :meth:`reap_idle`.
+
+    :param min_size:
+        Number of idle connections the reaper always leaves open.
+
+    :param max_size:
+        Upper bound the pool may grow to. The pool starts with ``maxsize``
+        slots and grows one slot at a time, up to ``max_size``, whenever a
+        blocked caller has waited ``grow_after`` seconds, or (with
+        ``block=False``) instead of discarding a returned connection because
+        the pool is full. Empty slots above ``maxsize`` are removed again by
+        :meth:`reap_idle`. Defaults to ``maxsize``, a fixed size pool.
+
+    :param grow_after:
+        Seconds a blocked caller waits before the pool grows. See
+        ``max_size``.
+
+    :param max_overflow:
+        Only used with ``block=False``. If set, no more than this many
+        connections beyond the pool size are open at a time; further callers
+        wait for a connection as if ``block`` were True. Defaults to no
+        limit.
+
+    :param pipeline_depth:
+        If set above 1, requests without a body using an idempotent method
+        (see :data:`urllib3.pipeline.PIPELINE_METHODS`) are pipelined: up to
+        this many are sent back to back on one connection, before their
+        responses arrive, once every pool slot already carries a pipeline.
+        Responses are read in order and always preloaded. If the server
+        closes the connection part way, the requests that got no response
+        are sent again on another connection. Only enable this for servers
+        known to handle pipelining correctly. Not used through a proxy.
+
+    :param connection_budget:
+        A :class:`urllib3.util.budget.ConnectionBudget` shared with other
+        pools. A permit is taken from it for every connection the pool opens,
+        waiting (for up to ``pool_timeout``) while none is free, and given
+        back when the connection is discarded.
+
     :param \**conn_kw:
         Additional parameters are used to create fresh :class:`urllib3.connection.HTTPConnection`,
         :class:`urllib3.connection.HTTPSConnection` instances.
@@ -140,7 +188,9 @@ class HTTPConnectionPool(ConnectionPool, RequestMethods):
                  timeout=Timeout.DEFAULT_TIMEOUT, maxsize=1, block=False,
                  headers=None, retries=None,
                  _proxy=None, _proxy_headers=None,
-                 **conn_kw):
+                 idle_timeout=None, min_size=0,
+                 max_size=None, grow_after=0.1, max_overflow=None,
+                 pipeline_depth=None, connection_budget=None, **conn_kw):
         ConnectionPool.__init__(self, host, port)
         RequestMethods.__init__(self, headers)
 
@@ -165,9 +215,38 @@ class HTTPConnectionPool(ConnectionPool, RequestMethods):
         for _ in xrange(maxsize):
             self.pool.put_nowait(0)  # None fools coroutine handler
 
+        self.idle_timeout = idle_timeout
+        self.min_size = min_size
+        self._idle_since = {}
+        self._reaper = None
+
+        self.base_size = maxsize
+        self.max_size = max(maxsize, max_size or 0)
+        self.grow_after = grow_after
+        self.max_overflow = max_overflow
+        # One timer serves every blocked caller.
+        self._grow_handle = None
+
+        self.pipeline_depth = pipeline_depth
+        self._pipelines = []
+
+        self.budget = connection_budget
+        if self.budget is not None:
+            self.budget.register(self)
+
+        #: Set by :meth:`close_when_idle`.
+        self.closing = False
+
+        #: :class:`urllib3.util.stats.PoolStats` for this pool.
+        self.stats = PoolStats()
+
         # These are mostly for testing and debugging purposes.
         self.num_connections = 0
         self.num_requests = 0
+        self.num_reaped = 0
+        self.num_checked_out = 0
+        self.num_grown = 0
+        self.num_shrunk = 0
         self.conn_kw = conn_kw
 
         if self.proxy:
@@ -181,6 +260,7 @@ class HTTPConnectionPool(ConnectionPool, RequestMethods):
         Return a fresh :class:`HTTPConnection`.
         """
         self.num_connections += 1
+        self.stats.connections_created += 1
         log.info("Starting new HTTP connection (%d): %s" %
                  (self.num_connections, self.host))
 
@@ -190,7 +270,7 @@ class HTTPConnectionPool(ConnectionPool, RequestMethods):
         return conn
 
     @asyncio.coroutine
-    def _get_conn(self, timeout=None):
+    def _get_conn(self, timeout=None, priority=0):
         """
         Get a connection. Will return a pooled connection if one is available.
 
@@ -201,36 +281,67 @@ class HTTPConnectionPool(ConnectionPool, RequestMethods):
             Seconds to wait before giving up and raising
             :class:`urllib3.exceptions.EmptyPoolError` if the pool is empty and
             :prop:`.block` is ``True``.
+
+        :param priority:
+            When :prop:`.block` is ``True`` and callers are waiting, a released
+            connection goes to the longest waiting caller with the lowest
+            ``priority`` value.
         """
         conn = None
+        wait = False
+        started = current_time()
         try:
-            timeout = Timeout.from_float(timeout)
-            try:
-                conn = yield From(asyncio.wait_for(self.pool.get(), timeout.connect_timeout))
-                pass
-
-            except AttributeError:  # self.pool is None
+            if self.pool is None:
                 raise ClosedPoolError(self, "Pool is closed.")
 
-            except asyncio.TimeoutError:
-                raise QueueEmpty
+            wait = self.block or self._overflow_exhausted()
+            if wait:
+                if self.pool.empty():
+                    self._schedule_grow()
+
+                try:
+                    conn = yield From(self.pool.get(
+                        timeout=Timeout.from_float(timeout).connect_timeout,
+                        priority=priority))
+                finally:
+                    if self.pool is None or not self.pool.waiting():
+                        self._cancel_grow()
+            else:
+                conn = self.pool.get_nowait()
 
         except QueueEmpty:
-            if self.block:
+            if wait:
                 raise EmptyPoolError(self,
                                      "Pool reached maximum size and no more "
                                      "connections are allowed.")
             pass  # Oh well, we'll create a new connection then
 
+        if not conn and self.budget is not None:
+            try:
+                yield From(self.budget.acquire(self.host, timeout))
+            except BaseException as e:
+                # Give back the empty slot, if we took one.
+                if conn is not None and self.pool is not None:
+                    self.pool.put_nowait(0)
+                if isinstance(e, asyncio.TimeoutError):
+                    raise EmptyPoolError(self, "Connection budget exhausted.")
+                raise
+
+        self.num_checked_out += 1
+        self.stats.record_wait(current_time() - started)
+
+        if conn:
+            self._idle_since.pop(conn, None)
+
         # If this is a persistent connection, check if it got disconnected
         if conn and is_connection_dropped(conn):
             log.info("Resetting dropped connection: %s" % self.host)
+            self.stats.discarded_dropped += 1
+            # Reconnects on next use; a tunnelled connection goes through
+            # the proxy again.
             conn.close()
-            if getattr(conn, 'auto_open', 1) == 0:
-                # This is a proxied connection that has been mutated by
-                # httplib._tunnel() and cannot be reused (since it would
-                # attempt to bypass the proxy)
-                conn = None
+        elif conn:
+            self.stats.connections_reused += 1
 
         raise Return (conn or self._new_conn())
 
@@ -248,8 +359,22 @@ class HTTPConnectionPool(ConnectionPool, RequestMethods):
 
         If the pool is closed, then the connection will be closed and discarded.
         """
+        self.num_checked_out -= 1
+        if not conn:
+            # The connection it held was discarded.
+            self._release_budget()
         try:
+            if conn and self.pool.full() and self.size < self.max_size:
+                # Keep the connection rather than churn a handshake later.
+                self._resize(1)
             self.pool.put_nowait(conn or 0)
+            if conn and self.idle_timeout is not None:
+                self._idle_since[conn] = current_time()
+                if self._reaper is None:
+                    self.start_reaper()
+            if self.closing:
+                # After a waiter handed this connection has checked it out.
+                asyncio.get_event_loop().call_soon(self._close_if_idle)
             return  # Everything is dandy, done.
         except AttributeError:
             # self.pool is None.
@@ -259,10 +384,85 @@ class HTTPConnectionPool(ConnectionPool, RequestMethods):
             log.warning(
                 "Connection pool is full, discarding connection: %s" %
                 self.host)
+            self.stats.discarded_full += 1
 
         # Connection never got put back into the pool, close it.
         if conn:
             conn.close()
+            self._release_budget()
+
+    def _release_budget(self, num=1):
+        if self.budget is not None and num:
+            self.budget.release(self.host, num)
+
+    @property
+    def num_idle(self):
+        """ Number of open connections waiting in the pool. """
+        if self.pool is None:
+            return 0
+        return self.pool.num_items()
+
+    def release_idle(self, num=1):
+        """
+        Close up to ``num`` pooled connections, least recently used first,
+        leaving their slots empty. Returns the number closed.
+        """
+        if self.pool is None:
+            return 0
+
+        items = []
+        try:
+            while True:
+                items.append(self.pool.get_nowait())
+        except QueueEmpty:
+            pass
+
+        closed = 0
+        for i in reversed(xrange(len(items))):
+            if closed >= num:
+                break
+            if items[i]:
+                self._idle_since.pop(items[i], None)
+                items[i].close()
+                items[i] = 0
+                closed += 1
+
+        # Empty slots first, so the connections kept are handed out first.
+        for item in sorted(reversed(items), key=bool):
+            self.pool.put_nowait(item)
+
+        self._release_budget(closed)
+        return closed
+
+    @property
+    def num_active(self):
+        """
+        Number of connections checked out for requests, plus callers waiting
+        for one.
+        """
+        if self.pool is None:
+            return 0
+        return self.num_checked_out + self.pool.waiting()
+
+    def close_when_idle(self):
+        """
+        Close the pool as soon as :attr:`num_active` drops to zero, letting
+        requests in flight finish. The pool stays usable until then. Returns
+        True if it was closed straight away.
+        """
+        self.closing = True
+        return self._close_if_idle()
+
+    def keep_open(self):
+        """ Cancel :meth:`close_when_idle`. """
+        self.closing = False
+
+    def _close_if_idle(self):
+        if self.closing and self.pool is not None and not self.num_active:
+            log.info("Closing idle pool: %s" % self.host)
+            self.close()
+            return True
+        return self.pool is None
 
     @asyncio.coroutine
     def _validate_conn(self, conn):
@@ -271,6 +471,119 @@ class HTTPConnectionPool(ConnectionPool, RequestMethods):
         """
         yield None
 
+    @property
+    def size(self):
+        """ Current number of connection slots in the pool. """
+        if self.pool is None:
+            return 0
+        return self.pool.maxsize
+
+    def _resize(self, delta):
+        self.pool.maxsize += delta
+        if delta > 0:
+            self.num_grown += delta
+        else:
+            self.num_shrunk -= delta
+        log.info("Resized connection pool by %+d to %d: %s" %
+                 (delta, self.pool.maxsize, self.host))
+
+    def _schedule_grow(self):
+        if self._grow_handle is None and self.size < self.max_size:
+            self._grow_handle = asyncio.get_event_loop().call_later(
+                self.grow_after, self._grow_if_waiting)
+
+    def _cancel_grow(self):
+        if self._grow_handle is not None:
+            self._grow_handle.cancel()
+            self._grow_handle = None
+
+    def _grow_if_waiting(self):
+        self._grow_handle = None
+        if self.pool is None or not self.pool.waiting() or \
+                self.size >= self.max_size:
+            return
+        self._resize(1)
+        # The new, empty slot goes straight to the longest waiting caller.
+        self.pool.put_nowait(0)
+        if self.pool.waiting():
+            self._schedule_grow()
+
+    def _overflow_exhausted(self):
+        if self.max_overflow is None or not self.pool.empty():
+            return False
+        return self.num_checked_out >= self.size + self.max_overflow
+
+    def _take_empty_slots(self, num):
+        """
+        Remove up to ``num`` empty slots from the pool queue, leaving pooled
+        connections where they are. Returns how many were removed.
+        """
+        items = []
+        try:
+            while True:
+                items.append(self.pool.get_nowait())
+        except QueueEmpty:
+            pass
+
+        conns = [conn for conn in items if conn]
+        taken = min(num, len(items) - len(conns))
+        for _ in xrange(len(items) - len(conns) - taken):
+            self.pool.put_nowait(0)
+        for conn in reversed(conns):
+            self.pool.put_nowait(conn)
+
+        # The slots are out of the queue until _put_conn returns them.
+        self.num_checked_out += taken
+        return taken
+
+    @asyncio.coroutine
+    def prewarm(self, num=None):
+        """
+        Open (and for HTTPS, handshake) up to ``num`` connections
+        concurrently and place them in the pool, so that the first requests
+        don't pay for connection setup. Defaults to filling every empty slot.
+
+        Only empty slots are filled; returns the number of connections
+        opened. Connections that fail to open are dropped and their slots
+        left empty.
+        """
+        if self.pool is None:
+            raise ClosedPoolError(self, "Pool is closed.")
+
+        if num is None:
+            num = self.pool.maxsize
+        num = self._take_empty_slots(num)
+
+        # Only what the budget allows without waiting.
+        permitted = num
+        if self.budget is not None:
+            permitted = 0
+            while permitted < num and self.budget.try_acquire(self.host):
+                permitted += 1
+            for _ in xrange(num - permitted):
+                self.num_checked_out -= 1
+                self.pool.put_nowait(0)
+            num = permitted
+        if not num:
+            raise Return (0)
+
+        conns = [self._new_conn() for _ in xrange(num)]
+        results = yield From(asyncio.gather(*[conn.connect() for conn in conns],
+                                            return_exceptions=True))
+
+        opened = [conn for conn, result in zip(conns, results)
+                  if not isinstance(result, BaseException)]
+        for conn, result in zip(conns, results):
+            if isinstance(result, BaseException):
+                log.warning("Failed to prewarm connection to %s: %r" %
+                            (self.host, result))
+                conn.close()
+                self._put_conn(None)
+        for conn in opened:
+            self._put_conn(conn)
+
+        raise Return (len(opened))
+
     def _get_timeout(self, timeout):
         """ Helper that always returns a :class:`urllib3.util.Timeout` """
         if timeout is Timeout.DEFAULT_TIMEOUT:
@@ -309,50 +622,58 @@ class HTTPConnectionPool(ConnectionPool, RequestMethods):
         # Trigger any extra validation we need to do.
         yield From(self._validate_conn(conn))
 
-        # conn.request() calls httplib.*.request, not the method in
-        # urllib3.request. It also calls makefile (recv) on the socket.
-        yield From(conn.request(method, url, **httplib_request_kw))
-
-        # Reset the timeout for the recv() on the socket
-        read_timeout = timeout_obj.read_timeout
-        conn.timeout = read_timeout
-
-        # # App Engine doesn't have a sock attr
-        # if getattr(conn, 'sock', None):
-        #     # In Python 3 socket.py will catch EAGAIN and return None when you
-        #     # try and read into the file pointer created by http.client, which
-        #     # instead raises a BadStatusLine exception. Instead of catching
-        #     # the exception and assuming all BadStatusLine exceptions are read
-        #     # timeouts, check for a zero timeout before making the request.
-        #     if read_timeout == 0:
-        #         raise ReadTimeoutError(
-        #             self, url, "Read timed out. (read timeout=%s)" % read_timeout)
-        #     if read_timeout is Timeout.DEFAULT_TIMEOUT:
-        #         conn.sock.settimeout(socket.getdefaulttimeout())
-        #     else:  # None or a value
-        #         conn.sock.settimeout(read_timeout)
-
-        # Receive the response from the server
+        self.stats.in_flight += 1
         try:
-            httplib_response = yield From(conn.getresponse()) #buffering=True))
-        except asyncio.TimeoutError:
-            raise ReadTimeoutError(
-                self, url, "Read timed out. (read timeout=%s)" % self.timeout)
-
-        except BaseSSLError as e:
-            # Catch possible read timeouts thrown as SSL errors. If not the
-            # case, rethrow the original. We need to do this because of:
-            # http://bugs.python.org/issue10272
-            if 'timed out' in str(e) or \
-               'did not complete (read)' in str(e):  # Python 2.6
+            # conn.request() calls httplib.*.request, not the method in
+            # urllib3.request. It also calls makefile (recv) on the socket.
+            yield From(conn.request(method, url, **httplib_request_kw))
+
+            body = httplib_request_kw.get('body')
+            if body is not None and hasattr(body, '__len__'):
+                self.stats.bytes_sent += len(body)
+
+            # Reset the timeout for the recv() on the socket
+            read_timeout = timeout_obj.read_timeout
+            conn.timeout = read_timeout
+
+            # # App Engine doesn't have a sock attr
+            # if getattr(conn, 'sock', None):
+            #     # In Python 3 socket.py will catch EAGAIN and return None when you
+            #     # try and read into the file pointer created by http.client, which
+            #     # instead raises a BadStatusLine exception. Instead of catching
+            #     # the exception and assuming all BadStatusLine exceptions are read
+            #     # timeouts, check for a zero timeout before making the request.
+            #     if read_timeout == 0:
+            #         raise ReadTimeoutError(
+            #             self, url, "Read timed out. (read timeout=%s)" % read_timeout)
+            #     if read_timeout is Timeout.DEFAULT_TIMEOUT:
+            #         conn.sock.settimeout(socket.getdefaulttimeout())
+            #     else:  # None or a value
+            #         conn.sock.settimeout(read_timeout)
+
+            # Receive the response from the server
+            try:
+                httplib_response = yield From(conn.getresponse()) #buffering=True))
+            except asyncio.TimeoutError:
                 raise ReadTimeoutError(
-                        self, url, "Read timed out. (read timeout=%s)" % self.timeout)
-
-            raise
-
-        except OSError as e:
-            # catches socket-errors
-            raise
+                    self, url, "Read timed out. (read timeout=%s)" % self.timeout)
+
+            except BaseSSLError as e:
+                # Catch possible read timeouts thrown as SSL errors. If not the
+                # case, rethrow the original. We need to do this because of:
+                # http://bugs.python.org/issue10272
+                if 'timed out' in str(e) or \
+                   'did not complete (read)' in str(e):  # Python 2.6
+                    raise ReadTimeoutError(
+                            self, url, "Read timed out. (read timeout=%s)" % self.timeout)
+
+                raise
+
+            except OSError as e:
+                # catches socket-errors
+                raise
+        finally:
+            self.stats.in_flight -= 1
 
         # AppEngine doesn't have a version attr.
         http_version = getattr(conn, '_http_vsn_str', 'HTTP/?')
@@ -361,22 +682,213 @@ class HTTPConnectionPool(ConnectionPool, RequestMethods):
                                           httplib_response.length))
         raise Return (httplib_response)
 
+    def reap_idle(self, idle_timeout=None):
+        """
+        Close pooled connections that have been idle for longer than
+        ``idle_timeout`` seconds (defaults to the pool's ``idle_timeout``), or
+        that the server has already closed, always leaving the ``min_size``
+        most recently used ones open. Also shrinks a grown pool back towards
+        ``maxsize`` by removing empty slots.
+
+        Returns the number of connections closed, which is also added to
+        :attr:`num_reaped`.
+        """
+        if idle_timeout is None:
+            idle_timeout = self.idle_timeout
+        if self.pool is None:
+            return 0
+
+        # Newest first, as the LifoQueue hands them out.
+        items = []
+        try:
+            while True:
+                items.append(self.pool.get_nowait())
+        except QueueEmpty:
+            pass
+
+        now = current_time()
+        kept = []
+        reaped = 0
+        for conn in items:
+            if not conn:
+                continue
+            idle_since = self._idle_since.get(conn, now)
+            if idle_timeout is not None and len(kept) >= self.min_size and \
+                    (now - idle_since > idle_timeout or is_connection_dropped(conn)):
+                self._idle_since.pop(conn, None)
+                conn.close()
+                reaped += 1
+            else:
+                kept.append(conn)
+
+        # Drop empty slots the pool grew beyond its base size.
+        empty = len(items) - len(kept)
+        shrink = min(empty, self.size - self.base_size)
+        if shrink > 0:
+            self._resize(-shrink)
+            empty -= shrink
+
+        # Empty slots at the bottom, then the survivors oldest first so the
+        # most recently used connection is still handed out next.
+        for _ in xrange(empty):
+            self.pool.put_nowait(0)
+        for conn in reversed(kept):
+            self.pool.put_nowait(conn)
+
+        self._release_budget(reaped)
+        if reaped:
+            self.num_reaped += reaped
+            log.info("Reaped %d idle connection(s): %s" % (reaped, self.host))
+        return reaped
+
+    def start_reaper(self, interval=None):
+        """
+        Start the background task that calls :meth:`reap_idle` every
+        ``interval`` seconds (defaults to ``idle_timeout``) until the pool is
+        closed. Returns the task.
+        """
+        if self._reaper is not None:
+            return self._reaper
+        interval = interval or self.idle_timeout
+        self._reaper = asyncio.Task(self._reap_periodically(interval))
+        return self._reaper
+
+    @asyncio.coroutine
+    def _reap_periodically(self, interval):
+        while self.pool is not None:
+            yield From(asyncio.sleep(interval))
+            self.reap_idle()
+
     def close(self):
         """
         Close all pooled connections and disable the pool.
         """
         # Disable access to the pool
         old_pool, self.pool = self.pool, None
+        if old_pool is None:
+            return
+        self._cancel_grow()
+        old_pool.fail_waiters(ClosedPoolError(self, "Pool is closed."))
+
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        self._idle_since.clear()
+
+        if self.budget is not None:
+            self.budget.unregister(self)
+
+        for pipe in list(self._pipelines):
+            pipe.abort()
 
         try:
             while True:
                 conn = old_pool.get_nowait()
                 if conn:
                     conn.close()
+                    self._release_budget()
 
         except QueueEmpty:
             pass  # Done.
 
+    def _can_multiplex(self):
+        return False
+
+    def _can_pipeline(self, method, body):
+        return (self.pipeline_depth is not None and self.pipeline_depth > 1 and
+                body is None and not self.proxy and
+                method.upper() in PIPELINE_METHODS)
+
+    def _host_header(self):
+        host = self.host
+        if ':' in host:
+            host = '[%s]' % host
+        if self.port and self.port != port_by_scheme.get(self.scheme):
+            host = '%s:%d' % (host, self.port)
+        return host
+
+    def _pipeline_with_room(self):
+        if len(self._pipelines) < self.size:
+            # A free slot is better than queueing behind other requests.
+            return None
+        open_pipes = [pipe for pipe in self._pipelines if pipe.has_room()]
+        if not open_pipes:
+            return None
+        return min(open_pipes, key=lambda pipe: len(pipe._pending))
+
+    @asyncio.coroutine
+    def _new_pipeline(self, timeout_obj, pool_timeout, priority):
+        conn = yield From(self._get_conn(timeout=pool_timeout,
+                                         priority=priority))
+        try:
+            conn.timeout = timeout_obj.connect_timeout
+            yield From(self._validate_conn(conn))
+            if get_stream(conn)[0] is None:
+                yield From(conn.connect())
+        except BaseException:
+            conn.close()
+            self.stats.discarded_error += 1
+            self._put_conn(None)
+            raise
+
+        pipe = PipelinedConnection(conn, self._host_header(),
+                                   self.pipeline_depth, self._pipeline_idle)
+        self._pipelines.append(pipe)
+        raise Return (pipe)
+
+    def _pipeline_idle(self, pipe):
+        self._pipelines.remove(pipe)
+        self._put_conn(pipe.conn)
+
+    @asyncio.coroutine
+    def _make_pipelined_request(self, method, url, headers, timeout=Timeout.DEFAULT_TIMEOUT,
+                                pool_timeout=None, priority=0, **response_kw):
+        """
+        Send a request through a :class:`urllib3.pipeline.PipelinedConnection`
+        and return its preloaded :class:`urllib3.response.HTTPResponse`.
+        Requests left unanswered by a connection lost mid-pipeline are sent
+        again on another one without counting as a retry.
+        """
+        timeout_obj = self._get_timeout(timeout)
+        timeout_obj.start_connect()
+
+        while True:
+            pipe = self._pipeline_with_room()
+            if pipe is None:
+                pipe = yield From(self._new_pipeline(timeout_obj, pool_timeout,
+                                                     priority))
+
+            read_timeout = timeout_obj.read_timeout
+            if read_timeout is Timeout.DEFAULT_TIMEOUT:
+                read_timeout = None
+
+            self.num_requests += 1
+            self.stats.in_flight += 1
+            try:
+                result = yield From(pipe.request(method, url, headers,
+                                                 timeout=read_timeout))
+                break
+            except PipelineAborted:
+                log.info("Resending unanswered pipelined request: %s" % url)
+            except asyncio.TimeoutError:
+                raise ReadTimeoutError(
+                    self, url, "Read timed out. (read timeout=%s)" % read_timeout)
+            finally:
+                self.stats.in_flight -= 1
+
+        version, status, reason, response_headers, body = result
+        log.debug("\"%s %s HTTP/1.1\" %s %s (pipelined)" %
+                  (method, url, status, len(body)))
+
+        fp = asyncio.StreamReader()
+        fp.feed_data(body)
+        fp.feed_eof()
+        response = HTTPResponse(body=fp, headers=response_headers,
+                                status=status, version=version, reason=reason,
+                                pool=self, **response_kw)
+        yield From(response.init())
+        raise Return (response)
+
     def is_same_host(self, url):
         """
         Check if the given ``url`` is a member of the same host as this
@@ -386,7 +898,9 @@ class HTTPConnectionPool(ConnectionPool, RequestMethods):
             return True
 
         # TODO: Add optional support for socket.gethostbyname checking.
-        scheme, host, port = get_host(url)
+        u = parse_url(url)
+        scheme = (u.scheme or 'http').lower()
+        host, port = normalize_host(u.host), u.port
 
         # Use explicit default port for comparison when none is given
         if self.port and not port:
@@ -394,12 +908,14 @@ class HTTPConnectionPool(ConnectionPool, RequestMethods):
         elif not self.port and port == port_by_scheme.get(scheme):
             port = None
 
-        return (scheme, host, port) == (self.scheme, self.host, self.port)
+        return (scheme, host, port) == (self.scheme, self.host.lower(),
+                                        self.port)
 
     @asyncio.coroutine
     def urlopen(self, method, url, body=None, headers=None, retries=None,
                 redirect=True, assert_same_host=True, timeout=Timeout.DEFAULT_TIMEOUT,
-                pool_timeout=None, release_conn=None, **response_kw):
+                pool_timeout=None, release_conn=None, pool_priority=0,
+                **response_kw):
         """
         Get a connection from the pool and perform an HTTP request. This is the
         lowest level call for making a request, so you'll need to specify all
@@ -476,6 +992,11 @@ class HTTPConnectionPool(ConnectionPool, RequestMethods):
             back into the pool. If None, it takes the value of
             ``response_kw.get('preload_content', True)``.
 
+        :param pool_priority:
+            If the pool is set to block=True and has no free connection, callers
+            with a lower ``pool_priority`` are handed released connections
+            first. Callers of equal priority are served in arrival order.
+
         :param \**response_kw:
             Additional parameters are passed to
             :meth:`urllib3.response.HTTPResponse.from_httplib`
@@ -489,134 +1010,156 @@ class HTTPConnectionPool(ConnectionPool, RequestMethods):
         if release_conn is None:
             release_conn = response_kw.get('preload_content', True)
 
-        # Check host
-        if assert_same_host and not self.is_same_host(url):
-            raise HostChangedError(self, url, retries)
-
-        conn = None
-
         # Merge the proxy headers. Only do this in HTTP. We have to copy the
         # headers dict so we can safely change it without those changes being
-        # reflected in anyone else's copy.
+        # reflected in anyone else's copy. This is done once; the same headers
+        # are reused for every retry and redirect below.
         if self.scheme == 'http':
             headers = headers.copy()
             headers.update(self.proxy_headers)
 
-        # Must keep the exception bound to a separate variable or else Python 3
-        # complains about UnboundLocalError.
-        err = None
-
-        try:
-            # Request a connection from the queue.
-            conn = yield From(self._get_conn(timeout=pool_timeout))
-
-            # Make the request on the httplib connection object.
-            httplib_response = yield From(self._make_request(conn, method, url,
-                                                             timeout=timeout,
-                                                             body=body, headers=headers))
-            #if httplib_response.fp is None:
-            #    yield From(httplib_response.init() # necessary?)
-
-            # If we're going to release the connection in ``finally:``, then
-            # the request doesn't need to know about the connection. Otherwise
-            # it will also try to release it and we'll have a double-release
-            # mess.
-            response_conn = not release_conn and conn
-
-            # Import httplib's response into our own wrapper object
-            respGen = HTTPResponse.from_httplib(httplib_response,
-                                                 pool=self,
-                                                 connection=response_conn,
-                                                 **response_kw)
-
-            response = yield From(respGen)
-
-            # else:
-            #     The connection will be put back into the pool when
-            #     ``response.release_conn()`` is called (implicitly by
-            #     ``response.read()``)
-
-        except QueueEmpty:
-            # Timed out by queue.
-            raise EmptyPoolError(self, "No pool connections are available.")
-
-        except (BaseSSLError, CertificateError) as e:
-            # Release connection unconditionally because there is no way to
-            # close it externally in case of exception.
-            release_conn = True
-            raise SSLError(e)
-
-        except (TimeoutError, HTTPException, SocketError, ConnectionError) as e:
-            if conn:
-                # Discard the connection for these exceptions. It will be
-                # be replaced during the next _get_conn() call.
-                conn.close()
-                conn = None
-
-            stacktrace = sys.exc_info()[2]
-            if isinstance(e, (SocketError, ConnectTimeoutError)) and self.proxy:
-                e = ProxyError('Cannot connect to proxy.', e)
-            elif isinstance(e, (SocketError, HTTPException)):
-                e = ProtocolError('Connection aborted.', e)
+        # Retries and redirects loop here rather than recursing, so that a
+        # long chain costs one frame and one copy of the headers.
+        while True:
+            # Check host
+            if assert_same_host and not self.is_same_host(url):
+                raise HostChangedError(self, url, retries)
 
-            retries = retries.increment(method, url, error=e,
-                                        _pool=self, _stacktrace=stacktrace)
-            retries.sleep()
+            conn = None
+            response = None
+            checked_out = False
 
-            # Keep track of the error for the retry warning.
-            err = e
+            # A streamed body, such as a MultipartEncoder, is sent again from
+            # the start on a retry.
+            if hasattr(body, 'rewind'):
+                body.rewind()
 
-        finally:
-            if release_conn:
-                # Put the connection back to be reused. If the connection is
-                # expired then it will be None, which will get replaced with a
-                # fresh connection during _get_conn.
-                self._put_conn(conn)
-
-        if not conn:
-            # Try again
-            log.warning("Retrying (%r) after connection "
-                        "broken by '%r': %s" % (retries, err, url))
-            _d = yield From(self.urlopen(method, url, body, headers, retries,
-                                redirect, assert_same_host,
-                                timeout=timeout, pool_timeout=pool_timeout,
-                                release_conn=release_conn, **response_kw))
-            raise Return (_d)
-
-        # Handle redirect?
-        redirect_location = redirect and response.get_redirect_location()
-        if redirect_location:
-            if response.status == 303:
-                method = 'GET'
+            # Must keep the exception bound to a separate variable or else
+            # Python 3 complains about UnboundLocalError.
+            err = None
 
             try:
+                if self._can_pipeline(method, body):
+                    # The pipeline owns its connection; the response comes
+                    # back fully read.
+                    response = yield From(self._make_pipelined_request(
+                        method, url, headers, timeout=timeout,
+                        pool_timeout=pool_timeout, priority=pool_priority,
+                        **response_kw))
+                elif self._can_multiplex():
+                    # None if the server turns out not to speak HTTP/2.
+                    response = yield From(self._make_multiplexed_request(
+                        method, url, body, headers, timeout=timeout,
+                        pool_timeout=pool_timeout, priority=pool_priority,
+                        **response_kw))
+
+                if response is None:
+                    # Request a connection from the queue.
+                    conn = yield From(self._get_conn(timeout=pool_timeout,
+                                                     priority=pool_priority))
+                    checked_out = True
+
+                    # Make the request on the httplib connection object.
+                    httplib_response = yield From(self._make_request(conn, method, url,
+                                                                     timeout=timeout,
+                                                                     body=body, headers=headers))
+
+                    # If we're going to release the connection in ``finally:``,
+                    # then the request doesn't need to know about the connection.
+                    # Otherwise it will also try to release it and we'll have a
+                    # double-release mess.
+                    response_conn = not release_conn and conn
+
+                    # Import httplib's response into our own wrapper object
+                    response = yield From(HTTPResponse.from_httplib(httplib_response,
+                                                                    pool=self,
+                                                                    connection=response_conn,
+                                                                    **response_kw))
+
+                # else:
+                #     The connection will be put back into the pool when
+                #     ``response.release_conn()`` is called (implicitly by
+                #     ``response.read()``)
+
+            except QueueEmpty:
+                # Timed out by queue.
+                raise EmptyPoolError(self, "No pool connections are available.")
+
+            except (BaseSSLError, CertificateError) as e:
+                # Release connection unconditionally because there is no way to
+                # close it externally in case of exception.
+                release_conn = True
+                raise SSLError(e)
+
+            except (TimeoutError, HTTPException, SocketError, ConnectionError) as e:
+                if conn:
+                    # Discard the connection for these exceptions. It will be
+                    # be replaced during the next _get_conn() call.
+                    conn.close()
+                    conn = None
+                    self.stats.discarded_error += 1
+
+                stacktrace = sys.exc_info()[2]
+                if isinstance(e, (SocketError, ConnectTimeoutError)) and self.proxy:
+                    e = ProxyError('Cannot connect to proxy.', e)
+                elif isinstance(e, (SocketError, HTTPException)):
+                    e = ProtocolError('Connection aborted.', e)
+
+                retries = retries.increment(method, url, error=e,
+                                            _pool=self, _stacktrace=stacktrace)
+                self.stats.retries += 1
+                yield From(retries.sleep())
+
+                # Keep track of the error for the retry warning.
+                err = e
+
+            finally:
+                if checked_out and (release_conn or not conn):
+                    # Put the connection back to be reused. If the connection
+                    # is expired then it will be None, which will get replaced
+                    # with a fresh connection during _get_conn. A discarded
+                    # connection always gives its slot back.
+                    self._put_conn(conn)
+
+            if response is None:
+                # Try again
+                log.warning("Retrying (%r) after connection "
+                            "broken by '%r': %s" % (retries, err, url))
+                continue
+
+            # Handle redirect?
+            redirect_location = redirect and response.get_redirect_location()
+            if redirect_location:
+                if response.status == 303:
+                    method = 'GET'
+
+                try:
+                    retries = retries.increment(method, url, response=response, _pool=self)
+                except MaxRetryError:
+                    if retries.raise_on_redirect:
+                        raise
+                    raise Return (response)
+
+                self.stats.redirects += 1
+
+                # Hand the connection back, so a redirect to the same host
+                # goes out on the connection we already have.
+                yield From(response.drain_conn())
+
+                log.info("Redirecting %s -> %s" % (url, redirect_location))
+                url = redirect_location
+                continue
+
+            # Check if we should retry the HTTP response.
+            if retries.is_forced_retry(method, status_code=response.status):
                 retries = retries.increment(method, url, response=response, _pool=self)
-            except MaxRetryError:
-                if retries.raise_on_redirect:
-                    raise
-                raise Return (response)
-
-            log.info("Redirecting %s -> %s" % (url, redirect_location))
-            _d = yield From(self.urlopen(method, redirect_location, body, headers,
-                    retries=retries, redirect=redirect,
-                    assert_same_host=assert_same_host,
-                    timeout=timeout, pool_timeout=pool_timeout,
-                    release_conn=release_conn, **response_kw))
-            raise Return (_d)
-
-        # Check if we should retry the HTTP response.
-        if retries.is_forced_retry(method, status_code=response.status):
-            retries = retries.increment(method, url, response=response, _pool=self)
-            retries.sleep()
-            log.info("Forced retry: %s" % url)
-            _d = yield From(self.urlopen(method, url, body, headers,
-                    retries=retries, redirect=redirect,
-                    assert_same_host=assert_same_host,
-                    timeout=timeout, pool_timeout=pool_timeout,
-                    release_conn=release_conn, **response_kw))
-            raise Return (_d)
+                self.stats.retries += 1
+                yield From(response.drain_conn())
+                yield From(retries.sleep())
+                log.info("Forced retry: %s" % url)
+                continue
 
-        raise Return (response)
+            raise Return (response)
 
 
 class HTTPSConnectionPool(HTTPConnectionPool):
@@ -635,6 +1178,23 @@ class HTTPSConnectionPool(HTTPConnectionPool):
     ``ssl_version`` are only used if :mod:`ssl` is available and are fed into
     :meth:`urllib3.util.ssl_wrap_socket` to upgrade the connection socket
     into an SSL socket.
+
+    If ``http2`` is True and the `h2 <https://python-hyper.org/projects/h2/>`_
+    package is installed, connections offer HTTP/2 through ALPN. When the
+    server accepts, concurrent requests are multiplexed as streams over
+    :class:`urllib3.http2.HTTP2Connection` objects, a new one being opened
+    (within the limits of the pool) only when the server's concurrent stream
+    limit is reached on all the others. Otherwise requests carry on over
+    HTTP/1.1. Not used through a proxy.
+
+    ``ssl_context_cache`` is the :class:`urllib3.util.ssl_.SSLContextCache`
+    verified connections take their SSL context from, defaulting to one
+    shared by the whole process.
+
+    Where the ssl module supports it (Python 3.6+), the pool keeps the TLS
+    session of its latest connection and offers it to new ones, so that
+    reconnecting costs an abbreviated handshake. See
+    :attr:`tls_resumption_rate`.
     """
 
     scheme = 'https'
@@ -647,7 +1207,7 @@ class HTTPSConnectionPool(HTTPConnectionPool):
                  key_file=None, cert_file=None, cert_reqs=None,
                  ca_certs=None, ssl_version=None,
                  assert_hostname=None, assert_fingerprint=None,
-                 **conn_kw):
+                 http2=False, ssl_context_cache=None, **conn_kw):
 
         HTTPConnectionPool.__init__(self, host, port, strict, timeout, maxsize,
                                     block, headers, retries, _proxy, _proxy_headers,
@@ -659,6 +1219,15 @@ class HTTPSConnectionPool(HTTPConnectionPool):
         self.ssl_version = ssl_version
         self.assert_hostname = assert_hostname
         self.assert_fingerprint = assert_fingerprint
+        self.ssl_context_cache = ssl_context_cache
+
+        #: ``(context, session)`` offered to new connections for resumption.
+        self.tls_session = None
+
+        self.http2 = http2 and HTTP2Connection.supported()
+        self._h2_conns = []
+        self._h2_connecting = None
+        self._h2_unsupported = False
 
     def _prepare_conn(self, conn):
         """
@@ -674,6 +1243,12 @@ class HTTPSConnectionPool(HTTPConnectionPool):
                           assert_hostname=self.assert_hostname,
                           assert_fingerprint=self.assert_fingerprint)
             conn.ssl_version = self.ssl_version
+            conn.context_cache = self.ssl_context_cache
+
+        conn.tls_session = self.tls_session
+
+        if self.http2 and self.proxy is None:
+            conn.alpn_protocols = ALPN_PROTOCOLS
 
         if self.proxy is not None:
             # Python 2.7+
@@ -687,9 +1262,8 @@ class HTTPSConnectionPool(HTTPConnectionPool):
             else:
                 set_tunnel(self.host, self.port, self.proxy_headers)
 
-            # Establish tunnel connection early, because otherwise httplib
-            # would improperly set Host: header to proxy's IP:port.
-            conn.connect()
+            # The tunnel is opened by connect(), from _validate_conn(), before
+            # the first request; it then stays in the pool for reuse.
 
         return conn
 
@@ -698,6 +1272,7 @@ class HTTPSConnectionPool(HTTPConnectionPool):
         Return a fresh :class:`httplib.HTTPSConnection`.
         """
         self.num_connections += 1
+        self.stats.connections_created += 1
         log.info("Starting new HTTPS connection (%d): %s"
                  % (self.num_connections, self.host))
 
@@ -726,8 +1301,12 @@ class HTTPSConnectionPool(HTTPConnectionPool):
         vcs = super(HTTPSConnectionPool, self)
         yield From(vcs._validate_conn(conn))
 
-        # Force connect early to allow us to validate the connection.
-        if not getattr(conn, 'sock', None):  # AppEngine might not have  `.sock`
+        # Force connect early to allow us to validate the connection. An
+        # open connection is reused, keeping its tunnel and TLS session.
+        if get_stream(conn)[0] is None:
+            if getattr(conn, 'notSock', None) is not None:
+                # Don't leak what's left of a half-closed connection.
+                conn.close()
             yield From(conn.connect())
 
         if not conn.is_verified:
@@ -738,6 +1317,152 @@ class HTTPSConnectionPool(HTTPConnectionPool):
                 '(This warning will only appear once by default.)'),
                 InsecureRequestWarning)
 
+        self._record_tls_session(conn)
+
+    def _record_tls_session(self, conn):
+        if getattr(conn, 'new_handshake', False):
+            conn.new_handshake = False
+            self.stats.tls_handshakes += 1
+            if conn.session_reused:
+                self.stats.tls_resumed += 1
+
+        # Checked on every request: TLS 1.3 tickets only arrive after the
+        # handshake.
+        get_tls_session = getattr(conn, 'get_tls_session', None)
+        session = get_tls_session() if get_tls_session is not None else None
+        if session is not None:
+            self.tls_session = session
+
+    @property
+    def tls_resumption_rate(self):
+        """ Fraction of TLS handshakes that resumed an earlier session. """
+        if not self.stats.tls_handshakes:
+            return 0.0
+        return float(self.stats.tls_resumed) / self.stats.tls_handshakes
+
+    @property
+    def num_active(self):
+        # An HTTP/2 connection stays checked out while open; only its streams
+        # count.
+        active = super(HTTPSConnectionPool, self).num_active
+        if not active:
+            return 0
+        return active - len(self._h2_conns) + \
+            sum(h2_conn.num_streams for h2_conn in self._h2_conns)
+
+    def _can_multiplex(self):
+        return self.http2 and not self._h2_unsupported and self.proxy is None
+
+    def _h2_with_room(self):
+        for h2_conn in self._h2_conns:
+            if h2_conn.available_streams():
+                return h2_conn
+        return None
+
+    @asyncio.coroutine
+    def _new_h2_conn(self, timeout_obj, pool_timeout, priority):
+        conn = yield From(self._get_conn(timeout=pool_timeout,
+                                         priority=priority))
+        try:
+            conn.timeout = timeout_obj.connect_timeout
+            # Connects the connection, if it isn't already.
+            yield From(self._validate_conn(conn))
+        except BaseException:
+            conn.close()
+            self.stats.discarded_error += 1
+            self._put_conn(None)
+            raise
+
+        if conn.selected_alpn_protocol() != 'h2':
+            log.info("Server does not support HTTP/2: %s" % self.host)
+            self._h2_unsupported = True
+            self._put_conn(conn)
+            raise Return (None)
+
+        h2_conn = HTTP2Connection(conn, self._host_header(),
+                                  on_close=self._h2_closed)
+        self._h2_conns.append(h2_conn)
+        raise Return (h2_conn)
+
+    def _h2_closed(self, h2_conn):
+        self._h2_conns.remove(h2_conn)
+        self._put_conn(None)
+
+    @asyncio.coroutine
+    def _make_multiplexed_request(self, method, url, body, headers,
+                                  timeout=Timeout.DEFAULT_TIMEOUT,
+                                  pool_timeout=None, priority=0, **response_kw):
+        """
+        Send a request as a stream of an :class:`urllib3.http2.HTTP2Connection`
+        and return its :class:`urllib3.response.HTTPResponse`, or None if the
+        server did not negotiate HTTP/2.
+        """
+        timeout_obj = self._get_timeout(timeout)
+        timeout_obj.start_connect()
+
+        # Concurrent callers share the first connection instead of each
+        # opening their own while it handshakes.
+        while True:
+            h2_conn = self._h2_with_room()
+            if h2_conn is None and self._h2_conns and \
+                    len(self._h2_conns) >= self.size:
+                # Every slot carries a connection; queue for a stream.
+                h2_conn = min(self._h2_conns, key=lambda c: c.num_streams)
+            if h2_conn is not None:
+                break
+            if self._h2_connecting is not None:
+                yield From(asyncio.wait([self._h2_connecting]))
+                if self._h2_unsupported:
+                    raise Return (None)
+                continue
+
+            self._h2_connecting = asyncio.Future()
+            try:
+                h2_conn = yield From(self._new_h2_conn(timeout_obj,
+                                                       pool_timeout, priority))
+            finally:
+                self._h2_connecting.set_result(None)
+                self._h2_connecting = None
+            if h2_conn is None:
+                raise Return (None)
+            break
+
+        # Waiting for a stream is waiting for the pool, as with HTTP/1.
+        try:
+            yield From(h2_conn.wait_for_stream(pool_timeout))
+        except asyncio.TimeoutError:
+            raise EmptyPoolError(self, "No HTTP/2 streams are available.")
+
+        read_timeout = timeout_obj.read_timeout
+        if read_timeout is Timeout.DEFAULT_TIMEOUT:
+            read_timeout = None
+
+        self.num_requests += 1
+        self.stats.in_flight += 1
+        try:
+            status, response_headers, fp = yield From(h2_conn.request(
+                method, url, headers, body, timeout=read_timeout))
+        except asyncio.TimeoutError:
+            raise ReadTimeoutError(
+                self, url, "Read timed out. (read timeout=%s)" % read_timeout)
+        finally:
+            self.stats.in_flight -= 1
+
+        if body is not None and hasattr(body, '__len__'):
+            self.stats.bytes_sent += len(body)
+        log.debug("\"%s %s HTTP/2\" %s" % (method, url, status))
+
+        response = HTTPResponse(body=fp, headers=response_headers,
+                                status=status, version=20,
+                                pool=self, **response_kw)
+        yield From(response.init())
+        raise Return (response)
+
+    def close(self):
+        for h2_conn in list(self._h2_conns):
+            h2_conn.close()
+        super(HTTPSConnectionPool, self).close()
+
 
 def connection_from_url(url, **kw):
     """
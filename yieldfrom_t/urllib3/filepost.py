@@ -1,4 +1,6 @@
 import codecs
+import io
+import os
 
 from uuid import uuid4
 from io import BytesIO
@@ -91,3 +93,151 @@ def encode_multipart_formdata(fields, boundary=None):
     content_type = str('multipart/form-data; boundary=%s' % boundary)
 
     return body.getvalue(), content_type
+
+
+def _to_bytes(data):
+    if isinstance(data, int):
+        data = str(data)  # Backwards compatibility
+    if isinstance(data, six.text_type):
+        data = data.encode('utf-8')
+    return data
+
+
+def _remaining_size(fp):
+    """
+    Number of bytes left to read from ``fp``, or None if it can't be told
+    without reading it.
+    """
+    try:
+        position = fp.tell()
+    except (AttributeError, IOError, OSError):
+        return None
+
+    try:
+        return max(0, os.fstat(fp.fileno()).st_size - position)
+    except (AttributeError, IOError, OSError, io.UnsupportedOperation):
+        pass
+
+    try:
+        fp.seek(0, 2)
+        end = fp.tell()
+        fp.seek(position)
+    except (AttributeError, IOError, OSError):
+        return None
+    return max(0, end - position)
+
+
+class MultipartEncoder(object):
+    """
+    A multipart/form-data request body that is read from its fields as it is
+    sent, instead of being built in memory like
+    :func:`encode_multipart_formdata` does.
+
+    The body's length is known up front, from the rendered field headers
+    and the size of each field's data, so it can be sent with a
+    Content-Length. Iterating gives the body in chunks of at most
+    ``chunk_size`` bytes, and :meth:`read` makes it usable as a file
+    object body. :meth:`rewind` starts it over, for a retry.
+
+    File objects are read from their current position to the end, as it
+    was when the encoder was created. Text files, and files that can't be
+    sized or seeked, are read into memory up front.
+
+    :param fields:
+        Same as for :func:`encode_multipart_formdata`.
+
+    :param boundary:
+        If not specified, then a random boundary will be generated using
+        :func:`choose_boundary`.
+
+    :param chunk_size:
+        Maximum number of bytes read from a file at a time.
+    """
+
+    def __init__(self, fields, boundary=None, chunk_size=65536):
+        if boundary is None:
+            boundary = choose_boundary()
+
+        self.boundary = boundary
+        self.content_type = str('multipart/form-data; boundary=%s' % boundary)
+        self.chunk_size = chunk_size
+
+        # (headers, data, offset, size): data is bytes, or a file object
+        # to send ``size`` bytes of from ``offset``.
+        self._parts = []
+        self.length = 0
+        for field in iter_field_objects(fields):
+            headers = b('--%s\r\n' % boundary) + \
+                _to_bytes(field.render_headers())
+            data = field.data
+            offset = size = None
+
+            if hasattr(data, 'read') and not isinstance(data, io.TextIOBase):
+                size = _remaining_size(data)
+                if size is not None:
+                    offset = data.tell()
+
+            if offset is None:
+                if hasattr(data, 'read'):
+                    data = data.read()
+                data = _to_bytes(data)
+                size = len(data)
+
+            self._parts.append((headers, data, offset, size))
+            self.length += len(headers) + size + 2
+
+        self._tail = b('--%s--\r\n' % boundary)
+        self.length += len(self._tail)
+
+        self._chunks = None
+        self._buffer = b''
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        for headers, data, offset, size in self._parts:
+            yield headers
+            if offset is None:
+                if data:
+                    yield data
+            else:
+                data.seek(offset)
+                remaining = size
+                while remaining:
+                    chunk = data.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        raise ValueError("File for field was truncated while "
+                                         "being sent: %d bytes short." %
+                                         remaining)
+                    remaining -= len(chunk)
+                    yield chunk
+            yield b'\r\n'
+        yield self._tail
+
+    def read(self, amt=-1):
+        """
+        Read up to ``amt`` bytes of the body, or the rest of it if ``amt``
+        is negative or None.
+        """
+        if self._chunks is None:
+            self._chunks = iter(self)
+
+        buffered = [self._buffer]
+        length = len(self._buffer)
+        for chunk in self._chunks:
+            buffered.append(chunk)
+            length += len(chunk)
+            if amt is not None and 0 <= amt <= length:
+                break
+
+        data = b''.join(buffered)
+        if amt is None or amt < 0:
+            amt = len(data)
+        data, self._buffer = data[:amt], data[amt:]
+        return data
+
+    def rewind(self):
+        """ Start the body over from the beginning. """
+        self._chunks = None
+        self._buffer = b''
@@ -0,0 +1,367 @@
+import logging
+
+import trollius as asyncio
+from trollius import From, Return
+
+try:  # Optional dependency
+    import h2.config
+    import h2.connection
+    import h2.events
+except ImportError:
+    h2 = None
+
+from .connection import HTTPException
+from .packages import six
+from .util.connection import get_stream
+
+
+log = logging.getLogger(__name__)
+
+#: ALPN protocols offered by connections that may speak HTTP/2, in order of
+#: preference.
+ALPN_PROTOCOLS = ['h2', 'http/1.1']
+
+# Connection-specific headers are not allowed in HTTP/2 (RFC 7540, 8.1.2.2).
+# Host is sent as the :authority pseudo-header instead.
+_SKIP_HEADERS = frozenset(['connection', 'keep-alive', 'proxy-connection',
+                           'transfer-encoding', 'upgrade', 'host'])
+
+
+class StreamResetError(HTTPException):
+    "The server reset an HTTP/2 stream."
+    pass
+
+
+class _Stream(object):
+    """
+    Poses as the transport of its body's StreamReader, which pauses it once
+    more than twice the reader's limit is buffered and resumes it when the
+    consumer has read that back down to the limit.
+    """
+
+    def __init__(self, stream_id, on_resume):
+        self.stream_id = stream_id
+        self.headers = asyncio.Future()
+        self.body = asyncio.StreamReader()
+        self.body.set_transport(self)
+
+        self.paused = False
+        # Bytes received while paused, not yet acknowledged to the server.
+        self.unacked = 0
+        self._on_resume = on_resume
+
+    def pause_reading(self):
+        self.paused = True
+
+    def resume_reading(self):
+        self.paused = False
+        self._on_resume(self)
+
+
+class HTTP2Connection(object):
+    """
+    Multiplexes concurrent requests as streams over one HTTP/2 connection.
+
+    Wraps a :class:`urllib3.connection.HTTPSConnection` that negotiated
+    ``h2`` through ALPN. Requests wait for a free stream when the server's
+    ``SETTINGS_MAX_CONCURRENT_STREAMS`` is reached, and request bodies are
+    only sent as the server's flow-control windows allow. Received data is
+    acknowledged as the response bodies are read, so a slow reader closes
+    its stream's window instead of buffering without limit.
+
+    Requires the `h2 <https://python-hyper.org/projects/h2/>`_ package.
+
+    :param conn:
+        A connected :class:`urllib3.connection.HTTPSConnection`.
+
+    :param authority:
+        Value of the ``:authority`` pseudo-header when the request has no
+        ``Host`` header.
+
+    :param on_close:
+        Called with the connection once it is closed, by either side.
+    """
+
+    scheme = 'https'
+
+    def __init__(self, conn, authority, on_close=None):
+        if h2 is None:
+            raise ImportError("HTTP/2 support requires the 'h2' package.")
+
+        self.conn = conn
+        self.reader, self.transport = get_stream(conn)
+        self.authority = authority
+        self.closed = False
+
+        self._on_close = on_close
+        self._streams = {}
+        self._stream_waiters = []
+        self._window_waiters = []
+        self._settings_received = asyncio.Future()
+
+        config = h2.config.H2Configuration(client_side=True,
+                                           header_encoding='iso-8859-1')
+        self._h2 = h2.connection.H2Connection(config=config)
+        self._h2.initiate_connection()
+        self._flush()
+
+        self._reader_task = asyncio.Task(self._read_frames())
+
+    @staticmethod
+    def supported():
+        """ Whether the optional ``h2`` package is installed. """
+        return h2 is not None
+
+    def available_streams(self):
+        """ Number of new requests the server will currently accept. """
+        if self.closed:
+            return 0
+        limit = self._h2.remote_settings.max_concurrent_streams
+        return max(0, limit - self._h2.open_outbound_streams)
+
+    @property
+    def num_streams(self):
+        return len(self._streams)
+
+    def _flush(self):
+        data = self._h2.data_to_send()
+        if data:
+            self.transport.write(data)
+
+    @staticmethod
+    def _wake(waiters):
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _wake_stream_waiters(self):
+        waiters, self._stream_waiters = self._stream_waiters, []
+        self._wake(waiters)
+
+    @asyncio.coroutine
+    def wait_for_stream(self, timeout=None):
+        """
+        Wait up to ``timeout`` seconds until the server will accept a new
+        request. Raises :class:`asyncio.TimeoutError` on timeout.
+        """
+        yield From(asyncio.wait_for(self._wait_for_stream(), timeout))
+
+    @asyncio.coroutine
+    def _wait_for_stream(self):
+        # The server's stream limit is only known from its first SETTINGS.
+        if not self._settings_received.done():
+            yield From(self._settings_received)
+
+        while not self.available_streams():
+            if self.closed:
+                raise HTTPException("HTTP/2 connection is closed.")
+            waiter = asyncio.Future()
+            self._stream_waiters.append(waiter)
+            yield From(waiter)
+
+    @asyncio.coroutine
+    def _wait_for_window(self):
+        waiter = asyncio.Future()
+        self._window_waiters.append(waiter)
+        yield From(waiter)
+
+    def _request_headers(self, method, url, headers):
+        authority = self.authority
+        request_headers = []
+        for name, value in headers.items():
+            name = name.lower()
+            if name == 'host':
+                authority = value
+            if name not in _SKIP_HEADERS:
+                request_headers.append((name, value))
+
+        return [(':method', method), (':scheme', self.scheme),
+                (':authority', authority), (':path', url)] + request_headers
+
+    @asyncio.coroutine
+    def _send_body(self, stream_id, body):
+        # Bytes, or an iterable of them, such as a MultipartEncoder.
+        if isinstance(body, six.binary_type):
+            body = [body]
+
+        for chunk in body:
+            offset = 0
+            while offset < len(chunk):
+                window = self._h2.local_flow_control_window(stream_id)
+                if window <= 0:
+                    yield From(self._wait_for_window())
+                    continue
+
+                size = min(window, self._h2.max_outbound_frame_size,
+                           len(chunk) - offset)
+                self._h2.send_data(stream_id, chunk[offset:offset + size])
+                self._flush()
+                offset += size
+
+        self._h2.end_stream(stream_id)
+        self._flush()
+
+    @asyncio.coroutine
+    def request(self, method, url, headers=None, body=None, timeout=None):
+        """
+        Send a request on a new stream and wait up to ``timeout`` seconds for
+        the response headers.
+
+        Returns ``(status, headers, body)``, where ``headers`` is a list of
+        ``(name, value)`` pairs and ``body`` is an
+        :class:`asyncio.StreamReader` fed as the response data arrives.
+        """
+        yield From(self._wait_for_stream())
+
+        if isinstance(body, six.text_type):
+            body = body.encode('iso-8859-1')
+
+        stream_id = self._h2.get_next_available_stream_id()
+        stream = self._streams[stream_id] = _Stream(stream_id,
+                                                    self._stream_resumed)
+        self._h2.send_headers(stream_id,
+                              self._request_headers(method, url, headers or {}),
+                              end_stream=not body)
+        self._flush()
+
+        if body:
+            yield From(self._send_body(stream_id, body))
+
+        try:
+            response_headers = yield From(asyncio.wait_for(stream.headers,
+                                                           timeout))
+        except asyncio.TimeoutError:
+            self._reset(stream_id)
+            raise
+
+        status = None
+        headers = []
+        for name, value in response_headers:
+            if name == ':status':
+                status = int(value)
+            elif not name.startswith(':'):
+                headers.append((name, value))
+
+        raise Return ((status, headers, stream.body))
+
+    def _reset(self, stream_id):
+        stream = self._streams.pop(stream_id, None)
+        if stream is None or self.closed:
+            return
+        self._h2.reset_stream(stream_id)
+        self._flush()
+        stream.body.feed_eof()
+        self._wake_stream_waiters()
+
+    @asyncio.coroutine
+    def _read_frames(self):
+        error = None
+        try:
+            while True:
+                data = yield From(self.reader.read(65536))
+                if not data:
+                    break
+                for event in self._h2.receive_data(data):
+                    self._handle_event(event)
+                self._flush()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            error = e
+
+        self._terminate(error or HTTPException("HTTP/2 connection closed."))
+
+    def _handle_event(self, event):
+        stream = self._streams.get(getattr(event, 'stream_id', None))
+
+        if isinstance(event, h2.events.ResponseReceived):
+            if stream is not None and not stream.headers.done():
+                stream.headers.set_result(event.headers)
+
+        elif isinstance(event, h2.events.DataReceived):
+            length = event.flow_controlled_length
+            if stream is not None:
+                stream.body.feed_data(event.data)
+            if stream is not None and stream.paused:
+                # Hold the stream's window shut until the body is read, but
+                # keep the connection's open for the other streams.
+                stream.unacked += length
+                if length:
+                    self._h2.increment_flow_control_window(length)
+            else:
+                self._h2.acknowledge_received_data(length, event.stream_id)
+
+        elif isinstance(event, h2.events.StreamEnded):
+            if stream is not None:
+                del self._streams[event.stream_id]
+                stream.body.feed_eof()
+            self._wake_stream_waiters()
+
+        elif isinstance(event, h2.events.StreamReset):
+            if stream is not None:
+                del self._streams[event.stream_id]
+                exc = StreamResetError("Stream %d reset by server (error %s)" %
+                                       (event.stream_id, event.error_code))
+                if not stream.headers.done():
+                    stream.headers.set_exception(exc)
+                else:
+                    stream.body.set_exception(exc)
+            self._wake_stream_waiters()
+
+        elif isinstance(event, (h2.events.WindowUpdated,
+                                h2.events.RemoteSettingsChanged)):
+            if not self._settings_received.done():
+                self._settings_received.set_result(None)
+            waiters, self._window_waiters = self._window_waiters, []
+            self._wake(waiters)
+            self._wake_stream_waiters()
+
+        elif isinstance(event, h2.events.ConnectionTerminated):
+            self._terminate(HTTPException(
+                "HTTP/2 connection terminated by server (error %s)" %
+                event.error_code))
+
+    def _stream_resumed(self, stream):
+        unacked, stream.unacked = stream.unacked, 0
+        if not unacked or self.closed or \
+                self._streams.get(stream.stream_id) is not stream:
+            return
+        self._h2.increment_flow_control_window(unacked,
+                                               stream_id=stream.stream_id)
+        self._flush()
+
+    def _terminate(self, exc):
+        if self.closed:
+            return
+        self.closed = True
+
+        streams, self._streams = self._streams, {}
+        for stream in streams.values():
+            if not stream.headers.done():
+                stream.headers.set_exception(exc)
+            elif not stream.body.at_eof():
+                stream.body.set_exception(exc)
+
+        if not self._settings_received.done():
+            self._settings_received.set_exception(exc)
+        for waiter in self._stream_waiters + self._window_waiters:
+            if not waiter.done():
+                waiter.set_exception(exc)
+        self._stream_waiters = []
+        self._window_waiters = []
+
+        self.conn.close()
+        if self._on_close is not None:
+            self._on_close(self)
+
+    def close(self):
+        """ Say goodbye to the server and close the connection. """
+        if self.closed:
+            return
+        try:
+            self._h2.close_connection()
+            self._flush()
+        except Exception:
+            pass
+        self._reader_task.cancel()
+        self._terminate(HTTPException("HTTP/2 connection closed."))
@@ -0,0 +1,278 @@
+import collections
+import logging
+
+import trollius as asyncio
+from trollius import From, Return
+
+from ._collections import HTTPHeaderDict
+from .connection import HTTPException
+from .util.connection import get_stream, get_writer
+
+
+log = logging.getLogger(__name__)
+
+#: Methods that may be sent before the responses to earlier requests on the
+#: same connection have arrived.
+PIPELINE_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'TRACE'])
+
+
+class PipelineAborted(HTTPException):
+    """
+    The connection closed before a pipelined request got any part of its
+    response. The request can be sent again on another connection.
+    """
+    pass
+
+
+class IncompleteResponse(HTTPException):
+    "The connection closed in the middle of a pipelined response."
+    pass
+
+
+def _parse_version(version):
+    return {'HTTP/1.0': 10, 'HTTP/1.1': 11}.get(version, 9)
+
+
+@asyncio.coroutine
+def read_response(reader, method):
+    """
+    Read one complete HTTP/1.x response off ``reader``, skipping interim 1xx
+    responses.
+
+    Returns ``(version, status, reason, headers, body)``. Raises
+    :class:`PipelineAborted` if the stream ends before a status line, and
+    :class:`IncompleteResponse` if it ends part way through.
+    """
+    while True:
+        line = yield From(reader.readline())
+        if not line:
+            raise PipelineAborted("Connection closed before response.")
+
+        parts = line.decode('iso-8859-1').rstrip('\r\n').split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith('HTTP/') or \
+                not parts[1].isdigit():
+            raise HTTPException("Bad status line: %r" % line)
+        version = _parse_version(parts[0])
+        status = int(parts[1])
+        reason = parts[2] if len(parts) > 2 else ''
+
+        headers = HTTPHeaderDict()
+        while True:
+            line = yield From(reader.readline())
+            if not line:
+                raise IncompleteResponse("Connection closed in headers.")
+            if line in (b'\r\n', b'\n'):
+                break
+            name, _, value = line.decode('iso-8859-1').partition(':')
+            headers.add(name.strip(), value.strip())
+
+        if not 100 <= status < 200:
+            break
+
+    try:
+        if method == 'HEAD' or status in (204, 304):
+            body = b''
+        elif 'chunked' in headers.get('transfer-encoding', '').lower():
+            body = yield From(_read_chunked(reader))
+        elif 'content-length' in headers:
+            body = yield From(reader.readexactly(
+                int(headers['content-length'])))
+        else:
+            # Delimited by the server closing the connection.
+            body = yield From(reader.read())
+    except asyncio.IncompleteReadError:
+        raise IncompleteResponse("Connection closed in body.")
+
+    raise Return ((version, status, reason, headers, body))
+
+
+@asyncio.coroutine
+def _read_chunked(reader):
+    chunks = []
+    while True:
+        line = yield From(reader.readline())
+        if not line:
+            raise asyncio.IncompleteReadError(b'', None)
+        size = int(line.split(b';', 1)[0].strip(), 16)
+        if size == 0:
+            break
+        chunk = yield From(reader.readexactly(size + 2))
+        chunks.append(chunk[:-2])
+
+    # Skip the trailers.
+    while True:
+        line = yield From(reader.readline())
+        if line in (b'\r\n', b'\n', b''):
+            break
+    raise Return (b''.join(chunks))
+
+
+def _keeps_alive(version, headers):
+    connection = headers.get('connection', '').lower()
+    if version < 11:
+        return 'keep-alive' in connection
+    return 'close' not in connection
+
+
+class PipelinedConnection(object):
+    """
+    Sends requests on a connected :class:`urllib3.connection.HTTPConnection`
+    back to back, without waiting for earlier responses, and hands the
+    responses out in order.
+
+    Once every request has been answered, or the connection is lost, the
+    pipeline calls ``on_idle(pipeline)``; :attr:`conn` is then either ready
+    for reuse or closed and set to None.
+
+    :param conn:
+        A connected :class:`urllib3.connection.HTTPConnection`.
+
+    :param host_header:
+        Value of the ``Host`` header sent when the request has none.
+
+    :param depth:
+        Maximum number of requests awaiting a response at once.
+
+    :param on_idle:
+        Called with the pipeline when it has nothing in flight.
+    """
+
+    def __init__(self, conn, host_header, depth, on_idle):
+        self.conn = conn
+        self.reader, self.transport = get_stream(conn)
+        self.writer = get_writer(conn)
+        self.host_header = host_header
+        self.depth = depth
+        self.num_requests = 0
+        self.closed = False
+
+        self._on_idle = on_idle
+        self._pending = collections.deque()
+        self._reader_task = None
+        self._finished = False
+
+    def has_room(self):
+        """ Whether another request may join the pipeline now. """
+        return not self.closed and len(self._pending) < self.depth
+
+    def _encode_request(self, method, url, headers):
+        lines = ['%s %s HTTP/1.1' % (method, url)]
+        names = set(name.lower() for name in headers)
+        if 'host' not in names:
+            lines.append('Host: %s' % self.host_header)
+        if 'accept-encoding' not in names:
+            lines.append('Accept-Encoding: identity')
+        for name, value in headers.items():
+            lines.append('%s: %s' % (name, value))
+        lines.extend(['', ''])
+        return '\r\n'.join(lines).encode('iso-8859-1')
+
+    @asyncio.coroutine
+    def request(self, method, url, headers=None, timeout=None):
+        """
+        Send a request without a body and wait up to ``timeout`` seconds for
+        its response. Returns ``(version, status, reason, headers, body)``.
+
+        Raises :class:`PipelineAborted` if the connection was lost before the
+        response started and the request may be sent again elsewhere.
+        """
+        if not self.has_room():
+            raise PipelineAborted("Pipeline is full or closed.")
+
+        first = self.num_requests == 0
+        self.num_requests += 1
+
+        waiter = asyncio.Future()
+        self._pending.append((method, waiter))
+        self.writer.write(self._encode_request(method, url, headers or {}))
+
+        # Read responses while the write drains: a server may stop reading
+        # requests until its responses are taken.
+        if self._reader_task is None:
+            self._reader_task = asyncio.Task(self._read_responses())
+
+        try:
+            yield From(asyncio.wait_for(self.writer.drain(), timeout))
+            result = yield From(asyncio.wait_for(waiter, timeout))
+        except asyncio.TimeoutError:
+            # The responses behind this one can't be reached without it.
+            self.abort()
+            raise
+        except (IOError, OSError):
+            # Lost while writing; the requests behind this one go elsewhere.
+            self.abort()
+            raise
+        except PipelineAborted:
+            if first:
+                # Nothing ever came back on this connection; don't requeue
+                # forever against a server that just hangs up.
+                raise HTTPException("Connection closed before response.")
+            raise
+
+        raise Return (result)
+
+    @asyncio.coroutine
+    def _read_responses(self):
+        try:
+            while self._pending:
+                method, waiter = self._pending[0]
+                result = yield From(read_response(self.reader, method))
+                self._pending.popleft()
+                if not waiter.done():
+                    waiter.set_result(result)
+
+                if not _keeps_alive(result[0], result[3]):
+                    self.closed = True
+                    break
+        except PipelineAborted as e:
+            self._fail_pending(e)
+        except Exception as e:
+            # The response in progress is lost; the ones behind it never
+            # started and can go elsewhere.
+            if self._pending:
+                method, waiter = self._pending.popleft()
+                if not waiter.done():
+                    waiter.set_exception(e)
+        finally:
+            self._reader_task = None
+
+        if self._pending:
+            self.abort()
+        else:
+            self._finish()
+
+    def _fail_pending(self, exc):
+        pending, self._pending = self._pending, collections.deque()
+        for method, waiter in pending:
+            if not waiter.done():
+                waiter.set_exception(exc)
+
+    def abort(self):
+        """
+        Close the connection. Requests still waiting for a response fail
+        with :class:`PipelineAborted`.
+        """
+        self.closed = True
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._pending:
+            log.info("Pipeline aborted with %d request(s) unanswered" %
+                     len(self._pending))
+        self._fail_pending(PipelineAborted("Connection lost mid-pipeline."))
+        self._finish()
+
+    def _finish(self):
+        if self._finished:
+            return
+        self._finished = True
+        if not self.closed and self.reader.at_eof():
+            self.closed = True
+        if self.closed and self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        self.closed = True
+        self._on_idle(self)
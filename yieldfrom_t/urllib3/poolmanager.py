@@ -7,13 +7,17 @@ try:  # Python 3
 except ImportError:
     from urlparse import urljoin
 
-from ._collections import RecentlyUsedContainer
+from ._collections import LoopRecentlyUsedContainer
+from .bulk import RequestBatch
 from .connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 from .connectionpool import port_by_scheme
 from .exceptions import LocationValueError
 from .request import RequestMethods
-from .util.url import parse_url
+from .util.url import normalize_host, parse_url
 from .util.retry import Retry
+from .util.budget import ConnectionBudget
+from .util.ssl_ import SSLContextCache
+from .util.stats import PoolStats
 
 
 __all__ = ['PoolManager', 'ProxyManager', 'proxy_from_url']
@@ -27,7 +31,136 @@ pool_classes_by_scheme = {
 log = logging.getLogger(__name__)
 
 SSL_KEYWORDS = ('key_file', 'cert_file', 'cert_reqs', 'ca_certs',
-                'ssl_version')
+                'ssl_version', 'http2', 'ssl_context_cache')
+
+
+class PoolContainer(LoopRecentlyUsedContainer):
+    """
+    The :class:`urllib3._collections.LoopRecentlyUsedContainer` of
+    connection pools kept by a :class:`PoolManager`.
+
+    To make room for a new pool, it looks at the ``eviction_window`` least
+    recently used pools and evicts the one that is cheapest to lose: one
+    without idle connections, and preferably without requests in flight.
+    An evicted pool still in use is closed once its requests finish (see
+    :meth:`urllib3.connectionpool.HTTPConnectionPool.close_when_idle`);
+    if its host is asked for again before that, the pool is taken back.
+
+    The ``hits``, ``misses``, ``evictions`` and ``revived`` counters help
+    size ``num_pools``: evictions close to the number of misses mean pools
+    are being thrown away only to be created again. The
+    :class:`urllib3.util.stats.PoolStats` of every pool closed so far are
+    added up in :attr:`retired`, and their reaped connections in
+    :attr:`retired_reaped`.
+
+    :param maxsize:
+        Maximum number of pools held.
+
+    :param eviction_window:
+        Number of least recently used pools considered for eviction.
+        Defaults to a quarter of ``maxsize``.
+    """
+
+    def __init__(self, maxsize=10, eviction_window=None):
+        LoopRecentlyUsedContainer.__init__(self, maxsize,
+                                           dispose_func=self._dispose)
+        self.eviction_window = eviction_window or max(1, maxsize // 4)
+
+        #: Evicted pools waiting for their requests to finish, by key.
+        self.draining = {}
+
+        #: Stats of the pools closed so far.
+        self.retired = PoolStats()
+        self.retired_reaped = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.revived = 0
+
+    def get(self, key, default=None):
+        pool = LoopRecentlyUsedContainer.get(self, key)
+        if pool is not None:
+            self.hits += 1
+            return pool
+
+        self._prune()
+        pool = self.draining.pop(key, None)
+        if pool is None:
+            self.misses += 1
+            return default
+
+        pool.keep_open()
+        self[key] = pool
+        self.revived += 1
+        return pool
+
+    @staticmethod
+    def _eviction_cost(pool):
+        return (pool.num_idle > 0, pool.num_active > 0)
+
+    def _evict_key(self, newest):
+        best_key = best_cost = None
+        for i, key in enumerate(self._container):
+            if i >= self.eviction_window:
+                break
+            if key == newest:
+                continue
+            cost = self._eviction_cost(self._container[key])
+            if best_cost is None or cost < best_cost:
+                best_key, best_cost = key, cost
+            if not any(cost):
+                break
+
+        if best_key is None:
+            return next(iter(self._container))
+        return best_key
+
+    def _retire(self, pool):
+        self.retired += pool.stats
+        self.retired_reaped += pool.num_reaped
+
+    def _dispose(self, pool):
+        pool.close()
+        self._retire(pool)
+
+    def _evicted(self, key, pool):
+        self.evictions += 1
+        if pool.close_when_idle():
+            self._retire(pool)
+        else:
+            self.draining[key] = pool
+        self._prune()
+
+    def _prune(self):
+        for key, pool in list(self.draining.items()):
+            if pool._close_if_idle():
+                del self.draining[key]
+                self._retire(pool)
+
+    def clear(self):
+        LoopRecentlyUsedContainer.clear(self)
+        draining, self.draining = self.draining, {}
+        for pool in draining.values():
+            self._dispose(pool)
+
+    @property
+    def hit_rate(self):
+        """ Fraction of lookups that found a pool, counting revived ones. """
+        lookups = self.hits + self.revived + self.misses
+        if not lookups:
+            return 0.0
+        return float(self.hits + self.revived) / lookups
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'revived': self.revived,
+            'draining': len(self.draining),
+            'hit_rate': self.hit_rate,
+        }
 
 
 class PoolManager(RequestMethods):
@@ -43,10 +176,29 @@ class PoolManager(RequestMethods):
         Headers to include with all requests, unless other headers are given
         explicitly.
 
+    :param max_connections:
+        Maximum number of connections open at once across all pools. Requests
+        that would exceed it wait for a connection to be discarded; an idle
+        connection of another pool is closed to make room.
+
+    :param max_per_host:
+        Maximum number of connections open at once to one host, over all
+        schemes and ports.
+
     :param \**connection_pool_kw:
         Additional parameters are used to create fresh
         :class:`urllib3.connectionpool.ConnectionPool` instances.
 
+    Pools are held in a :class:`PoolContainer`; ``manager.pools.stats()``
+    reports how well ``num_pools`` fits the workload.
+
+    Both limits are kept by a :class:`urllib3.util.budget.ConnectionBudget`,
+    available as :attr:`budget` along with its utilization statistics.
+
+    All the HTTPS pools of a manager share one
+    :class:`urllib3.util.ssl_.SSLContextCache`, unless ``ssl_context_cache``
+    is given.
+
     Example::
 
         >>> manager = PoolManager(num_pools=2)
@@ -60,10 +212,18 @@ class PoolManager(RequestMethods):
 
     proxy = None
 
-    def __init__(self, num_pools=10, headers=None, **connection_pool_kw):
+    def __init__(self, num_pools=10, headers=None, max_connections=None,
+                 max_per_host=None, **connection_pool_kw):
         RequestMethods.__init__(self, headers)
+        connection_pool_kw.setdefault('ssl_context_cache', SSLContextCache())
+
+        self.budget = connection_pool_kw.get('connection_budget')
+        if self.budget is None and (max_connections or max_per_host):
+            self.budget = ConnectionBudget(max_connections, max_per_host)
+            connection_pool_kw['connection_budget'] = self.budget
+
         self.connection_pool_kw = connection_pool_kw
-        self.pools = RecentlyUsedContainer(num_pools, dispose_func=lambda p: p.close())
+        self.pools = PoolContainer(num_pools)
 
     def _new_pool(self, scheme, host, port):
         """
@@ -91,31 +251,60 @@ class PoolManager(RequestMethods):
         """
         self.pools.clear()
 
+    def reap_idle(self, idle_timeout=None):
+        """
+        Call :meth:`urllib3.connectionpool.HTTPConnectionPool.reap_idle` on
+        every pool. Returns the total number of connections closed.
+        """
+        return sum(pool.reap_idle(idle_timeout) for pool in self.pools.values())
+
+    def _all_pools(self):
+        return list(self.pools.values()) + list(self.pools.draining.values())
+
+    @property
+    def stats(self):
+        """
+        :class:`urllib3.util.stats.PoolStats` summed over every pool this
+        manager has used: those held, those draining after eviction, and
+        those already closed.
+        """
+        return sum((pool.stats for pool in self._all_pools()),
+                   self.pools.retired)
+
+    @property
+    def num_reaped(self):
+        """ Idle connections reaped so far by all the pools. """
+        return self.pools.retired_reaped + sum(
+            pool.num_reaped for pool in self._all_pools())
+
     def connection_from_host(self, host, port=None, scheme='http'):
         """
         Get a :class:`ConnectionPool` based on the host, port, and scheme.
 
         If ``port`` isn't given, it will be derived from the ``scheme`` using
-        ``urllib3.connectionpool.port_by_scheme``.
+        ``urllib3.connectionpool.port_by_scheme``. Hosts are compared
+        case-insensitively, and with or without the brackets around an IPv6
+        address, so every spelling of the same host shares one pool.
         """
 
         if not host:
             raise LocationValueError("No host specified.")
 
-        scheme = scheme or 'http'
+        scheme = (scheme or 'http').lower()
+        host = normalize_host(host)
         port = port or port_by_scheme.get(scheme, 80)
         pool_key = (scheme, host, port)
 
-        with self.pools.lock:
-            # If the scheme, host, or port doesn't match existing open
-            # connections, open a new ConnectionPool.
-            pool = self.pools.get(pool_key)
-            if pool:
-                return pool
+        # If the scheme, host, or port doesn't match existing open
+        # connections, open a new ConnectionPool. Pools are only touched from
+        # the event loop, so this needs no lock.
+        pool = self.pools.get(pool_key)
+        if pool is not None:
+            return pool
 
-            # Make a fresh ConnectionPool of the desired type
-            pool = self._new_pool(scheme, host, port)
-            self.pools[pool_key] = pool
+        # Make a fresh ConnectionPool of the desired type
+        pool = self._new_pool(scheme, host, port)
+        self.pools[pool_key] = pool
 
         return pool
 
@@ -131,6 +320,46 @@ class PoolManager(RequestMethods):
         u = parse_url(url)
         return self.connection_from_host(u.host, port=u.port, scheme=u.scheme)
 
+    @asyncio.coroutine
+    def preconnect(self, url, num=None):
+        """
+        Open ``num`` connections to the host of ``url`` ahead of time. See
+        :meth:`urllib3.connectionpool.HTTPConnectionPool.prewarm`.
+        """
+        pool = self.connection_from_url(url)
+        _d = yield From(pool.prewarm(num))
+        raise Return (_d)
+
+    def request_many(self, requests, concurrency=10, per_host=None):
+        """
+        Make many requests with at most ``concurrency`` of them in flight at
+        once, and at most ``per_host`` to any one host.
+
+        ``requests`` is an iterable of ``(method, url)`` or
+        ``(method, url, kwargs)`` tuples, read lazily. Returns a
+        :class:`urllib3.bulk.RequestBatch`; iterating it gives coroutines
+        that resolve to :class:`urllib3.bulk.BulkResult` instances as the
+        requests complete. A failed request doesn't stop the others; its
+        result carries the exception instead of a response.
+
+        Example::
+
+            >>> batch = manager.request_many(
+            ...     (('GET', url) for url in urls), concurrency=50, per_host=4)
+            >>> for next_result in batch:
+            ...     result = yield From(next_result)
+            ...     if result.error is not None:
+            ...         log.warning("%s failed: %r", result.url, result.error)
+        """
+        return RequestBatch(self, requests, concurrency, per_host)
+
+    def _headers_for(self, url, headers):
+        """
+        Headers to send on a single request (or redirect hop) to ``url``.
+        Overridden by :class:`ProxyManager`.
+        """
+        return headers
+
     @asyncio.coroutine
     def urlopen(self, method, url, redirect=True, **kw):
         """
@@ -141,40 +370,45 @@ class PoolManager(RequestMethods):
         The given ``url`` parameter must be absolute, such that an appropriate
         :class:`urllib3.connectionpool.ConnectionPool` can be chosen for it.
         """
-        u = parse_url(url)
-        conn = self.connection_from_host(u.host, port=u.port, scheme=u.scheme)
-
         kw['assert_same_host'] = False
         kw['redirect'] = False
-        if 'headers' not in kw:
-            kw['headers'] = self.headers
+        headers = kw.get('headers', self.headers)
 
-        if self.proxy is not None and u.scheme == "http":
-            response = yield From(conn.urlopen(method, url, **kw))
-        else:
-            response = yield From(conn.urlopen(method, u.request_uri, **kw))
+        # Redirects loop here rather than recursing; each hop only picks the
+        # pool for its host and sends the request there.
+        while True:
+            u = parse_url(url)
+            conn = self.connection_from_host(u.host, port=u.port, scheme=u.scheme)
+            kw['headers'] = self._headers_for(url, headers)
 
-        redirect_location = redirect and response.get_redirect_location()
-        if not redirect_location:
-            raise Return (response)
+            if self.proxy is not None and u.scheme == "http":
+                response = yield From(conn.urlopen(method, url, **kw))
+            else:
+                response = yield From(conn.urlopen(method, u.request_uri, **kw))
 
-        # Support relative URLs for redirecting.
-        redirect_location = urljoin(url, redirect_location)
+            redirect_location = redirect and response.get_redirect_location()
+            if not redirect_location:
+                raise Return (response)
 
-        # RFC 7231, Section 6.4.4
-        if response.status == 303:
-            method = 'GET'
+            # Support relative URLs for redirecting.
+            redirect_location = urljoin(url, redirect_location)
 
-        retries = kw.get('retries')
-        if not isinstance(retries, Retry):
-            retries = Retry.from_int(retries, redirect=redirect)
+            # RFC 7231, Section 6.4.4
+            if response.status == 303:
+                method = 'GET'
 
-        kw['retries'] = retries.increment(method, redirect_location)
-        kw['redirect'] = redirect
+            retries = kw.get('retries')
+            if not isinstance(retries, Retry):
+                retries = Retry.from_int(retries, redirect=redirect)
 
-        log.info("Redirecting %s -> %s" % (url, redirect_location))
-        _d = yield From(self.urlopen(method, redirect_location, **kw))
-        raise Return (_d)
+            kw['retries'] = retries.increment(method, redirect_location)
+
+            # Return the connection to its pool before moving on, so a
+            # same-host redirect reuses it.
+            yield From(response.drain_conn())
+
+            log.info("Redirecting %s -> %s" % (url, redirect_location))
+            url = redirect_location
 
 
 class ProxyManager(PoolManager):
@@ -250,20 +484,13 @@ class ProxyManager(PoolManager):
             headers_.update(headers)
         return headers_
 
-    @asyncio.coroutine
-    def urlopen(self, method, url, redirect=True, **kw):
-        "Same as HTTP(S)ConnectionPool.urlopen, ``url`` must be absolute."
-        u = parse_url(url)
-
-        if u.scheme == "http":
+    def _headers_for(self, url, headers):
+        if parse_url(url).scheme == "http":
             # For proxied HTTPS requests, httplib sets the necessary headers
             # on the CONNECT to the proxy. For HTTP, we'll definitely
             # need to set 'Host' at the very least.
-            headers = kw.get('headers', self.headers)
-            kw['headers'] = self._set_proxy_headers(url, headers)
-
-        _d = yield From(super(ProxyManager, self).urlopen(method, url, redirect=redirect, **kw))
-        raise Return (_d)
+            return self._set_proxy_headers(url, headers)
+        return headers
 
 
 def proxy_from_url(url, **kw):
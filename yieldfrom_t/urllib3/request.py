@@ -6,7 +6,11 @@ try:
 except ImportError:
     from urllib import urlencode
 
-from .filepost import encode_multipart_formdata
+from .filepost import (
+    encode_multipart_formdata,
+    iter_field_objects,
+    MultipartEncoder,
+)
 
 
 __all__ = ['RequestMethods']
@@ -119,14 +123,29 @@ class RequestMethods(object):
         When uploading a file, providing a filename (the first parameter of the
         tuple) is optional but recommended to best mimick behavior of browsers.
 
+        The data of a field may also be a file object. The body is then a
+        :class:`urllib3.filepost.MultipartEncoder`, which reads the files as
+        the request is sent rather than loading them into memory::
+
+            fields = {
+                'bigfile': ('bigfile.bin', open('bigfile.bin', 'rb')),
+            }
+
         Note that if ``headers`` are supplied, the 'Content-Type' header will
         be overwritten because it depends on the dynamic random boundary string
         which is used to compose the body of the request. The random boundary
         string can be explicitly set with the ``multipart_boundary`` parameter.
         """
+        headers_ = {}
         if encode_multipart:
-            body, content_type = encode_multipart_formdata(
-                fields or {}, boundary=multipart_boundary)
+            fields = list(iter_field_objects(fields or {}))
+            if any(hasattr(field.data, 'read') for field in fields):
+                body = MultipartEncoder(fields, boundary=multipart_boundary)
+                content_type = body.content_type
+                headers_['Content-Length'] = str(len(body))
+            else:
+                body, content_type = encode_multipart_formdata(
+                    fields, boundary=multipart_boundary)
         else:
             body, content_type = (urlencode(fields or {}),
                                   'application/x-www-form-urlencoded')
@@ -134,7 +153,7 @@ class RequestMethods(object):
         if headers is None:
             headers = self.headers
 
-        headers_ = {'Content-Type': content_type}
+        headers_['Content-Type'] = content_type
         headers_.update(headers)
 
         _d = yield From(self.urlopen(method, url, body=body, headers=headers_,
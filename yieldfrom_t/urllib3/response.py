@@ -1,9 +1,10 @@
 import zlib
 import io
+from socket import error as SocketError
 from yieldfrom_t.http.client import HTTPResponse as _HTTPResponse
 
 from ._collections import HTTPHeaderDict
-from .exceptions import ProtocolError, DecodeError, ReadTimeoutError
+from .exceptions import HTTPError, ProtocolError, DecodeError, ReadTimeoutError
 from .packages.six import string_types as basestring, binary_type
 from .connection import HTTPException, BaseSSLError
 
@@ -44,6 +45,28 @@ def _get_decoder(mode):
     return DeflateDecoder()
 
 
+# Headers the response reads itself. They're picked out of the raw header
+# list up front, so that reading them doesn't build the whole HTTPHeaderDict.
+_INDEXED_HEADERS = frozenset(['content-encoding', 'content-length',
+                              'location', 'transfer-encoding'])
+_INDEXED_LENGTHS = frozenset(len(name) for name in _INDEXED_HEADERS)
+
+
+def _index_headers(pairs):
+    index = {}
+    for name, value in pairs:
+        # Most names can be ruled out by length without lowercasing them.
+        if len(name) not in _INDEXED_LENGTHS:
+            continue
+        name = name.lower()
+        if name in _INDEXED_HEADERS:
+            if name in index:
+                index[name] = index[name] + ', ' + value
+            else:
+                index[name] = value
+    return index
+
+
 class HTTPResponse(io.IOBase):
     """
     HTTP Response container.
@@ -70,6 +93,10 @@ class HTTPResponse(io.IOBase):
         When this HTTPResponse wrapper is generated from an httplib.HTTPResponse
         object, it's convenient to include the original for debug purposes. It's
         otherwise unused.
+
+    ``headers`` may also be a list of ``(name, value)`` pairs, as returned by
+    ``httplib.HTTPResponse.getheaders()``. The :class:`HTTPHeaderDict` is
+    then only built when :attr:`headers` is first accessed.
     """
 
     CONTENT_DECODERS = ['gzip', 'deflate']
@@ -79,9 +106,14 @@ class HTTPResponse(io.IOBase):
                  strict=0, preload_content=True, decode_content=True,
                  original_response=None, pool=None, connection=None):
 
-        self.headers = HTTPHeaderDict()
-        if headers:
-            self.headers.update(headers)
+        if isinstance(headers, (list, tuple)):
+            self._headers = None
+            self._raw_headers = headers
+            self._header_index = _index_headers(headers)
+        else:
+            # Shares storage with an HTTPHeaderDict until either is modified.
+            self._headers = HTTPHeaderDict(headers)
+            self._raw_headers = self._header_index = None
         self.status = status
         self.version = version
         self.reason = reason
@@ -109,6 +141,24 @@ class HTTPResponse(io.IOBase):
         self._connection = connection
 
 
+    @property
+    def headers(self):
+        if self._headers is None:
+            self._headers = HTTPHeaderDict.from_pairs(self._raw_headers)
+            self._raw_headers = self._header_index = None
+        return self._headers
+
+    @headers.setter
+    def headers(self, headers):
+        self._headers = headers
+        self._raw_headers = self._header_index = None
+
+    def _header(self, name, default=None):
+        # ``name`` is lowercase; one of _INDEXED_HEADERS while headers are raw.
+        if self._headers is None:
+            return self._header_index.get(name, default)
+        return self._headers.get(name, default)
+
     @asyncio.coroutine
     def init(self):
         if self.preload_content and not self._body:
@@ -123,7 +173,7 @@ class HTTPResponse(io.IOBase):
             location. ``False`` if not a redirect status code.
         """
         if self.status in self.REDIRECT_STATUSES:
-            return self.headers.get('location')
+            return self._header('location')
 
         return False
 
@@ -134,6 +184,21 @@ class HTTPResponse(io.IOBase):
         self._pool._put_conn(self._connection)
         self._connection = None
 
+    @asyncio.coroutine
+    def drain_conn(self):
+        """
+        Read and discard any remaining body, so that the connection can be
+        reused, and release the connection back to the pool.
+        """
+        try:
+            yield From(self.read())
+        except (HTTPError, SocketError, BaseSSLError, HTTPException):
+            # The connection is unusable; close it before handing it back so
+            # the pool replaces it.
+            if self._connection:
+                self._connection.close()
+        self.release_conn()
+
     @property
     @asyncio.coroutine
     def data(self):
@@ -177,7 +242,7 @@ class HTTPResponse(io.IOBase):
         """
         # Note: content-encoding value should be case-insensitive, per RFC 7230
         # Section 3.2
-        content_encoding = self.headers.get('content-encoding', '').lower()
+        content_encoding = self._header('content-encoding', '').lower()
         if self._decoder is None:
             if content_encoding in self.CONTENT_DECODERS:
                 self._decoder = _get_decoder(content_encoding)
@@ -206,7 +271,7 @@ class HTTPResponse(io.IOBase):
                         # December 15, 2012 (http://bugs.python.org/issue16298) do
                         # not properly close the connection in all cases. There is
                         # no harm in redundantly calling close.
-                        self._fp.close()
+                        self.close()
                         flush_decoder = True
 
             except asyncio.TimeoutError:
@@ -228,6 +293,9 @@ class HTTPResponse(io.IOBase):
                 raise ProtocolError('Connection broken: %r' % e, e)
 
             self._fp_bytes_read += len(data)
+            stats = getattr(self._pool, 'stats', None)
+            if stats is not None:
+                stats.bytes_received += len(data)
 
             try:
                 if decode_content and self._decoder:
@@ -266,6 +334,9 @@ class HTTPResponse(io.IOBase):
         for block in (yield From(resp.stream):)
           # do something with block
 
+        For large bodies, use :meth:`chunk_reader` instead, which does not
+        hold the whole body in memory.
+
         :param amt:
             How much of the content to read. The generator will return up to
             much data per iteration, but may return less. This is particularly
@@ -279,13 +350,35 @@ class HTTPResponse(io.IOBase):
         allData = yield From(self.read(decode_content=decode_content))
 
         dataBlocks = []
-        while allData:
-            block = allData[:amt]
-            dataBlocks.append(block)
-            allData = allData[amt:]
+        if allData:
+            dataBlocks = [allData[i:i + amt]
+                          for i in range(0, len(allData), amt)]
 
         raise Return (iter(dataBlocks))
 
+    def chunk_reader(self, amt=2**16, decode_content=None):
+        """
+        Return a :class:`ChunkReader` that reads the body incrementally,
+        ``amt`` bytes from the wire at a time, without preloading it.
+
+        Usage:
+
+        reader = resp.chunk_reader(2**16)
+        while True:
+            block = yield From(reader.next_chunk())
+            if block is None:
+                break
+            # do something with block
+
+        :param amt:
+            How much of the content to read from the wire per chunk.
+
+        :param decode_content:
+            If True, will attempt to decode the body based on the
+            'content-encoding' header.
+        """
+        return ChunkReader(self, amt, decode_content)
+
     @classmethod
     @asyncio.coroutine
     def from_httplib(ResponseCls, r, **response_kw):
@@ -297,14 +390,10 @@ class HTTPResponse(io.IOBase):
         with ``original_response=r``.
         """
 
-        headers = HTTPHeaderDict()
-        for k, v in r.getheaders():
-            headers.add(k, v)
-
         # HTTPResponse objects in Python 3 don't have a .strict attribute
         strict = getattr(r, 'strict', 0)
         r = ResponseCls(body=r,
-                           headers=headers,
+                           headers=r.getheaders(),
                            status=r.status,
                            version=r.version,
                            reason=r.reason,
@@ -320,6 +409,10 @@ class HTTPResponse(io.IOBase):
         return self.headers
 
     def getheader(self, name, default=None):
+        if self._headers is None:
+            lower = name.lower()
+            if lower in _INDEXED_HEADERS:
+                return self._header_index.get(lower, default)
         return self.headers.get(name, default)
 
     # Overrides from io.IOBase
@@ -376,3 +469,47 @@ class HTTPResponse(io.IOBase):
         # else:
         #     b[:len(temp)] = temp
         #     raise Return (len(temp))
+
+
+class ChunkReader(object):
+    """
+    Incremental reader over the body of an :class:`HTTPResponse`, returned
+    by :meth:`HTTPResponse.chunk_reader`.
+
+    Memory use is bounded by ``amt``; each block is decoded as it comes off
+    the underlying stream. The empty string is never returned, ``None``
+    signals the end of the body.
+    """
+
+    def __init__(self, response, amt=2**16, decode_content=None):
+        self._response = response
+        self.amt = amt
+        self.decode_content = decode_content
+        self._done = False
+
+    @asyncio.coroutine
+    def next_chunk(self):
+        """
+        Return the next decoded block of the body, or ``None`` at EOF.
+        """
+        resp = self._response
+        while not self._done:
+            if resp._body is not None or resp._fp is None:
+                # Body was given as a blob, preloaded, or already read.
+                self._done = True
+                if resp._body:
+                    raise Return (resp._body)
+                break
+
+            position = resp.tell()
+            data = yield From(resp.read(self.amt,
+                                        decode_content=self.decode_content))
+            if data:
+                raise Return (data)
+
+            # Nothing decoded; if nothing came off the wire either, we're at
+            # EOF. Otherwise the decoder is still buffering, so read on.
+            if resp.tell() == position:
+                self._done = True
+
+        raise Return (None)
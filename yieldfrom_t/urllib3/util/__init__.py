@@ -19,6 +19,7 @@ from .timeout import (
 from .retry import Retry
 from .url import (
     get_host,
+    normalize_host,
     parse_url,
     split_first,
     Url,
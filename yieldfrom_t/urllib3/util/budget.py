@@ -0,0 +1,174 @@
+import collections
+import weakref
+
+import trollius as asyncio
+from trollius import From
+
+
+class ConnectionBudget(object):
+    """
+    Limits the connections held open by a set of connection pools, in total
+    and per host, whatever the scheme or port.
+
+    A pool takes a permit from the budget before creating a connection and
+    gives it back when the connection is discarded. Pooled idle connections
+    keep their permits. When the budget is exhausted, callers wait for a
+    permit instead of failing, and an idle connection of another registered
+    pool is closed to make room.
+
+    Shared by every pool of a :class:`urllib3.poolmanager.PoolManager` created
+    with ``max_connections`` or ``max_per_host``.
+
+    :param max_connections:
+        Maximum number of connections across all pools. None means no limit.
+
+    :param max_per_host:
+        Maximum number of connections to any one host. None means no limit.
+    """
+
+    def __init__(self, max_connections=None, max_per_host=None):
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+
+        #: Number of permits currently taken.
+        self.in_use = 0
+        #: Highest :attr:`in_use` seen.
+        self.peak = 0
+        #: Number of acquisitions that had to wait.
+        self.num_waits = 0
+        #: Number of idle connections closed to make room.
+        self.num_reclaimed = 0
+
+        self._per_host = collections.defaultdict(int)
+        self._waiters = collections.deque()
+        self._pools = weakref.WeakSet()
+
+    def register(self, pool):
+        """ Let the budget close ``pool``'s idle connections when it's full. """
+        self._pools.add(pool)
+
+    def unregister(self, pool):
+        self._pools.discard(pool)
+
+    def _host_full(self, host):
+        return self.max_per_host is not None and \
+            self._per_host.get(host, 0) >= self.max_per_host
+
+    def _total_full(self):
+        return self.max_connections is not None and \
+            self.in_use >= self.max_connections
+
+    def _has_room(self, host):
+        return not self._total_full() and not self._host_full(host)
+
+    def _take(self, host):
+        self.in_use += 1
+        self.peak = max(self.peak, self.in_use)
+        self._per_host[host] += 1
+
+    def try_acquire(self, host):
+        """ Take a permit for ``host`` if one is free now. """
+        if not self._has_room(host):
+            return False
+        self._take(host)
+        return True
+
+    @asyncio.coroutine
+    def acquire(self, host, timeout=None):
+        """
+        Take a permit for a connection to ``host``, waiting up to ``timeout``
+        seconds for one. Raises :class:`asyncio.TimeoutError` on timeout.
+        """
+        if self.try_acquire(host):
+            return
+
+        waiter = asyncio.Future()
+        self._waiters.append((host, waiter))
+        self.num_waits += 1
+        self._reclaim(host)
+
+        try:
+            yield From(asyncio.wait_for(waiter, timeout))
+        except asyncio.TimeoutError:
+            self._remove_waiter(host, waiter)
+            raise
+        except asyncio.CancelledError:
+            self._remove_waiter(host, waiter)
+            if waiter.done() and not waiter.cancelled():
+                # Handed a permit we won't use.
+                self.release(host)
+            raise
+
+    def _remove_waiter(self, host, waiter):
+        try:
+            self._waiters.remove((host, waiter))
+        except ValueError:
+            pass
+
+    def release(self, host, num=1):
+        """ Give back ``num`` permits for ``host``. """
+        self.in_use -= num
+        self._per_host[host] -= num
+        if self._per_host[host] <= 0:
+            del self._per_host[host]
+        self._wake()
+
+    def _wake(self):
+        # Hand permits straight to the longest waiting callers that fit, so a
+        # newcomer can't take them first.
+        for host, waiter in list(self._waiters):
+            if self._total_full():
+                break
+            if waiter.done():
+                self._remove_waiter(host, waiter)
+            elif not self._host_full(host):
+                self._remove_waiter(host, waiter)
+                self._take(host)
+                waiter.set_result(None)
+
+    def _reclaim(self, host):
+        # Close an idle connection where it frees a permit the waiter can
+        # use: to the same host if that's the limit, else anywhere.
+        if self._host_full(host):
+            pools = [pool for pool in self._pools if pool.host == host]
+        else:
+            pools = list(self._pools)
+        pools = [pool for pool in pools if pool.num_idle]
+        if not pools:
+            return
+        pool = max(pools, key=lambda pool: pool.num_idle)
+        self.num_reclaimed += pool.release_idle(1)
+
+    @property
+    def waiting(self):
+        """ Number of callers waiting for a permit. """
+        return sum(1 for host, waiter in self._waiters if not waiter.done())
+
+    @property
+    def utilization(self):
+        """
+        Fraction of ``max_connections`` in use, or None without a total
+        limit.
+        """
+        if not self.max_connections:
+            return None
+        return float(self.in_use) / self.max_connections
+
+    def host_utilization(self, host):
+        """ Fraction of ``max_per_host`` in use for ``host``, or None. """
+        if not self.max_per_host:
+            return None
+        return float(self._per_host.get(host, 0)) / self.max_per_host
+
+    def stats(self):
+        return {
+            'in_use': self.in_use,
+            'peak': self.peak,
+            'max_connections': self.max_connections,
+            'max_per_host': self.max_per_host,
+            'utilization': self.utilization,
+            'per_host': dict(self._per_host),
+            'waiting': self.waiting,
+            'waits': self.num_waits,
+            'reclaimed': self.num_reclaimed,
+        }
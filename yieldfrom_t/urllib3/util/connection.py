@@ -12,6 +12,68 @@ from select import select
 poll = False # remove unnecessary complexity
 
 
+def get_stream(conn):
+    """
+    Returns the ``(reader, transport)`` pair an asyncio connection talks
+    through, or ``(None, None)`` if it has none (not yet connected, closed,
+    or not an asyncio connection).
+
+    :param conn:
+        :class:`httplib.HTTPConnection` object.
+    """
+    not_sock = getattr(conn, 'notSock', None)
+    if not_sock is None:
+        return None, None
+
+    reader = getattr(not_sock, 'reader', None) or \
+        getattr(not_sock, '_reader', None)
+    transport = getattr(get_writer(conn), 'transport', None) or \
+        getattr(not_sock, 'transport', None)
+    return reader, transport
+
+
+def get_writer(conn):
+    """
+    Returns the :class:`asyncio.StreamWriter` an asyncio connection writes
+    through, or None.
+
+    :param conn:
+        :class:`httplib.HTTPConnection` object.
+    """
+    not_sock = getattr(conn, 'notSock', None)
+    return getattr(not_sock, 'writer', None) or \
+        getattr(not_sock, '_writer', None)
+
+
+def is_stream_dropped(reader, transport):
+    """
+    Returns True if an idle asyncio stream can no longer be used for a new
+    request. Only looks at the state the protocol has already recorded, so it
+    costs no syscall.
+
+    :param reader:
+        :class:`asyncio.StreamReader` of the connection, or None.
+
+    :param transport:
+        The connection's transport, or None.
+    """
+    if transport is not None:
+        is_closing = getattr(transport, 'is_closing', None)
+        if is_closing is not None and is_closing():
+            return True
+
+    if reader is not None:
+        if getattr(reader, '_eof', False) or reader.exception() is not None:
+            # Server closed the keep-alive connection, or it broke.
+            return True
+        if getattr(reader, '_buffer', None):
+            # Bytes arrived while the connection was idle in the pool; the
+            # next response would be misread.
+            return True
+
+    return False
+
+
 def is_connection_dropped(conn):  # Platform-specific
     """
     Returns True if the connection is dropped and should be closed.
@@ -19,9 +81,16 @@ def is_connection_dropped(conn):  # Platform-specific
     :param conn:
         :class:`httplib.HTTPConnection` object.
 
+    Connections speaking through an asyncio transport are checked with
+    :func:`is_stream_dropped`; others fall back to a zero-timeout select.
+
     Note: For platforms like AppEngine, this will always return ``False`` to
     let the platform handle connection recycling transparently for us.
     """
+    reader, transport = get_stream(conn)
+    if reader is not None or transport is not None:
+        return is_stream_dropped(reader, transport)
+
     sock = getattr(conn, 'sock', False)
     if sock is False:  # Platform-specific: AppEngine
         return False
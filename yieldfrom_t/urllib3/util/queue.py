@@ -0,0 +1,116 @@
+import collections
+
+import trollius as asyncio
+from trollius import From, Return
+from trollius.queues import QueueEmpty, QueueFull
+
+
+class LifoWaiterQueue(object):
+    """
+    Store of pooled connections, handed out most-recently-used first, with a
+    fair hand-off to coroutines waiting for one.
+
+    Waiters are served strictly in arrival order within a priority class, and
+    lower ``priority`` values are served before higher ones. A released item
+    goes straight to the longest waiting coroutine instead of through the
+    queue. Timeouts use a single timer handle per waiter rather than a task.
+
+    Supports the subset of the :class:`trollius.queues.LifoQueue` API that the
+    connection pools use.
+
+    :param maxsize:
+        Maximum number of items held. Zero means unbounded.
+    """
+
+    def __init__(self, maxsize=0):
+        self.maxsize = maxsize
+        self._items = []
+        self._waiters = {}
+
+    def qsize(self):
+        return len(self._items)
+
+    def empty(self):
+        return not self._items
+
+    def full(self):
+        return 0 < self.maxsize <= len(self._items)
+
+    def num_items(self):
+        """ Number of held items that aren't empty slots. """
+        return sum(1 for item in self._items if item)
+
+    def waiting(self):
+        """ Number of coroutines currently waiting in :meth:`get`. """
+        return sum(1 for waiters in self._waiters.values()
+                   for waiter in waiters if not waiter.done())
+
+    def _next_waiter(self):
+        for priority in sorted(self._waiters):
+            waiters = self._waiters[priority]
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    return waiter
+            # Timed out and cancelled waiters are dropped lazily.
+            del self._waiters[priority]
+        return None
+
+    def put_nowait(self, item):
+        waiter = self._next_waiter()
+        if waiter is not None:
+            waiter.set_result(item)
+            return
+
+        if self.full():
+            raise QueueFull
+        self._items.append(item)
+
+    def get_nowait(self):
+        if not self._items:
+            raise QueueEmpty
+        return self._items.pop()
+
+    @asyncio.coroutine
+    def get(self, timeout=None, priority=0):
+        """
+        Remove and return an item, waiting up to ``timeout`` seconds for one
+        to be released. Raises :class:`QueueEmpty` on timeout.
+        """
+        if self._items:
+            raise Return (self._items.pop())
+
+        loop = asyncio.get_event_loop()
+        waiter = asyncio.Future(loop=loop)
+        self._waiters.setdefault(priority, collections.deque()).append(waiter)
+
+        timer = None
+        if timeout is not None:
+            timer = loop.call_later(timeout, self._expire, waiter)
+
+        try:
+            item = yield From(waiter)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and \
+                    waiter.exception() is None:
+                # We were handed an item but won't use it; pass it on.
+                self.put_nowait(waiter.result())
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+        raise Return (item)
+
+    @staticmethod
+    def _expire(waiter):
+        if not waiter.done():
+            waiter.set_exception(QueueEmpty())
+
+    def fail_waiters(self, exc):
+        """ Raise ``exc`` in every coroutine waiting in :meth:`get`. """
+        waiters, self._waiters = self._waiters, {}
+        for queue in waiters.values():
+            for waiter in queue:
+                if not waiter.done():
+                    waiter.set_exception(exc)
@@ -0,0 +1,166 @@
+import functools
+import socket
+
+import trollius as asyncio
+from trollius import From, Return
+
+try:  # Python 3.2+, or the futures backport trollius installs on Python 2
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None
+
+from .._collections import LoopRecentlyUsedContainer
+from ..packages import six
+from .timeout import current_time
+
+
+# getaddrinfo errors meaning the name doesn't resolve, as opposed to a
+# resolver failure worth retrying straight away.
+_NEGATIVE_ERRNOS = frozenset(
+    getattr(socket, name) for name in ('EAI_NONAME', 'EAI_NODATA')
+    if hasattr(socket, name))
+
+
+class Resolver(object):
+    """
+    Asynchronous ``getaddrinfo`` with a cache in front of it, used by
+    :func:`urllib3.connection.create_connection` to look up hosts.
+
+    Concurrent lookups of the same name share one ``getaddrinfo`` call.
+    Names that don't exist are remembered for ``negative_ttl`` seconds.
+
+    :param ttl:
+        Seconds a successful lookup is reused for. Zero disables caching.
+
+    :param negative_ttl:
+        Seconds a failed lookup of a nonexistent name is remembered for.
+
+    :param max_workers:
+        Size of a thread pool dedicated to lookups. Defaults to sharing the
+        event loop's default executor.
+
+    :param overrides:
+        Dictionary mapping host names to an IP address, or list of IP
+        addresses, to use instead of asking DNS.
+
+    :param maxsize:
+        Maximum number of cached names.
+    """
+
+    def __init__(self, ttl=60, negative_ttl=10, max_workers=None,
+                 overrides=None, maxsize=1024):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.overrides = dict(overrides or {})
+        self._cache = LoopRecentlyUsedContainer(maxsize)
+        self._in_flight = {}
+
+        self._executor = None
+        if max_workers:
+            if ThreadPoolExecutor is None:
+                raise ImportError("max_workers requires concurrent.futures.")
+            self._executor = ThreadPoolExecutor(max_workers)
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @property
+    def hit_rate(self):
+        """
+        Fraction of lookups answered without a new ``getaddrinfo`` call,
+        counting those that joined a lookup already in progress.
+        """
+        lookups = self.hits + self.coalesced + self.misses
+        if not lookups:
+            return 0.0
+        return float(self.hits + self.coalesced) / lookups
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'hit_rate': self.hit_rate,
+            'cached': len(self._cache),
+        }
+
+    def clear(self):
+        """ Forget every cached lookup. """
+        self._cache.clear()
+
+    def _override(self, host, port, family, type, proto):
+        addresses = self.overrides[host]
+        if isinstance(addresses, six.string_types):
+            addresses = [addresses]
+
+        infos = []
+        for address in addresses:
+            if ':' in address:
+                info = (socket.AF_INET6, type, proto, '', (address, port, 0, 0))
+            else:
+                info = (socket.AF_INET, type, proto, '', (address, port))
+            if family in (0, socket.AF_UNSPEC, info[0]):
+                infos.append(info)
+        return infos
+
+    @asyncio.coroutine
+    def getaddrinfo(self, host, port, family=0, type=socket.SOCK_STREAM,
+                    proto=0, flags=0):
+        """
+        Same as :func:`socket.getaddrinfo`, but a coroutine, and cached.
+        """
+        if host in self.overrides:
+            raise Return (self._override(host, port, family, type, proto))
+
+        key = (host, port, family, type, proto, flags)
+        entry = self._cache.get(key)
+        if entry is not None:
+            expires, result, error_args = entry
+            if expires > current_time():
+                self.hits += 1
+                if error_args is not None:
+                    # A fresh error each time, so tracebacks don't pile up on
+                    # one instance.
+                    self.negative_hits += 1
+                    raise socket.gaierror(*error_args)
+                raise Return (list(result))
+            del self._cache[key]
+
+        lookup = self._in_flight.get(key)
+        if lookup is None:
+            self.misses += 1
+            loop = asyncio.get_event_loop()
+            lookup = loop.run_in_executor(self._executor, socket.getaddrinfo,
+                                          host, port, family, type, proto, flags)
+            self._in_flight[key] = lookup
+            lookup.add_done_callback(functools.partial(self._store, key))
+        else:
+            self.coalesced += 1
+
+        # One caller giving up mustn't cancel the lookup for the others.
+        result = yield From(asyncio.shield(lookup))
+        raise Return (list(result))
+
+    def _store(self, key, lookup):
+        self._in_flight.pop(key, None)
+        if lookup.cancelled():
+            return
+
+        exc = lookup.exception()
+        if exc is None:
+            if self.ttl:
+                self._cache[key] = (current_time() + self.ttl,
+                                    lookup.result(), None)
+        elif self.negative_ttl and isinstance(exc, socket.gaierror) and \
+                exc.args and exc.args[0] in _NEGATIVE_ERRNOS:
+            self._cache[key] = (current_time() + self.negative_ttl, None,
+                                exc.args)
+
+    def close(self):
+        """ Shut down the dedicated thread pool, if any. """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
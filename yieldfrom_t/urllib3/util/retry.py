@@ -1,6 +1,9 @@
-import time
+import random
 import logging
 
+import trollius as asyncio
+from trollius import From
+
 from ..exceptions import (
     ProtocolError,
     ConnectTimeoutError,
@@ -98,6 +101,17 @@ class Retry(object):
 
         By default, backoff is disabled (set to 0).
 
+    :param str backoff_jitter:
+        Randomize the backoff so that many clients retrying against the same
+        recovering server do not all retry at the same moment. One of
+        ``'full'`` (sleep a random time between 0 and the backoff),
+        ``'equal'`` (half the backoff, plus a random time up to the other
+        half) or ``'decorrelated'`` (a random time between ``backoff_factor``
+        and three times the previous sleep). See
+        :attr:`Retry.BACKOFF_JITTER_CHOICES`.
+
+        By default, jitter is disabled (set to ``None``).
+
     :param bool raise_on_redirect: Whether, if the number of redirects is
         exhausted, to raise a MaxRetryError, or to return a response with a
         response code in the 3xx range.
@@ -109,9 +123,19 @@ class Retry(object):
     #: Maximum backoff time.
     BACKOFF_MAX = 120
 
+    #: Accepted values for ``backoff_jitter``.
+    BACKOFF_JITTER_CHOICES = frozenset(['full', 'equal', 'decorrelated'])
+
     def __init__(self, total=10, connect=None, read=None, redirect=None,
                  method_whitelist=DEFAULT_METHOD_WHITELIST, status_forcelist=None,
-                 backoff_factor=0, raise_on_redirect=True, _observed_errors=0):
+                 backoff_factor=0, raise_on_redirect=True, backoff_jitter=None,
+                 _observed_errors=0, _last_backoff=0):
+
+        if backoff_jitter is not None and \
+                backoff_jitter not in self.BACKOFF_JITTER_CHOICES:
+            raise ValueError('Unknown backoff_jitter %r, expected one of %s' %
+                             (backoff_jitter,
+                              ', '.join(sorted(self.BACKOFF_JITTER_CHOICES))))
 
         self.total = total
         self.connect = connect
@@ -126,7 +150,9 @@ class Retry(object):
         self.method_whitelist = method_whitelist
         self.backoff_factor = backoff_factor
         self.raise_on_redirect = raise_on_redirect
+        self.backoff_jitter = backoff_jitter
         self._observed_errors = _observed_errors # TODO: use .history instead?
+        self._last_backoff = _last_backoff
 
     def new(self, **kw):
         params = dict(
@@ -136,7 +162,9 @@ class Retry(object):
             status_forcelist=self.status_forcelist,
             backoff_factor=self.backoff_factor,
             raise_on_redirect=self.raise_on_redirect,
+            backoff_jitter=self.backoff_jitter,
             _observed_errors=self._observed_errors,
+            _last_backoff=self._last_backoff,
         )
         params.update(kw)
         return type(self)(**params)
@@ -166,16 +194,41 @@ class Retry(object):
         backoff_value = self.backoff_factor * (2 ** (self._observed_errors - 1))
         return min(self.BACKOFF_MAX, backoff_value)
 
+    def get_jittered_backoff_time(self):
+        """ The backoff from :meth:`get_backoff_time` with ``backoff_jitter``
+        applied.
+
+        :rtype: float
+        """
+        backoff = self.get_backoff_time()
+        if backoff <= 0 or not self.backoff_jitter:
+            return backoff
+
+        if self.backoff_jitter == 'full':
+            return random.uniform(0, backoff)
+
+        if self.backoff_jitter == 'equal':
+            return backoff / 2.0 + random.uniform(0, backoff / 2.0)
+
+        # Decorrelated: grows from the previous sleep rather than from the
+        # attempt count.
+        previous = max(self._last_backoff, self.backoff_factor)
+        return min(self.BACKOFF_MAX,
+                   random.uniform(self.backoff_factor, previous * 3))
+
+    @asyncio.coroutine
     def sleep(self):
-        """ Sleep between retry attempts using an exponential backoff.
+        """ Sleep between retry attempts using an exponential backoff, without
+        blocking the event loop.
 
         By default, the backoff factor is 0 and this method will return
         immediately.
         """
-        backoff = self.get_backoff_time()
+        backoff = self.get_jittered_backoff_time()
         if backoff <= 0:
             return
-        time.sleep(backoff)
+        self._last_backoff = backoff
+        yield From(asyncio.sleep(backoff))
 
     def _is_connection_error(self, err):
         """ Errors when we're fairly sure that the server did not receive the
@@ -1,21 +1,37 @@
+import functools
 from binascii import hexlify, unhexlify
-from hashlib import md5, sha1
+from hashlib import md5, sha1, sha256
 
+import trollius as asyncio
+from trollius import From, Return
+
+from .._collections import LoopRecentlyUsedContainer
 from ..exceptions import SSLError
 
 
 try:  # Test for SSL features
     SSLContext = None
     HAS_SNI = False
+    HAS_SESSION_RESUMPTION = False
 
     import ssl
-    from ssl import wrap_socket, CERT_NONE, PROTOCOL_SSLv23
+    from ssl import CERT_NONE, PROTOCOL_SSLv23
     from ssl import SSLContext  # Modern SSL?
     from ssl import HAS_SNI  # Has SNI?
+    HAS_SESSION_RESUMPTION = hasattr(ssl.SSLSocket, 'session')  # Python 3.6+
 except ImportError:
     pass
 
 
+# Maps the length of a digest to a possible hash function producing
+# this digest.
+HASHFUNC_MAP = {
+    16: md5,
+    20: sha1,
+    32: sha256,
+}
+
+
 def assert_fingerprint(cert, fingerprint):
     """
     Checks if given fingerprint matches the supplied certificate.
@@ -24,25 +40,21 @@ def assert_fingerprint(cert, fingerprint):
         Certificate as bytes object.
     :param fingerprint:
         Fingerprint as string of hexdigits, can be interspersed by colons.
+        MD5, SHA1 and SHA256 fingerprints are supported.
     """
-
-    # Maps the length of a digest to a possible hash function producing
-    # this digest.
-    hashfunc_map = {
-        16: md5,
-        20: sha1
-    }
+    if not cert:
+        raise SSLError('No certificate for the peer.')
 
     fingerprint = fingerprint.replace(':', '').lower()
     digest_length, odd = divmod(len(fingerprint), 2)
 
-    if odd or digest_length not in hashfunc_map:
+    if odd or digest_length not in HASHFUNC_MAP:
         raise SSLError('Fingerprint is of invalid length.')
 
     # We need encode() here for py32; works on py2 and p33.
     fingerprint_bytes = unhexlify(fingerprint.encode())
 
-    hashfunc = hashfunc_map[digest_length]
+    hashfunc = HASHFUNC_MAP[digest_length]
 
     cert_digest = hashfunc(cert).digest()
 
@@ -92,13 +104,19 @@ def resolve_ssl_version(candidate):
 
 
 def create_context(keyfile=None, certfile=None, cert_reqs=None,
-                   ca_certs=None, server_hostname=None, ssl_version=None):
+                   ca_certs=None, server_hostname=None, ssl_version=None,
+                   alpn_protocols=None):
         """
-        All arguments except `server_hostname` have the same meaning as for
-        :func:`ssl.wrap_socket`
+        All arguments except `server_hostname` and `alpn_protocols` have the
+        same meaning as for :func:`ssl.wrap_socket`
 
         :param server_hostname:
             Hostname of the expected certificate
+
+        :param alpn_protocols:
+            Protocols to offer through ALPN, most preferred first, such as
+            ``['h2', 'http/1.1']``. Ignored if the ssl module lacks ALPN
+            support.
         """
         context = SSLContext(ssl_version)
         context.verify_mode = cert_reqs
@@ -117,10 +135,151 @@ def create_context(keyfile=None, certfile=None, cert_reqs=None,
         if certfile:
             # FIXME: This block needs a test.
             context.load_cert_chain(certfile, keyfile)
+        if alpn_protocols and hasattr(context, 'set_alpn_protocols'):
+            context.set_alpn_protocols(alpn_protocols)
 
         return context
 
 
+class VerifiedPeerCache(object):
+    """
+    Remembers which certificates already passed a check, such as a
+    hostname match, so repeat connections to the same server skip it. Only
+    successes are remembered. Certificates are told apart by their SHA256
+    digest, so a check cheaper than hashing the certificate, such as
+    :func:`assert_fingerprint`, gains nothing from the cache.
+
+    :param maxsize:
+        Maximum number of (certificate, check) pairs remembered.
+    """
+
+    def __init__(self, maxsize=256):
+        self._verified = LoopRecentlyUsedContainer(maxsize)
+        self.hits = 0
+        self.misses = 0
+
+    def check(self, cert, check, verify):
+        """
+        Run ``verify()``, unless ``cert`` passed ``check`` before.
+
+        :param cert:
+            Certificate as bytes object.
+        :param check:
+            Hashable description of what ``verify`` checks, such as
+            ``('hostname', 'example.com')``.
+        :param verify:
+            Callable raising an exception if the check fails.
+        """
+        if not cert:
+            raise SSLError('No certificate for the peer.')
+
+        key = (sha256(cert).digest(), check)
+        if self._verified.get(key):
+            self.hits += 1
+            return
+
+        self.misses += 1
+        verify()
+        self._verified[key] = True
+
+    def clear(self):
+        self._verified.clear()
+
+
+#: Cache of verified certificates shared by all connections.
+verified_peers = VerifiedPeerCache()
+
+
+class ResumingContext(object):
+    """
+    Stands in for an :class:`ssl.SSLContext`, offering ``session`` for
+    resumption on the connections it wraps. Everything else is delegated to
+    ``context``, which must be the context the session was made with.
+    """
+
+    def __init__(self, context, session):
+        self._context = context
+        self._session = session
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+    def wrap_socket(self, *args, **kwargs):
+        kwargs.setdefault('session', self._session)
+        return self._context.wrap_socket(*args, **kwargs)
+
+    def wrap_bio(self, *args, **kwargs):
+        kwargs.setdefault('session', self._session)
+        return self._context.wrap_bio(*args, **kwargs)
+
+
+class SSLContextCache(object):
+    """
+    Reuses :class:`ssl.SSLContext` objects across connections with the same
+    TLS settings, so the CA bundle is parsed once rather than on every
+    connect. Contexts are built by :func:`create_context` in the event
+    loop's default executor, keeping the disk reads and parsing off the loop;
+    concurrent requests for the same settings share one build.
+
+    Cached contexts don't notice changes to the files they were loaded from;
+    call :meth:`clear` after replacing them.
+
+    :param maxsize:
+        Maximum number of contexts kept.
+    """
+
+    def __init__(self, maxsize=32):
+        self._contexts = LoopRecentlyUsedContainer(maxsize)
+        self._in_flight = {}
+        self.hits = 0
+        self.misses = 0
+
+    @asyncio.coroutine
+    def get(self, keyfile=None, certfile=None, cert_reqs=None, ca_certs=None,
+            ssl_version=None, alpn_protocols=None):
+        """
+        Return a context for these settings, building it if needed. The
+        arguments are those of :func:`create_context`.
+        """
+        key = (keyfile, certfile, cert_reqs, ca_certs, ssl_version,
+               tuple(alpn_protocols or ()))
+        context = self._contexts.get(key)
+        if context is not None:
+            self.hits += 1
+            raise Return (context)
+
+        build = self._in_flight.get(key)
+        if build is None:
+            self.misses += 1
+            loop = asyncio.get_event_loop()
+            build = loop.run_in_executor(
+                None, lambda: create_context(keyfile, certfile,
+                                             cert_reqs=cert_reqs,
+                                             ca_certs=ca_certs,
+                                             ssl_version=ssl_version,
+                                             alpn_protocols=alpn_protocols))
+            self._in_flight[key] = build
+            build.add_done_callback(functools.partial(self._store, key))
+        else:
+            self.hits += 1
+
+        context = yield From(asyncio.shield(build))
+        raise Return (context)
+
+    def _store(self, key, build):
+        del self._in_flight[key]
+        if not build.cancelled() and build.exception() is None:
+            self._contexts[key] = build.result()
+
+    def clear(self):
+        """ Drop every cached context. """
+        self._contexts.clear()
+
+
+#: Cache used by connections that weren't given one.
+default_context_cache = SSLContextCache()
+
+
 # if SSLContext is not None:  # Python 3.2+
 #     def ssl_wrap_socket(sock, keyfile=None, certfile=None, cert_reqs=None,
 #                         ca_certs=None, server_hostname=None,
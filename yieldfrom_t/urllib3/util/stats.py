@@ -0,0 +1,62 @@
+import bisect
+
+
+class PoolStats(object):
+    """
+    Counters describing how a connection pool has been used. Every
+    :class:`~urllib3.connectionpool.HTTPConnectionPool` keeps one as
+    ``pool.stats``; :attr:`urllib3.poolmanager.PoolManager.stats` adds up
+    those of all its pools.
+
+    Stats objects can be added together with ``+``.
+    """
+
+    #: Upper bounds, in seconds, of the checkout wait-time histogram buckets.
+    #: The last bucket counts everything slower.
+    WAIT_BUCKETS = (0.001, 0.01, 0.1, 1.0, 10.0)
+
+    COUNTERS = (
+        'connections_created',
+        'connections_reused',
+        'discarded_full',
+        'discarded_dropped',
+        'discarded_error',
+        'in_flight',
+        'bytes_sent',
+        'bytes_received',
+        'retries',
+        'redirects',
+        'tls_handshakes',
+        'tls_resumed',
+    )
+
+    def __init__(self):
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        self.wait_histogram = [0] * (len(self.WAIT_BUCKETS) + 1)
+
+    def record_wait(self, seconds):
+        """ Count a checkout that waited ``seconds`` for a connection. """
+        self.wait_histogram[bisect.bisect_left(self.WAIT_BUCKETS, seconds)] += 1
+
+    @property
+    def checkouts(self):
+        return sum(self.wait_histogram)
+
+    def __add__(self, other):
+        total = type(self)()
+        for name in self.COUNTERS:
+            setattr(total, name, getattr(self, name) + getattr(other, name))
+        total.wait_histogram = [a + b for a, b in zip(self.wait_histogram,
+                                                       other.wait_histogram)]
+        return total
+
+    def as_dict(self):
+        d = dict((name, getattr(self, name)) for name in self.COUNTERS)
+        d['wait_histogram'] = list(zip(self.WAIT_BUCKETS + (None,),
+                                       self.wait_histogram))
+        return d
+
+    def __repr__(self):
+        return '%s(%s)' % (type(self).__name__, ', '.join(
+            '%s=%r' % (name, getattr(self, name)) for name in self.COUNTERS))
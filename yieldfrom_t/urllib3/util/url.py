@@ -1,5 +1,6 @@
 from collections import namedtuple
 
+from .._collections import LoopRecentlyUsedContainer
 from ..exceptions import LocationParseError
 
 
@@ -11,7 +12,7 @@ class Url(namedtuple('Url', url_attrs)):
     Datastructure for representing an HTTP URL. Used as a return value for
     :func:`parse_url`.
     """
-    slots = ()
+    __slots__ = ()
 
     def __new__(cls, scheme=None, auth=None, host=None, port=None, path=None,
                 query=None, fragment=None):
@@ -116,6 +117,11 @@ def split_first(s, delims):
     return s[:min_idx], s[min_idx+1:], min_delim
 
 
+# Recently parsed urls. Url is immutable, so callers can share them. Only
+# used from the event loop, so it needs no lock.
+_url_cache = LoopRecentlyUsedContainer(1024)
+
+
 def parse_url(url):
     """
     Given a url, return a parsed :class:`.Url` namedtuple. Best-effort is
@@ -131,8 +137,16 @@ def parse_url(url):
         Url(scheme=None, host='google.com', port=80, path=None, ...)
         >>> parse_url('/foo?bar')
         Url(scheme=None, host=None, port=None, path='/foo', query='bar', ...)
+
+    Results for the most recently used urls are cached.
     """
+    u = _url_cache.get(url)
+    if u is None:
+        u = _url_cache[url] = _parse_url(url)
+    return u
 
+
+def _parse_url(url):
     # While this code has overlap with stdlib's urlparse, it is much
     # simplified for our needs and less annoying.
     # Additionally, this implementations does silly things to be optimal
@@ -204,6 +218,24 @@ def parse_url(url):
 
     return Url(scheme, auth, host, port, path, query, fragment)
 
+
+def normalize_host(host):
+    """
+    Lowercase ``host`` and strip the brackets around an IPv6 address, so that
+    every spelling of a host compares equal.
+
+    Example::
+
+        >>> normalize_host('Example.COM')
+        'example.com'
+        >>> normalize_host('[::1]')
+        '::1'
+    """
+    if host is None:
+        return None
+    return host.strip('[]').lower()
+
+
 def get_host(url):
     """
     Deprecated. Use :func:`.parse_url` instead.